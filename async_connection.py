@@ -0,0 +1,55 @@
+import requests
+import asyncio
+
+import connect as c
+
+
+class AsyncConnection:
+	"""
+	A Class to make calls to the League client from asyncio code. Wraps a regular Connection, and runs its requests on
+	worker threads, so that independent calls can be awaited at the same time with asyncio.gather(). The Connection's
+	HTTP session keeps several connections to the client open, so concurrent calls don't queue up behind each other.
+	"""
+
+	def __init__(self, connection: c.Connection | None = None):
+		"""
+		Args:
+			connection: (optional) the Connection to wrap - a new one is created if not provided
+		"""
+		self.connection: c.Connection = connection if connection is not None else c.Connection()
+
+	@property
+	def endpoints(self) -> dict[str, str]:
+		return self.connection.endpoints
+
+	async def api_get(self, endpoint: str, should_print: bool = False) -> requests.Response:
+		""" Send an HTTP GET request. """
+		return await self.api_call(endpoint, "get", None, should_print)
+
+	async def api_post(self, endpoint: str, data: dict | None = None, should_print: bool = False) -> requests.Response:
+		""" Send an HTTP POST request. """
+		return await self.api_call(endpoint, "post", data, should_print)
+
+	async def api_put(self, endpoint: str, data: dict | None = None, should_print: bool = False) -> requests.Response:
+		""" Send an HTTP PUT request. """
+		return await self.api_call(endpoint, "put", data, should_print)
+
+	async def api_patch(self, endpoint: str, data: dict | None = None, should_print: bool = False) -> requests.Response:
+		""" Send an HTTP PATCH request. """
+		return await self.api_call(endpoint, "patch", data, should_print)
+
+	async def api_call(self, endpoint: str, method: str, data: dict | None, should_print: bool) -> requests.Response:
+		""" Make an API call on a worker thread. See Connection.api_call(). """
+		return await asyncio.to_thread(self.connection.api_call, endpoint, method, data, should_print)
+
+	async def get_gamestate(self) -> str:
+		""" Get the current state of the game (Lobby, ChampSelect, etc.) """
+		return (await self.api_get("gamestate")).json()
+
+	async def get_session(self) -> dict:
+		""" Get the current champselect session info. """
+		return (await self.api_get("champselect_session")).json()
+
+	async def get_summoner_id(self) -> int:
+		""" Get the summoner id of the user. """
+		return (await self.api_get("current_summoner")).json()["accountId"]
@@ -0,0 +1,105 @@
+from typing import Awaitable
+import threading
+import requests
+import asyncio
+
+from async_connection import AsyncConnection
+from champselect_snapshot import ChampselectSnapshot
+import champselect
+import main_loop
+import runes
+
+
+async def fetch_state(connection: AsyncConnection, loop_state: main_loop.LoopState) -> tuple[str, dict | None]:
+	"""
+	Get the gamestate. If we were in champselect last time, the champselect session is requested at the same time.
+	Returns:
+		a tuple containing the gamestate, and the champselect session (or None if not in champselect)
+	"""
+	if loop_state.last_gamestate != "ChampSelect":
+		return await connection.get_gamestate(), None
+
+	gamestate, session = await asyncio.gather(connection.get_gamestate(), connection.get_session())
+	return gamestate, session if gamestate == "ChampSelect" else None
+
+
+async def prefetch_rune_data(connection: AsyncConnection, session: dict | None) -> None:
+	"""
+	Once the player has locked in, request their rune pages and the recommended runes for their champion at the same
+	time, so that sending runes only has to wait for the slower of the two.
+	"""
+	sync_connection = connection.connection
+	if session is None or sync_connection.runes_chosen or not sync_connection.should_modify_runes:
+		return
+
+	snapshot = ChampselectSnapshot.from_session(session)
+	role_name: str = sync_connection.assigned_role
+	if snapshot.phase != "FINALIZATION" or not snapshot.pick_action.get("completed", False) or not role_name:
+		return
+
+	# Only the requests are sent concurrently - the results are stored afterwards, one at a time, so that the
+	# Connection is never modified by two threads at once
+	champid: int = snapshot.pick_action["championId"]
+	key: tuple[str, int, str] = runes.get_recommendation_key(sync_connection, champid, role_name)
+	calls: dict[str, Awaitable[requests.Response]] = {}
+	if key not in sync_connection.rune_recommendations:
+		calls["recommendations"] = connection.api_get(runes.get_rune_recommendation_endpoint(champid, role_name))
+	if not sync_connection.runepages.is_loaded():
+		calls["runepages"] = connection.api_get("runes")
+	if not calls:
+		return
+
+	responses: list = await asyncio.gather(*calls.values(), return_exceptions=True)
+	for name, response in zip(calls, responses):
+		# Any errors are raised again (and handled) when the runes are actually sent
+		if isinstance(response, BaseException) or response.status_code != 200:
+			continue
+		if name == "recommendations":
+			sync_connection.rune_recommendations[key] = response.json()
+		else:
+			sync_connection.runepages.pages = response.json()
+
+
+async def wait(connection: AsyncConnection, seconds: float, stop: threading.Event | None) -> None:
+	""" Wait for the specified number of seconds without blocking the event loop. See main_loop.wait(). """
+	await asyncio.to_thread(main_loop.wait, connection.connection, seconds, stop)
+
+
+async def async_main_loop(
+	connection: AsyncConnection, stop: threading.Event | None = None, loop_state: main_loop.LoopState | None = None
+) -> None:
+	"""
+	React to the state of the League client until the program exits - the asyncio version of main_loop.main_loop().
+	Independent requests are sent concurrently, and the (blocking) champselect logic runs on a worker thread, one step
+	at a time, so that the Connection is still only modified by one thread at once.
+	Args:
+		stop: (optional) an event that makes the loop return once it is set
+		loop_state: (optional) state to use for the loop, so that it can be inspected afterwards
+	"""
+	if loop_state is None:
+		loop_state = main_loop.LoopState()
+	sync_connection = connection.connection
+	champselect.subscribe_to_changes(sync_connection)
+	interval: float = main_loop.update_interval()
+
+	while not main_loop.should_stop(stop):
+		await wait(connection, interval, stop)
+		if main_loop.should_stop(stop):
+			return
+		# Wrap the loop in a try block to catch errors when the client closes
+		try:
+			# Reconnect straight away if the client was restarted, and wait for it to come back if it was closed
+			if not await asyncio.to_thread(sync_connection.check_lockfile):
+				await asyncio.to_thread(sync_connection.re_parse_lockfile, stop)
+				continue
+			gamestate, session = await fetch_state(connection, loop_state)
+			await prefetch_rune_data(connection, session)
+			await asyncio.to_thread(main_loop.handle_gamestate, sync_connection, gamestate, loop_state, session)
+
+			interval = loop_state.scheduler.next_interval(
+				main_loop.update_interval(), gamestate, sync_connection.champselect_snapshot
+			)
+
+		except requests.exceptions.ConnectionError:
+			await asyncio.to_thread(sync_connection.re_parse_lockfile, stop)
+			interval = main_loop.update_interval()
@@ -0,0 +1,188 @@
+# End-to-end decision latency benchmark.
+#
+# Drives the real main loop against the simulated League client (lcu_simulator.py), and measures the time from the
+# moment the simulator starts one of the local player's champselect actions to the moment the PATCH completing it
+# arrives. Also counts how many API calls the script makes per champselect.
+#
+# Usage: python benchmark.py --runs 20 --intervals 0.25,0.5,1 --output bench.json scenarios/default.json
+
+from contextlib import redirect_stdout, nullcontext
+import threading
+import tempfile
+import argparse
+import asyncio
+import json
+import time
+import os
+
+from async_connection import AsyncConnection
+import async_main_loop
+import connect as c
+import lcu_simulator
+import main_loop
+import utility as u
+
+RUN_TIMEOUT: float = 120  # seconds before a single run is considered stuck (before time scaling)
+SCALED_FIELDS: tuple[str, ...] = (
+	"matchmaking_seconds", "planning_seconds", "ban_seconds", "pick_seconds",
+	"finalization_seconds", "bot_action_seconds", "dodge_after_seconds",
+)
+
+
+def percentile(values: list[float], fraction: float) -> float:
+	""" Get the specified percentile of a list of values, interpolating between the closest ranks. """
+	ordered: list[float] = sorted(values)
+	position: float = (len(ordered) - 1) * fraction
+	lower: int = int(position)
+	upper: int = min(lower + 1, len(ordered) - 1)
+	return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: list[float]) -> dict:
+	""" Summarize a list of measurements. """
+	if not values:
+		return {"n": 0}
+	return {
+		"n": len(values),
+		"mean": sum(values) / len(values),
+		"p50": percentile(values, 0.50),
+		"p95": percentile(values, 0.95),
+		"p99": percentile(values, 0.99),
+		"max": max(values),
+	}
+
+
+def load_scenario(path: str, time_scale: float) -> lcu_simulator.Scenario:
+	""" Load a scenario, scaling its timers by the specified amount. """
+	scenario = lcu_simulator.Scenario.load(path)
+	scenario.queue_automatically = True  # nobody is around to start the queue
+	for field in SCALED_FIELDS:
+		setattr(scenario, field, getattr(scenario, field) * time_scale)
+	return scenario
+
+
+def run_once(scenario: lcu_simulator.Scenario, args: argparse.Namespace) -> dict:
+	"""
+	Play through a single scenario, and return its measurements.
+	Returns:
+		a dictionary containing the decision latency of each action (in seconds), the number of API calls made (during
+		champselect and in total), the main loop's poll counts, how far each delayed lock in landed from its target,
+		and whether or not the game started successfully
+	"""
+	with tempfile.TemporaryDirectory() as directory, lcu_simulator.Simulator(directory, scenario) as simulator:
+		u.cfg_reader.set("settings", "directory", directory)
+		connection = c.Connection()
+		connection.lock_in_delay = args.lock_in_delay
+		connection.should_modify_runes = True
+		connection.user_pick = connection.pick_intent = args.pick
+		connection.user_ban = connection.ban_intent = args.ban
+
+		stop = threading.Event()
+		loop_state = main_loop.LoopState()
+		if args.use_async:
+			loop = lambda: asyncio.run(async_main_loop.async_main_loop(AsyncConnection(connection), stop, loop_state))
+			thread = threading.Thread(target=loop, daemon=True)
+		else:
+			thread = threading.Thread(target=main_loop.main_loop, args=(connection, stop, loop_state), daemon=True)
+		thread.start()
+		finished: bool = simulator.client.in_game.wait(RUN_TIMEOUT * args.time_scale)
+		stop.set()
+		thread.join(timeout=5)
+
+		client = simulator.client
+		latencies: dict[str, list[float]] = {"ban": [], "pick": []}
+		for timing in client.action_timings:
+			if timing["completed"] is not None:
+				latencies[timing["type"]].append(timing["completed"] - timing["started"])
+
+		champselect_calls: int = 0
+		if client.champselect_started is not None:
+			end: float = client.game_started if client.game_started is not None else time.monotonic()
+			champselect_calls = sum(1 for call in client.calls if client.champselect_started <= call[0] <= end)
+
+		return {
+			"finished": finished,
+			"latencies": latencies,
+			"champselect_calls": champselect_calls,
+			"total_calls": len(client.calls),
+			"lock_in_errors": list(connection.champselect_clock.lock_in_errors),
+			"polls": loop_state.scheduler.summary(),
+		}
+
+
+def run_benchmark(args: argparse.Namespace) -> dict:
+	""" Run every scenario at every update interval, and return the results. """
+	results: dict = {
+		"runs": args.runs,
+		"time_scale": args.time_scale,
+		"lock_in_delay": args.lock_in_delay,
+		"use_async": args.use_async,
+		"scenarios": {},
+	}
+	for path in args.scenarios:
+		name: str = os.path.splitext(os.path.basename(path))[0]
+		by_interval: dict = {}
+		for interval in args.intervals:
+			u.cfg_reader.set("settings", "update_interval", str(interval))
+			latencies: dict[str, list[float]] = {"ban": [], "pick": []}
+			calls: list[float] = []
+			total_calls: list[float] = []
+			lock_in_errors: list[float] = []
+			poll_counts: dict[str, list[float]] = {}
+			failures: int = 0
+
+			for run in range(args.runs):
+				with open(os.devnull, "w") as devnull, nullcontext() if args.verbose else redirect_stdout(devnull):
+					result = run_once(load_scenario(path, args.time_scale), args)
+				if not result["finished"]:
+					failures += 1
+				for action_type, values in result["latencies"].items():
+					latencies[action_type].extend(values)
+				calls.append(result["champselect_calls"])
+				total_calls.append(result["total_calls"])
+				lock_in_errors.extend(result["lock_in_errors"])
+				for gamestate, count in result["polls"]["poll_counts"].items():
+					poll_counts.setdefault(gamestate, []).append(count)
+				print(
+					f"{name} @ {interval}s, run {run + 1}/{args.runs}: "
+					f"pick {result['latencies']['pick']}, {result['champselect_calls']} calls"
+				)
+
+			by_interval[str(interval)] = {
+				"ban_latency": summarize(latencies["ban"]),
+				"pick_latency": summarize(latencies["pick"]),
+				"champselect_calls": summarize(calls),
+				"total_calls": summarize(total_calls),
+				"lock_in_errors": summarize(lock_in_errors),
+				"poll_counts": {gamestate: summarize(counts) for gamestate, counts in poll_counts.items()},
+				"failures": failures,
+			}
+		results["scenarios"][name] = by_interval
+	return results
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark decision latency against the simulated client.")
+	parser.add_argument("scenarios", nargs="*", default=[os.path.join(u.BASE_DIR, "scenarios", "default.json")])
+	parser.add_argument("--runs", type=int, default=10, help="number of runs per scenario and interval")
+	parser.add_argument(
+		"--intervals", type=lambda s: [float(x) for x in s.split(",")], default=[1.0],
+		help="comma-separated update_interval values to compare"
+	)
+	parser.add_argument("--time-scale", type=float, default=1, help="multiplier for the scenario's timers")
+	parser.add_argument("--lock-in-delay", type=int, default=0)
+	parser.add_argument("--pick", default="ahri")
+	parser.add_argument("--ban", default="yuumi")
+	parser.add_argument("--output", default="bench_output.json")
+	parser.add_argument("--verbose", action="store_true", help="show the script's output during each run")
+	parser.add_argument("--use-async", action="store_true", help="run the asyncio version of the main loop")
+	args = parser.parse_args()
+
+	results: dict = run_benchmark(args)
+	with open(args.output, "w") as file:
+		json.dump(results, file, indent=4)
+	print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,70 @@
+import threading
+import warnings
+import json
+import os
+
+import utility as u
+
+CACHE_PATH: str = os.path.join(u.BASE_DIR, "champion_cache.json")
+
+# Several Connections can share the cache (see supervisor.py) - make sure they don't overwrite each other's changes
+_lock = threading.Lock()
+
+
+def load(game_version: str, account_id: int, path: str = CACHE_PATH) -> tuple[list[dict], list[dict]] | None:
+	"""
+	Load cached champion data, if it was saved for the same game version and account.
+	Returns:
+		a tuple containing data for all champions and for owned champions, or None if the cache is missing or outdated
+	"""
+	if not game_version:
+		return None
+
+	with _lock:
+		cache: dict | None = _read(path)
+	if cache is None or cache.get("game_version") != game_version:
+		return None
+
+	owned_by_account = cache.get("owned_champs")
+	if not isinstance(owned_by_account, dict) or str(account_id) not in owned_by_account:
+		return None
+	return cache["all_champs"], owned_by_account[str(account_id)]
+
+
+def save(
+	game_version: str, account_id: int, all_champs: list[dict], owned_champs: list[dict], path: str = CACHE_PATH
+) -> None:
+	"""
+	Save champion data to the cache. Owned champions are stored separately for each account, so that several accounts
+	can share the cache as long as they're on the same game version.
+	"""
+	if not game_version:
+		return
+
+	with _lock:
+		cache: dict | None = _read(path)
+		if cache is None or cache.get("game_version") != game_version or not isinstance(cache.get("owned_champs"), dict):
+			cache = {"game_version": game_version, "owned_champs": {}}
+		cache["all_champs"] = all_champs
+		cache["owned_champs"][str(account_id)] = owned_champs
+
+		# Write to a temporary file first, so that a crash can't leave a half-written cache behind
+		temp_path: str = f"{path}.tmp"
+		try:
+			with open(temp_path, "w") as file:
+				json.dump(cache, file)
+			os.replace(temp_path, path)
+		except OSError as e:
+			warnings.warn(f"Unable to save champion cache: {e}", RuntimeWarning)
+
+
+def _read(path: str) -> dict | None:
+	""" Read the cache file, returning None if it's missing or unreadable. """
+	try:
+		with open(path) as file:
+			return json.load(file)
+	except FileNotFoundError:
+		return None
+	except Exception as e:
+		warnings.warn(f"Unable to read champion cache, ignoring it: {e}", RuntimeWarning)
+		return None
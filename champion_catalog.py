@@ -0,0 +1,54 @@
+import formatting
+
+
+class ChampionCatalog:
+	"""
+	A Class to store every champion in the game, indexed both ways (name -> id and id -> name), along with their
+	display names and whether or not the player owns them. Built once, then only read from.
+	"""
+
+	def __init__(self, all_champs: list[dict], owned_champs: list[dict]):
+		"""
+		Args:
+			all_champs: champion data for every champion in the game, from the LCU API
+			owned_champs: champion data for every champion the player owns, from the LCU API
+		"""
+		self.ids: dict[str, int] = {}  # cleaned name -> id
+		self.names: dict[int, str] = {}  # id -> cleaned name
+		self.display_names: dict[str, str] = {}  # cleaned name -> name as shown in the client, e.g. "Kai'Sa"
+		self.owned: dict[str, int] = {}  # cleaned name -> id, for champions the player owns
+
+		# Keep the original data around so that the catalog can be cached
+		self.all_champs_data: list[dict] = all_champs
+		self.owned_champs_data: list[dict] = owned_champs
+
+		for champ in all_champs:
+			self._add(champ)
+
+		for champ in owned_champs:
+			name: str = self._add(champ)
+			self.owned[name] = champ["id"]
+
+	def _add(self, champ: dict) -> str:
+		""" Add a champion to the catalog, and return their cleaned name. """
+		name: str = formatting.clean_name(self.ids, champ["alias"], should_filter=False)
+		self.ids[name] = champ["id"]
+		self.names[champ["id"]] = name
+		self.display_names[name] = champ.get("name") or formatting.capitalize(name)
+		return name
+
+	def get_id(self, name: str) -> int:
+		""" Get the id number of a champion. Assumes the name has already been cleaned. """
+		return self.ids[name]
+
+	def get_name(self, champid: int) -> str | None:
+		""" Get the cleaned name of the champion with the specified id, or None if they don't exist. """
+		return self.names.get(champid)
+
+	def owns_same_champs(self, owned_champs: list[dict]) -> bool:
+		""" Check whether or not the specified owned champion data contains the same champions as this catalog. """
+		return {champ["id"] for champ in owned_champs} == set(self.owned.values())
+
+	def is_owned(self, name: str) -> bool:
+		""" Check whether or not the player owns the specified champion. Assumes the name has already been cleaned. """
+		return name in self.owned
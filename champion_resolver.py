@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+import bisect
+
+from champion_catalog import ChampionCatalog
+import formatting
+
+# Common nicknames for champions, as cleaned names. Nicknames for champions that aren't in the catalog are ignored.
+NICKNAMES: dict[str, str] = {
+	"asol": "aurelionsol",
+	"blitz": "blitzcrank",
+	"cait": "caitlyn",
+	"cass": "cassiopeia",
+	"ez": "ezreal",
+	"fiddle": "fiddlesticks",
+	"gp": "gangplank",
+	"heimer": "heimerdinger",
+	"j4": "jarvaniv",
+	"kass": "kassadin",
+	"kog": "kogmaw",
+	"lb": "leblanc",
+	"malph": "malphite",
+	"mf": "missfortune",
+	"morde": "mordekaiser",
+	"morg": "morgana",
+	"mundo": "drmundo",
+	"naut": "nautilus",
+	"noc": "nocturne",
+	# The client shows "Nunu & Willump", but formatting.champ() and most players write it out
+	"nunuandwillump": "nunu",
+	"nunuwillump": "nunu",
+	"tf": "twistedfate",
+	"tk": "tahmkench",
+	"trist": "tristana",
+	"trynd": "tryndamere",
+	"vlad": "vladimir",
+	"voli": "volibear",
+	"wukong": "monkeyking",
+	"ww": "warwick",
+	"xin": "xinzhao",
+	"yi": "masteryi",
+}
+
+# Match types, best first
+EXACT: str = "exact"  # the query is a champion's name (or display name)
+ALIAS: str = "alias"  # the query is a nickname
+PREFIX: str = "prefix"  # a name or nickname starts with the query
+FUZZY: str = "fuzzy"  # a name is within a few typos of the query
+_MATCH_RANKS: dict[str, int] = {EXACT: 0, ALIAS: 1, PREFIX: 2, FUZZY: 3}
+
+
+@dataclass(frozen=True)
+class Candidate:
+	""" A Class to store a single champion that matches a query. """
+	name: str  # cleaned champion name
+	display_name: str  # name as shown in the client
+	match: str  # how the champion matched the query (EXACT, ALIAS, PREFIX or FUZZY)
+	distance: int  # number of extra characters (PREFIX) or typos (FUZZY) between the query and the name
+
+	def sort_key(self) -> tuple[int, int, str]:
+		return _MATCH_RANKS[self.match], self.distance, self.name
+
+
+class ChampionResolver:
+	"""
+	A Class to figure out which champion a user meant from whatever they typed. Built once from the champion catalog:
+	every champion's cleaned name, display name and nicknames are indexed, and kept sorted so that prefix lookups
+	only need a binary search.
+	"""
+
+	def __init__(self, catalog: ChampionCatalog):
+		self._display_names: dict[str, str] = catalog.display_names
+		self._names: frozenset[str] = frozenset(catalog.ids)
+		self._aliases: dict[str, tuple[str, str]] = {}  # cleaned alias -> (champion name, match type)
+
+		for name, display_name in catalog.display_names.items():
+			self._aliases[name] = (name, EXACT)
+			self._aliases.setdefault(formatting.clean_string(display_name), (name, EXACT))
+		for nickname, name in NICKNAMES.items():
+			if name in self._names:
+				self._aliases.setdefault(nickname, (name, ALIAS))
+
+		self._sorted_aliases: list[str] = sorted(self._aliases)
+
+	def resolve(self, query: str) -> str | None:
+		"""
+		Get the name of the champion the query most likely refers to, or None if it doesn't clearly refer to any.
+		Exact names and nicknames always resolve. Prefixes only resolve if a single champion starts with them, e.g.
+		"kenn" -> "kennen", but not "ka" (Kai'Sa, Kalista, Karma...), and typos only resolve if a single champion is
+		closest.
+		"""
+		candidates: list[Candidate] = self.suggest(query, limit=2)
+		if not candidates:
+			return None
+
+		best: Candidate = candidates[0]
+		if best.match in (EXACT, ALIAS) or len(candidates) == 1:
+			return best.name
+		if best.match == FUZZY and candidates[1].distance > best.distance:
+			return best.name
+		return None  # ambiguous - don't guess
+
+	def suggest(self, query: str, limit: int = 10) -> list[Candidate]:
+		""" Get up to ``limit`` champions that match the query, best match first. """
+		query = formatting.clean_string(query)
+		if not query:
+			return []
+
+		exact: tuple[str, str] | None = self._aliases.get(query)
+		if exact is not None:
+			name, match = exact
+			candidates: dict[str, Candidate] = {name: Candidate(name, self._display_names[name], match, 0)}
+		else:
+			candidates = {}
+
+		for alias in self._prefix_matches(query):
+			name = self._aliases[alias][0]
+			self._add(candidates, Candidate(name, self._display_names[name], PREFIX, len(alias) - len(query)))
+
+		# Only look for typos if nothing else matched - it's by far the slowest lookup
+		if not candidates:
+			for name, distance in self._fuzzy_matches(query):
+				self._add(candidates, Candidate(name, self._display_names[name], FUZZY, distance))
+
+		return sorted(candidates.values(), key=Candidate.sort_key)[:limit]
+
+	@staticmethod
+	def _add(candidates: dict[str, Candidate], candidate: Candidate) -> None:
+		""" Add a candidate, keeping only the best match for each champion. """
+		existing: Candidate | None = candidates.get(candidate.name)
+		if existing is None or candidate.sort_key() < existing.sort_key():
+			candidates[candidate.name] = candidate
+
+	def _prefix_matches(self, query: str) -> list[str]:
+		""" Get every alias that starts with the query (excluding the query itself). """
+		start: int = bisect.bisect_right(self._sorted_aliases, query)
+		end: int = bisect.bisect_left(self._sorted_aliases, query + "\uffff", start)
+		return self._sorted_aliases[start:end]
+
+	def _fuzzy_matches(self, query: str) -> list[tuple[str, int]]:
+		""" Get every champion whose name is within a few typos of the query, along with the number of typos. """
+		max_distance: int = 1 if len(query) <= 4 else 2
+		matches: list[tuple[str, int]] = []
+		for alias, (name, _) in self._aliases.items():
+			if abs(len(alias) - len(query)) > max_distance:
+				continue
+			distance: int = edit_distance(query, alias, max_distance)
+			if distance <= max_distance:
+				matches.append((name, distance))
+		return matches
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+	"""
+	Get the Levenshtein distance between two strings. Gives up early once the distance is known to be greater than
+	``max_distance``, returning ``max_distance + 1``.
+	"""
+	previous: list[int] = list(range(len(b) + 1))
+	for i, char_a in enumerate(a, 1):
+		current: list[int] = [i]
+		for j, char_b in enumerate(b, 1):
+			current.append(min(
+				previous[j] + 1,  # deletion
+				current[j - 1] + 1,  # insertion
+				previous[j - 1] + (char_a != char_b),  # substitution
+			))
+		if min(current) > max_distance:
+			return max_distance + 1
+		previous = current
+	return previous[-1]
@@ -1,12 +1,28 @@
 import warnings
 import time
 
+from champselect_snapshot import ChampselectSnapshot
 from champselect_action import ChampselectAction
+import champselect_diff
+import decision_journal
 import champselect_exceptions
 import connect as c
 import utility as u
 import formatting
 
+LOCK_IN_CHECK_INTERVAL: float = 1  # seconds between session checks while waiting to lock in
+
+# Changes that the pick and ban intent depend on - anything else (e.g. the timer) doesn't require re-deciding them
+INTENT_INPUTS: tuple[str, ...] = (
+	champselect_diff.PHASE_CHANGED,
+	champselect_diff.BAN_ADDED,
+	champselect_diff.PICK_LOCKED,
+	champselect_diff.ALLY_HOVER_CHANGED,
+	champselect_diff.MY_ACTION_STARTED,
+	champselect_diff.MY_ACTION_COMPLETED,
+	champselect_diff.INPUTS_CHANGED,
+)
+
 
 def ban_or_pick(connection: c.Connection) -> None:
 	""" Decide whether to pick or ban based on gamestate, then call the corresponding method. """
@@ -98,7 +114,18 @@ def _do_champ_inner(connection: c.Connection, action: ChampselectAction) -> None
 		data["championId"] = action.champid
 
 	# Lock in the champ and print info
+	sent_at: float = time.monotonic()
 	response = connection.api_patch(endpoint, data=data)
+	connection.journal.record(
+		decision_journal.ACTION,
+		t=sent_at,
+		mode=action.get_mode(),
+		actionid=action.actionid,
+		champid=action.champid,
+		completed=data.get("completed", False),
+		status=response.status_code,
+		ms=decision_journal.elapsed_ms(sent_at),
+	)
 
 	# If the request was successful
 	if response.status_code == 204:
@@ -115,7 +142,7 @@ def _do_champ_inner(connection: c.Connection, action: ChampselectAction) -> None
 			# hover to be marked as invalid.
 			if action.champid not in connection.invalid_picks:
 				champ_name: str = connection.get_champ_name_by_id(action.champid)
-				connection.invalid_picks[action.champid] = f"Invalid pick: {formatting.champ(champ_name)} is banned."
+				connection.invalid_picks[action.champid] = f"Invalid pick: {connection.format_champ(champ_name)} is banned."
 
 
 def wait_before_locking(connection: c.Connection, action: ChampselectAction) -> None:
@@ -124,30 +151,36 @@ def wait_before_locking(connection: c.Connection, action: ChampselectAction) ->
 		return
 
 	if action.banning():
-		champ_name: str = formatting.champ(connection.ban_intent)
+		champ_name: str = connection.format_champ(connection.ban_intent)
 		display_mode: str = "banning"
 	else:
-		champ_name = formatting.champ(connection.pick_intent)
+		champ_name = connection.format_champ(connection.pick_intent)
 		display_mode = "picking"
 
 	u.print_and_write(f"\nWaiting {connection.lock_in_delay} seconds before {display_mode}...\n")
 
-	start_time: float = time.time()
-	still_waiting: bool = True
-	latest_possible_lock_in_time: float = start_time + min(
-		connection.lock_in_delay,
-		seconds_remaining(connection)
-	) - 1
+	# Lock in after the delay, but never so late that the champselect timer runs out first
+	clock = connection.champselect_clock
+	start_time: float = time.monotonic()
+	target: float = clock.lock_in_target(connection.champselect_snapshot, start_time, connection.lock_in_delay)
+
+	while (time_left := target - time.monotonic()) > 0:
+		# Wait straight through to the target if it's close - no need to check the session again. Commands from the web
+		# API still run while waiting.
+		if time_left <= LOCK_IN_CHECK_INTERVAL:
+			connection.commands.run_for(time_left)
+			action.update_champid()  # in case a command changed the pick/ban intent
+			break
+		connection.commands.run_for(LOCK_IN_CHECK_INTERVAL)
+
+		# Nothing to re-check unless something other than the timer changed
+		changes: list[champselect_diff.ChampselectChange] = update_champselect(connection)
+		target = clock.lock_in_target(connection.champselect_snapshot, start_time, connection.lock_in_delay)
+		if all(change.kind == champselect_diff.TIMER for change in changes):
+			continue
 
-	while still_waiting:
-		time.sleep(1)
-		update_champselect(connection)
 		hover_champ(connection)
 
-		# Check if enough time elapsed
-		if time.time() >= latest_possible_lock_in_time:
-			still_waiting = False
-
 		# Make sure we update the hover if champ is changed by web API
 		should_rehover = action.update_champid()
 		if should_rehover:
@@ -156,31 +189,28 @@ def wait_before_locking(connection: c.Connection, action: ChampselectAction) ->
 
 		# Check if user manually completed the action
 		if (
-			action.banning() and connection.ban_action["completed"]
+			action.banning() and connection.ban_action.get("completed", False)
 			or
-			action.picking() and connection.pick_action["completed"]
+			action.picking() and connection.pick_action.get("completed", False)
 		):
-			still_waiting = False
+			break
 
 		# Check if someone dodged the lobby
 		if action.skipping():
-			still_waiting = False
+			break
+
+	error: float = clock.record_lock_in(target)
+	connection.journal.record(
+		decision_journal.LOCK_IN_WAIT,
+		mode=action.get_mode(),
+		champid=action.champid,
+		waitedMs=decision_journal.elapsed_ms(start_time),
+		errorMs=round(error * 1000, 1),
+	)
 	# TODO: Only print this if champ was actually picked
-	u.print_and_write(f"Done waiting! {formatting.capitalize(display_mode)} {champ_name}...")
-
-
-def seconds_remaining(connection: c.Connection) -> int:
-	"""
-	Returns the number of seconds remaining in the current champselect action. If an error occurs during this check,
-	returns 0 instead.
-	"""
-	try:
-		return int(connection.get_session()["timer"]["adjustedTimeLeftInPhase"]) // 1000
-	except KeyError:
-		return 0
-	except Exception as e:
-		u.print_and_write(f"Unable to get remaining champselect action time due to an error: {e}")
-		return 0
+	u.print_and_write(
+		f"Done waiting! {formatting.capitalize(display_mode)} {champ_name}... ({error * 1000:+.0f} ms from target)"
+	)
 
 
 def decide_pick(connection: c.Connection) -> str:
@@ -191,20 +221,19 @@ def decide_pick(connection: c.Connection) -> str:
 
 	# First check user pick
 	pick: str = connection.user_pick
-	if is_valid_pick(connection, pick):
+	if evaluate_candidate(connection, "pick", "user", pick):
 		return pick
 
 	# Then, check current pick intent
 	if pick != connection.pick_intent:
 		pick: str = connection.pick_intent
-		if is_valid_pick(connection, pick):
+		if evaluate_candidate(connection, "pick", "intent", pick):
 			return pick
 
 	# If current pick intent isn't valid, loop through user's config to find a champ to pick
-	options: list[str] = u.get_backup_config_champs(connection.get_assigned_role())
-	for pick in options:
-		if is_valid_pick(connection, pick):
-			return pick
+	for champid in connection.get_backup_champids(connection.get_assigned_role()):
+		if evaluate_candidate(connection, "pick", "config", champid=champid):
+			return connection.get_champ_name_by_id(champid)
 
 	# Last config option isn't valid
 	raise champselect_exceptions.NoChampionError("Unable to find a valid champion to pick.")
@@ -218,19 +247,18 @@ def decide_ban(connection: c.Connection) -> str:
 
 	# First check user ban
 	ban: str = connection.user_ban
-	if is_valid_ban(connection, ban):
+	if evaluate_candidate(connection, "ban", "user", ban):
 		return ban
 
 	# Then, check current ban intent
 	ban = connection.ban_intent
-	if is_valid_ban(connection, ban):
+	if evaluate_candidate(connection, "ban", "intent", ban):
 		return ban
 
 	# If current ban intent isn't valid, loop through user's config to find a champ to ban
-	options: list[str] = u.get_backup_config_champs(connection.get_assigned_role(), False)
-	for ban in options:
-		if is_valid_ban(connection, ban):
-			return ban
+	for champid in connection.get_backup_champids(connection.get_assigned_role(), False):
+		if evaluate_candidate(connection, "ban", "config", champid=champid):
+			return connection.get_champ_name_by_id(champid)
 
 	# Last config option isn't valid
 	# Unlike with picking a champ, having no ban doesn't stop user from being able to play, so just
@@ -239,6 +267,36 @@ def decide_ban(connection: c.Connection) -> str:
 	return ""
 
 
+def evaluate_candidate(
+	connection: c.Connection, mode: str, source: str, champ_name: str = "", champid: int | None = None
+) -> bool:
+	"""
+	Check if a champion can be picked or banned, and record the result (and the reason, if they can't) in the decision
+	journal.
+	Args:
+		mode: "pick" or "ban"
+		source: where the champion came from ("user", "intent" or "config")
+		champ_name: (optional) the name of the champion - ignored if ``champid`` is provided
+		champid: (optional) the id number of the champion
+	"""
+	if champid is None:
+		# Handle empty input - allows user to skip selecting a champion and default to those in the config
+		if not champ_name:
+			return False
+		champid = connection.get_champid(formatting.clean_name(connection.all_champs, champ_name))
+
+	is_valid: bool = is_valid_ban_id(connection, champid) if mode == "ban" else is_valid_pick_id(connection, champid)
+	invalid: dict[int, str] = connection.invalid_bans if mode == "ban" else connection.invalid_picks
+	connection.journal.record(
+		decision_journal.CANDIDATE,
+		action=mode,
+		source=source,
+		champid=champid,
+		reason=None if is_valid else invalid.get(champid),
+	)
+	return is_valid
+
+
 def get_actionid(connection: c.Connection, mode: str) -> int | None:
 	""" Get the user's actionid from the current Champselect action. """
 	try:
@@ -273,33 +331,29 @@ def is_valid_pick(connection: c.Connection, champ_name: str) -> bool:
 		return False
 
 	champ_name = formatting.clean_name(connection.all_champs, champ_name)
-	champid: int = connection.get_champid(champ_name)
-	error_msg: str = f"Invalid pick ({formatting.champ(champ_name)}) - "
+	return is_valid_pick_id(connection, connection.get_champid(champ_name))
+
 
+def is_valid_pick_id(connection: c.Connection, champid: int) -> bool:
+	""" Check if the champion with the given id can be picked. See is_valid_pick(). """
 	# If champ has already been checked, and was invalid
 	if champid in connection.invalid_picks:
 		return False
 
+	champ_name: str = connection.get_champ_name_by_id(champid)
+	error_msg: str = f"Invalid pick ({connection.format_champ(champ_name)}) - "
+
 	# If champ is banned
 	if champ_is_banned(connection, champid):
-		reason = error_msg + "is banned."
-		connection.invalid_picks[champid] = reason
-		u.print_and_write(reason)
-		return False
+		return reject_candidate(connection, "pick", champid, error_msg + "is banned.")
 
 	# If user doesn't own the champ
 	if champ_name not in connection.owned_champs:
-		reason = error_msg + "is unowned."
-		connection.invalid_picks[champid] = reason
-		u.print_and_write(reason)
-		return False
+		return reject_candidate(connection, "pick", champid, error_msg + "is unowned.")
 
 	# If a player has already PICKED the champ (hovering is ok)
 	if champ_is_picked(connection, champid):
-		reason = error_msg + "has already been picked."
-		connection.invalid_picks[champid] = reason
-		u.print_and_write(reason)
-		return False
+		return reject_candidate(connection, "pick", champid, error_msg + "has already been picked.")
 
 	# If the user got assigned a role other than the one they queued for, disregard the champ they picked
 	# This does nothing when queuing for gamemodes that don't have assigned roles
@@ -311,14 +365,24 @@ def is_valid_pick(connection: c.Connection, champ_name: str) -> bool:
 		# and champ user picked is the pick in question
 		and (connection.user_pick == champ_name and connection.user_pick)
 	):
-		reason = error_msg + "user was autofilled"
-		connection.invalid_picks[champid] = reason
-		u.print_and_write(reason)
-		return False
+		return reject_candidate(connection, "pick", champid, error_msg + "user was autofilled")
 
 	return True
 
 
+def could_be_picked(connection: c.Connection, champid: int) -> bool:
+	"""
+	Check if the champion with the given id could be picked, without recording or printing anything if they can't.
+	Used for guesses (e.g. prefetching runes) rather than actual picks - see is_valid_pick_id() for those.
+	"""
+	return (
+		champid not in connection.invalid_picks
+		and connection.get_champ_name_by_id(champid) in connection.owned_champs
+		and not champ_is_banned(connection, champid)
+		and not champ_is_picked(connection, champid)
+	)
+
+
 def is_valid_ban(connection: c.Connection, champ_name: str) -> bool:
 	"""
 	Check if the given champion can be banned.  If they can't, print a message explaining why (once per champion to
@@ -329,37 +393,49 @@ def is_valid_ban(connection: c.Connection, champ_name: str) -> bool:
 		return False
 
 	champ_name = formatting.clean_name(connection.all_champs, champ_name)
-	champid = connection.get_champid(champ_name)
-	error_msg: str = f"Invalid ban ({formatting.champ(champ_name)}) - "
+	return is_valid_ban_id(connection, connection.get_champid(champ_name))
+
 
+def is_valid_ban_id(connection: c.Connection, champid: int) -> bool:
+	""" Check if the champion with the given id can be banned. See is_valid_ban(). """
 	# If the champion has already been checked, and was invalid
 	if champid in connection.invalid_bans:
 		return False
 
+	champ_name: str = connection.get_champ_name_by_id(champid)
+	error_msg: str = f"Invalid ban ({connection.format_champ(champ_name)}) - "
+
 	# If trying to ban the champ the user wants to play
 	if champ_name in (connection.pick_intent, connection.user_pick):
-		reason = error_msg + "user intends to play this champion."
-		connection.invalid_bans[champid] = reason
-		u.print_and_write(reason)
-		return False
+		return reject_candidate(connection, "ban", champid, error_msg + "user intends to play this champion.")
 
 	# If champ is already banned
 	if champ_is_banned(connection, champid):
-		reason = error_msg + "already banned"
-		connection.invalid_bans[champid] = reason
-		u.print_and_write(reason)
-		return False
+		return reject_candidate(connection, "ban", champid, error_msg + "already banned")
 
 	# If a teammate is hovering the champ
 	if teammate_hovering(connection, champid):
-		reason = error_msg + "a teammate is hovering this champion"
-		connection.invalid_bans[champid] = reason
-		u.print_and_write(reason)
-		return False
+		return reject_candidate(connection, "ban", champid, error_msg + "a teammate is hovering this champion")
 
 	return True
 
 
+def reject_candidate(connection: c.Connection, mode: str, champid: int, reason: str) -> bool:
+	"""
+	Remember that a champion can't be picked or banned (so that they're only checked once), and print why.
+	Args:
+		mode: "pick" or "ban"
+		champid: the id number of the champion
+		reason: the reason the champion can't be picked or banned
+	Returns:
+		False, so that validation functions can return the result directly
+	"""
+	invalid: dict[int, str] = connection.invalid_bans if mode == "ban" else connection.invalid_picks
+	invalid[champid] = reason
+	u.print_and_write(reason)
+	return False
+
+
 def get_invalid_pick_reason(connection: c.Connection, champid: int) -> str:
 	""" Return a string explaining the reason why the specified champion is an invalid pick. """
 	return connection.invalid_picks[champid]
@@ -372,20 +448,17 @@ def get_invalid_ban_reason(connection: c.Connection, champid: int) -> str:
 
 def champ_is_banned(connection: c.Connection, champid: int) -> bool:
 	""" Check if the given champion is banned. """
-	try:
-		return champid in get_banned_champids(connection)
-	except KeyError:  # if we're not in champselect
-		return False
+	return champid in connection.champselect_snapshot.banned_ids
 
 
 def champ_is_picked(connection: c.Connection, champid: int) -> bool:
 	""" Check if the given champion has been picked already. """
-	return champid in get_champ_pickids(connection)
+	return champid in connection.champselect_snapshot.locked_ids
 
 
 def teammate_hovering(connection: c.Connection, champid: int) -> bool:
 	""" Check if the given champion is being hovered by a teammate. """
-	return champid in get_teammate_hoverids(connection)
+	return champid in connection.champselect_snapshot.ally_hover_ids
 
 
 def is_currently_picking(connection: c.Connection) -> bool:
@@ -409,9 +482,9 @@ def is_hovering(connection: c.Connection) -> bool:
 	return get_current_hoverid(connection) != 0
 
 
-def get_banned_champids(connection: c.Connection) -> list[int]:
-	""" Get a list of all champion ids that have been banned. """
-	return connection.session["bans"]["myTeamBans"] + connection.session["bans"]["theirTeamBans"]
+def get_banned_champids(connection: c.Connection) -> frozenset[int]:
+	""" Get the ids of all champions that have been banned. """
+	return connection.champselect_snapshot.banned_ids
 
 
 def get_current_hoverid(connection: c.Connection) -> int:
@@ -419,48 +492,14 @@ def get_current_hoverid(connection: c.Connection) -> int:
 	return connection.pick_action.get("championId", 0)
 
 
-def get_champ_pickids(connection: c.Connection) -> list[int]:
-	""" Return a list of champion ids that players have locked in. """
-	champids: list[int] = []
-	for champ, is_enemy, is_hovering in get_all_player_champids(connection):
-		if not is_hovering:
-			champids.append(champ)
-	return champids
+def get_champ_pickids(connection: c.Connection) -> frozenset[int]:
+	""" Get the ids of all champions that other players have locked in. """
+	return connection.champselect_snapshot.locked_ids
 
 
-def get_teammate_hoverids(connection: c.Connection) -> list[int]:
-	""" Return a list of champion ids that teammates are hovering. """
-	champids: list[int] = []
-	for champ, is_enemy, is_hovering in get_all_player_champids(connection):
-		if not is_enemy and is_hovering:
-			champids.append(champ)
-	return champids
-
-
-def get_all_player_champids(connection: c.Connection) -> list[tuple[int, bool, bool]]:
-	"""
-	Get a list of all champion IDs that have already been picked or are currently being hovered.
-	Returns:
-		- ``champid`` the champion ID number
-		- ``is_enemy`` bool indicating whether the player is an enemy (True) or an ally (False)
-		- ``is_hovering`` bool indicating if the player is hovering their champ (True) or already picked them (False)
-	"""
-	try:
-		champids: list[tuple[int, bool, bool]] = []
-		# Actions are grouped by type (pick, ban, etc.), so we iterate over each group
-		for action_group in connection.all_actions:
-			for action in action_group:
-				# Only look at pick actions, and only on user's team that aren't the user
-				if action["type"] == "pick" and action["actorCellId"] != connection.get_localcellid():
-					champid: int = action["championId"]
-
-					# If champid is 0, the player isn't hovering a champ
-					if champid != 0:
-						# If the action isn't completed, they're still hovering
-						champids.append((champid, not action["isAllyAction"], not action["completed"]))
-		return champids
-	except KeyError:  # avoid crash when this method is called outside of champselect
-		return []
+def get_teammate_hoverids(connection: c.Connection) -> frozenset[int]:
+	""" Get the ids of all champions that teammates are hovering. """
+	return connection.champselect_snapshot.ally_hover_ids
 
 
 def update_champ_intent(connection: c.Connection) -> None:
@@ -469,6 +508,7 @@ def update_champ_intent(connection: c.Connection) -> None:
 	if not connection.has_picked:
 		last_intent: str = connection.pick_intent
 		connection.pick_intent = formatting.clean_name(connection.all_champs, decide_pick(connection))
+		connection.journal.record(decision_journal.DECISION, action="pick", champ=connection.pick_intent)
 
 		# Only print pick intent if it's different from the last loop iteration
 		if last_intent != connection.pick_intent:
@@ -476,13 +516,14 @@ def update_champ_intent(connection: c.Connection) -> None:
 
 		if not connection.has_printed_pick:
 			indent = connection.indentation
-			# u.print_and_write(f"Pick intent: {formatting.champ(connection.pick_intent)}", indentation=indent)
+			u.debug(f"Pick intent: {connection.format_champ(connection.pick_intent)}", indentation=indent)
 			connection.has_printed_pick = True
 
 	##### Update ban intent #####
 	if not connection.has_banned:
 		last_intent: str = connection.ban_intent
 		connection.ban_intent = formatting.clean_name(connection.all_champs, decide_ban(connection))
+		connection.journal.record(decision_journal.DECISION, action="ban", champ=connection.ban_intent)
 
 		# Only print ban intent if it's different from the last loop iteration
 		if last_intent != connection.ban_intent:
@@ -490,25 +531,56 @@ def update_champ_intent(connection: c.Connection) -> None:
 
 		if not connection.has_printed_ban:
 			indent = connection.indentation
-			# u.print_and_write(f"Ban intent: {formatting.champ(connection.ban_intent)}", indentation=indent)
+			u.debug(f"Ban intent: {connection.format_champ(connection.ban_intent)}", indentation=indent)
 			connection.has_printed_ban = True
 
 
-def update_champselect(connection: c.Connection) -> None:
-	""" Update all champselect session data. """
-	connection.session = connection.get_session()
-	try:
-		connection.all_actions = connection.session["actions"]
-		# Look at each action, and return the one with the corresponding cellid
-		for action_group in connection.all_actions:
-			for action in action_group:
-				if action["actorCellId"] == connection.get_localcellid():
-					if action["type"] == "ban":
-						connection.ban_action = action
+def update_champselect(
+	connection: c.Connection, session: dict | None = None
+) -> list[champselect_diff.ChampselectChange]:
+	"""
+	Update all champselect session data, and notify subscribers of anything that changed since the last update (see
+	subscribe_to_changes()).
+	Args:
+		session: (optional) session data that was already received from the client, e.g. from an event. If not
+			provided, the session is requested from the client.
+	Returns:
+		the changes since the last update
+	"""
+	connection.session = session if session is not None else connection.get_session()
+	snapshot = ChampselectSnapshot.from_session(connection.session)
+	connection.champselect_snapshot = snapshot
+	connection.ban_action = snapshot.ban_action
+	connection.pick_action = snapshot.pick_action
+	connection.all_actions = connection.session.get("actions", [])
+
+	differ = connection.champselect_differ
+	changes: list[champselect_diff.ChampselectChange] = differ.update(snapshot, get_intent_inputs(connection))
+	connection.journal.record_session(snapshot, changes)
+	# Don't count changes made by the subscribers themselves (e.g. a new pick intent) as new inputs
+	differ.set_inputs(get_intent_inputs(connection))
+	return changes
+
+
+def subscribe_to_changes(connection: c.Connection) -> None:
+	""" Make the pick and ban intent get re-decided whenever something they depend on changes. """
+	connection.champselect_differ.subscribe(
+		"intent", INTENT_INPUTS, lambda snapshot, changes: _on_intent_inputs_changed(connection)
+	)
 
-					elif action["type"] == "pick":
-						connection.pick_action = action
 
+def _on_intent_inputs_changed(connection: c.Connection) -> None:
+	try:
+		if connection.all_actions:
 			update_champ_intent(connection)
 	except KeyError:  # bypass error that happens when someone dodges
 		pass
+
+
+def get_intent_inputs(connection: c.Connection) -> tuple:
+	""" Get everything outside of the champselect session that the pick and ban intent depend on. """
+	return (
+		connection.user_pick, connection.user_ban, connection.pick_intent, connection.ban_intent,
+		connection.user_role, connection.has_picked, connection.has_banned,
+		len(connection.invalid_picks), len(connection.invalid_bans), u.get_config_version(),
+	)
@@ -0,0 +1,59 @@
+from collections import deque
+import time
+
+from champselect_snapshot import ChampselectSnapshot
+
+LOCK_IN_SAFETY_MARGIN: float = 0.5  # seconds before the end of the phase that a delayed lock in must happen by
+
+
+class ChampselectClock:
+	"""
+	A Class to convert the League client's champselect timer into local time.monotonic() time. Every session includes
+	the client's clock (timer.internalNowInEpochMs), so the offset between the two clocks is estimated from each one
+	we receive; the sample with the lowest offset is the one that spent the least time in transit, so it's kept.
+	"""
+
+	def __init__(self, history_size: int = 20):
+		self.offset: float | None = None  # local monotonic time - client time (seconds)
+		self.lock_in_errors: deque[float] = deque(maxlen=history_size)  # how late (+) or early (-) each lock landed
+
+	def reset(self) -> None:
+		""" Forget the clock offset - called at the start of each champselect. """
+		self.offset = None
+
+	def add_sample(self, snapshot: ChampselectSnapshot) -> None:
+		""" Update the clock offset estimate using the timer of a champselect session. """
+		if snapshot.client_now_ms <= 0:
+			return
+		offset: float = snapshot.received_at - snapshot.client_now_ms / 1000
+		if self.offset is None or offset < self.offset:
+			self.offset = offset
+
+	def phase_deadline(self, snapshot: ChampselectSnapshot) -> float | None:
+		""" Get the local time that the current champselect phase ends at, or None if the phase has no timer. """
+		if snapshot.time_left_ms <= 0:
+			return None
+		if snapshot.client_now_ms > 0 and self.offset is not None:
+			return (snapshot.client_now_ms + snapshot.time_left_ms) / 1000 + self.offset
+		return snapshot.received_at + snapshot.time_left_ms / 1000
+
+	def lock_in_target(self, snapshot: ChampselectSnapshot, start_time: float, lock_in_delay: float) -> float:
+		"""
+		Get the local time that a delayed lock in should happen at: after the lock-in delay, but never later than
+		LOCK_IN_SAFETY_MARGIN seconds before the phase ends.
+		Args:
+			snapshot: the most recent champselect session
+			start_time: the local time the wait started at
+			lock_in_delay: the number of seconds to wait
+		"""
+		target: float = start_time + lock_in_delay
+		deadline: float | None = self.phase_deadline(snapshot)
+		if deadline is not None:
+			target = min(target, deadline - LOCK_IN_SAFETY_MARGIN)
+		return target
+
+	def record_lock_in(self, target: float) -> float:
+		""" Record how far from its target a lock in happened, and return the difference in seconds. """
+		error: float = time.monotonic() - target
+		self.lock_in_errors.append(error)
+		return error
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from champselect_snapshot import ChampselectSnapshot
+
+# Kinds of changes between two champselect sessions
+BAN_ADDED: str = "ban_added"  # a champion was banned (value: champid)
+PICK_LOCKED: str = "pick_locked"  # another player locked in a champion (value: champid)
+ALLY_HOVER_CHANGED: str = "ally_hover_changed"  # teammates' hovers changed (value: new set of champids)
+MY_ACTION_STARTED: str = "my_action_started"  # the local player's pick or ban started (value: "pick" or "ban")
+MY_ACTION_COMPLETED: str = "my_action_completed"  # the local player's pick or ban was completed (value: same)
+PHASE_CHANGED: str = "phase_changed"  # the champselect phase changed (value: new phase)
+TIMER: str = "timer"  # the champselect timer was updated (value: ms left in the phase)
+INPUTS_CHANGED: str = "inputs_changed"  # something outside the session changed, e.g. the user's pick (value: inputs)
+
+
+@dataclass(frozen=True)
+class ChampselectChange:
+	""" A Class to store a single change between two champselect sessions. """
+	kind: str
+	value: Any = None
+	previous: Any = None
+
+
+def diff(old: ChampselectSnapshot, new: ChampselectSnapshot) -> list[ChampselectChange]:
+	""" Compare two champselect sessions, and return everything that changed between them. """
+	changes: list[ChampselectChange] = []
+
+	if new.phase != old.phase:
+		changes.append(ChampselectChange(PHASE_CHANGED, new.phase, old.phase))
+
+	for champid in new.banned_ids - old.banned_ids:
+		changes.append(ChampselectChange(BAN_ADDED, champid))
+
+	for champid in new.locked_ids - old.locked_ids:
+		changes.append(ChampselectChange(PICK_LOCKED, champid))
+
+	if new.ally_hover_ids != old.ally_hover_ids:
+		changes.append(ChampselectChange(ALLY_HOVER_CHANGED, new.ally_hover_ids, old.ally_hover_ids))
+
+	for action_type, old_action, new_action in (
+		("ban", old.ban_action, new.ban_action),
+		("pick", old.pick_action, new.pick_action),
+	):
+		is_same_action: bool = old_action.get("id") == new_action.get("id")
+		if new_action.get("isInProgress", False) and not (is_same_action and old_action.get("isInProgress", False)):
+			changes.append(ChampselectChange(MY_ACTION_STARTED, action_type))
+		if new_action.get("completed", False) and not (is_same_action and old_action.get("completed", False)):
+			changes.append(ChampselectChange(MY_ACTION_COMPLETED, action_type))
+
+	if (new.time_left_ms, new.client_now_ms) != (old.time_left_ms, old.client_now_ms):
+		changes.append(ChampselectChange(TIMER, new.time_left_ms, old.time_left_ms))
+
+	return changes
+
+
+class ChampselectDiffer:
+	"""
+	A Class to compare each champselect session with the one before it, and notify subscribers of the changes they
+	care about. Subscribers are called at most once per session, with all of their relevant changes at once.
+	"""
+
+	def __init__(self):
+		self.snapshot: ChampselectSnapshot = ChampselectSnapshot()  # the last session that was compared
+		self.inputs: tuple = ()  # the last non-session inputs that were compared
+		self._subscribers: dict[str, tuple[frozenset[str], Callable]] = {}
+
+	def subscribe(
+		self, name: str, kinds: Iterable[str],
+		callback: Callable[[ChampselectSnapshot, list[ChampselectChange]], None]
+	) -> None:
+		"""
+		Call a function whenever one of the specified kinds of changes happens. Subscribing again with the same name
+		replaces the old subscription.
+		Args:
+			name: a name for the subscription
+			kinds: the kinds of changes to be notified about
+			callback: the function to call, with the new snapshot and the list of relevant changes
+		"""
+		self._subscribers[name] = (frozenset(kinds), callback)
+
+	def reset(self) -> None:
+		""" Forget the last session, so that everything in the next one counts as a change. """
+		self.snapshot = ChampselectSnapshot()
+		self.inputs = ()
+
+	def set_inputs(self, inputs: tuple) -> None:
+		""" Record the non-session inputs without emitting a change, e.g. after a subscriber changed them itself. """
+		self.inputs = inputs
+
+	def update(self, snapshot: ChampselectSnapshot, inputs: tuple = ()) -> list[ChampselectChange]:
+		"""
+		Compare a session with the previous one, notify subscribers, and return the changes.
+		Args:
+			snapshot: the new champselect session
+			inputs: (optional) anything else that subscribers depend on, e.g. the user's pick - an INPUTS_CHANGED
+				change is emitted when it's different from last time
+		"""
+		changes: list[ChampselectChange] = diff(self.snapshot, snapshot)
+		if inputs != self.inputs:
+			changes.append(ChampselectChange(INPUTS_CHANGED, inputs, self.inputs))
+		self.snapshot = snapshot
+		self.inputs = inputs
+
+		for kinds, callback in list(self._subscribers.values()):
+			relevant: list[ChampselectChange] = [change for change in changes if change.kind in kinds]
+			if relevant:
+				callback(snapshot, relevant)
+		return changes
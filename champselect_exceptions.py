@@ -5,5 +5,9 @@ class ClientConnectionError(Exception):
 	pass
 
 
+class ClientNotReadyError(RuntimeError):
+	pass
+
+
 class NoChampionError(Exception):
 	pass
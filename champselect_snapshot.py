@@ -0,0 +1,91 @@
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
+import time
+
+_NO_ACTION: Mapping = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class ChampselectSnapshot:
+	"""
+	A Class to store an indexed, read-only view of a single champselect session. Built once per session fetch, so
+	that checks like "is this champ banned?" don't have to walk through every champselect action.
+	"""
+	local_cell_id: int = -1
+	phase: str | None = None
+	banned_ids: frozenset[int] = frozenset()  # champions banned by either team
+	locked_ids: frozenset[int] = frozenset()  # champions another player has already locked in
+	ally_hover_ids: frozenset[int] = frozenset()  # champions teammates are hovering (but haven't locked in)
+	pick_action: Mapping = field(default_factory=lambda: _NO_ACTION)  # local player's pick action
+	ban_action: Mapping = field(default_factory=lambda: _NO_ACTION)  # local player's ban action
+	spell_ids: tuple[int, int] = (0, 0)  # local player's selected summoner spells
+	turns_until_my_action: int | None = None  # 0 if the local player's action is in progress, None if they have none left
+	time_left_ms: int = 0  # time left in the current champselect phase when the session was fetched
+	client_now_ms: int = 0  # the client's clock (ms since epoch) when the session was fetched
+	received_at: float = field(default_factory=time.monotonic)  # when the session was fetched
+
+	@classmethod
+	def from_session(cls, session: dict) -> "ChampselectSnapshot":
+		""" Build a snapshot from champselect session data. Returns an empty snapshot if not in champselect. """
+		try:
+			local_cell_id: int = session["localPlayerCellId"]
+			all_actions: list[list[dict]] = session["actions"]
+			bans: dict = session["bans"]
+		except (KeyError, TypeError):
+			return cls()
+
+		locked_ids: set[int] = set()
+		ally_hover_ids: set[int] = set()
+		pick_action: Mapping = _NO_ACTION
+		ban_action: Mapping = _NO_ACTION
+
+		# Actions are grouped by type (pick, ban, etc.), so we iterate over each group
+		for action_group in all_actions:
+			for action in action_group:
+				if action["actorCellId"] == local_cell_id:
+					if action["type"] == "ban":
+						ban_action = MappingProxyType(action)
+					elif action["type"] == "pick":
+						pick_action = MappingProxyType(action)
+
+				# If champid is 0, the player isn't hovering a champ
+				elif action["type"] == "pick" and action["championId"] != 0:
+					if action["completed"]:
+						locked_ids.add(action["championId"])
+					elif action["isAllyAction"]:
+						ally_hover_ids.add(action["championId"])
+
+		# Action groups are in turn order - the first one with incomplete actions is the current turn
+		turns_until_my_action: int | None = None
+		pending_groups: list[list[dict]] = [
+			group for group in all_actions if not all(action["completed"] for action in group)
+		]
+		for turns, group in enumerate(pending_groups):
+			if any(action["actorCellId"] == local_cell_id and not action["completed"] for action in group):
+				turns_until_my_action = turns
+				break
+
+		spell_ids: tuple[int, int] = (0, 0)
+		for player in session.get("myTeam", []):
+			if player.get("cellId") == local_cell_id:
+				spell_ids = (player.get("spell1Id", 0), player.get("spell2Id", 0))
+
+		timer: dict = session.get("timer", {})
+		return cls(
+			local_cell_id=local_cell_id,
+			phase=timer.get("phase"),
+			banned_ids=frozenset(bans.get("myTeamBans", [])) | frozenset(bans.get("theirTeamBans", [])),
+			locked_ids=frozenset(locked_ids),
+			ally_hover_ids=frozenset(ally_hover_ids),
+			pick_action=pick_action,
+			ban_action=ban_action,
+			spell_ids=spell_ids,
+			turns_until_my_action=turns_until_my_action,
+			time_left_ms=int(timer.get("adjustedTimeLeftInPhase", 0)),
+			client_now_ms=int(timer.get("internalNowInEpochMs", 0)),
+		)
+
+	def seconds_left(self) -> float:
+		""" Estimate how many seconds are left in the current champselect phase, right now. """
+		return max(self.time_left_ms / 1000 - (time.monotonic() - self.received_at), 0)
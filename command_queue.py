@@ -0,0 +1,64 @@
+from concurrent.futures import Future
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any, Callable
+import threading
+import queue
+import time
+
+
+class CommandQueue:
+	"""
+	A Class to let other threads (e.g. the web API) hand work to the main loop's thread, so that only one thread ever
+	modifies the Connection or sends commands to the client. Each submitted command gets a Future for its result.
+	"""
+
+	def __init__(self):
+		self._queue: queue.SimpleQueue[tuple[Future, Callable, tuple, dict]] = queue.SimpleQueue()
+		self._pending = threading.Event()  # set whenever there might be commands waiting
+		# Entered around every command, e.g. to profile it (see LoopProfiler.command())
+		self.around_command: Callable[[], AbstractContextManager] = nullcontext
+
+	def submit(self, func: Callable, *args, **kwargs) -> Future:
+		""" Queue a function to be run on the main loop's thread, and return a Future for its result. """
+		future: Future = Future()
+		self._queue.put((future, func, args, kwargs))
+		self._pending.set()
+		return future
+
+	def drain(self) -> int:
+		""" Run every queued command, and return how many were run. Must only be called by the main loop's thread. """
+		self._pending.clear()
+		count: int = 0
+		while True:
+			try:
+				future, func, args, kwargs = self._queue.get_nowait()
+			except queue.Empty:
+				return count
+
+			count += 1
+			if not future.set_running_or_notify_cancel():
+				continue
+			try:
+				with self.around_command():
+					result: Any = func(*args, **kwargs)
+			except Exception as e:
+				future.set_exception(e)
+			else:
+				future.set_result(result)
+
+	def run_for(self, seconds: float, stop: threading.Event | None = None, stop_check_interval: float = 0.1) -> None:
+		"""
+		Wait for the specified number of seconds, running commands as soon as they're submitted.
+		Args:
+			seconds: the number of seconds to wait
+			stop: (optional) an event that ends the wait early once it is set
+			stop_check_interval: (optional) the max number of seconds between checks of ``stop``
+		"""
+		deadline: float = time.monotonic() + seconds
+		while (time_left := deadline - time.monotonic()) > 0:
+			if stop is not None:
+				if stop.is_set():
+					return
+				time_left = min(time_left, stop_check_interval)
+			if self._pending.wait(time_left):
+				self.drain()
@@ -1,9 +1,32 @@
 from urllib3.exceptions import InsecureRequestWarning
+from champselect_snapshot import ChampselectSnapshot
+from champselect_clock import ChampselectClock
+from champselect_diff import ChampselectDiffer
+import champselect_diff
+from champion_catalog import ChampionCatalog
+from champion_resolver import ChampionResolver
+from runepage_cache import RunepageCache
+from status_feed import StatusFeed
+from command_queue import CommandQueue
+from metrics import Metrics
+from loop_profiler import LoopProfiler
+from decision_journal import DecisionJournal
+from shared_champion_data import SharedChampionData
+from lockfile_watcher import LockfileWatcher, LockfileState
+from configparser import ConfigParser
+from concurrent.futures import ThreadPoolExecutor, Future
+from collections import deque
 from base64 import b64encode
+from typing import Any, Callable, Mapping
+import threading
 import requests
 import warnings
+import time
 
 import champselect_exceptions
+import champ_cache
+import http_session
+import metrics
 import utility as u
 import formatting
 
@@ -27,9 +50,30 @@ class Connection:
 	RUNEPAGE_PREFIX: str = "Blitz:"  # Prefix for the name of rune pages created by this script
 	BRYAN_SUMMONERID: int = 2742039436911744
 
-	def __init__(self, indentation: int = 0):
+	def __init__(
+		self,
+		indentation: int = 0,
+		lockfile_path: str | None = None,
+		profile: str = "",
+		shared_data: SharedChampionData | None = None,
+	):
+		"""
+		Args:
+			indentation: (optional) amount of tab characters used for certain print statements
+			lockfile_path: (optional) path to the client's lockfile - defaults to the one in the game directory from
+				the config
+			profile: (optional) name of the config profile to use (see utility.load_config_profile())
+			shared_data: (optional) champion data shared with other Connections, when driving several clients at once
+		"""
+		self.profile: str = profile
+		self.config: ConfigParser = u.load_config_profile(profile) if profile else u.cfg_reader
+		self.lockfile_path: str | None = lockfile_path
+		self.shared_data: SharedChampionData | None = shared_data
+		self.game_version: str = ""
+		self.has_all_champs: bool = True  # False if only the player's owned champions could be loaded
+
 		# How many seconds to wait before locking in the champ
-		self.lock_in_delay: int = int(u.get_config_option_str("settings", "lock_in_delay"))
+		self.lock_in_delay: int = int(u.get_config_option_str("settings", "lock_in_delay", self.config))
 
 		# Flags
 		self.started_queue: bool = False
@@ -37,22 +81,42 @@ class Connection:
 		self.has_picked: bool = False
 		self.role_checked: bool = False
 		self.runes_chosen: bool = False
-		self.should_modify_runes: bool = u.get_config_option_bool("settings", "auto_send_runes")
+		self.should_modify_runes: bool = u.get_config_option_bool("settings", "auto_send_runes", self.config)
 		self.has_printed_pick: bool = False
 		self.has_printed_ban: bool = False
 
 		# Dictionaries of League Champions
+		self.champ_catalog: ChampionCatalog  # all champions, indexed by name and by id
+		self.champ_resolver: ChampionResolver  # finds champions by (partial or misspelled) name
 		self.all_champs: dict[str, int] = {}  # all champions currently in the game
 		self.owned_champs: dict = {}  # champions the player owns
+		self.priority_tables: dict[str, tuple[int, ...]] = {}  # backup champ ids from the config, by section
+		self.priority_tables_version: int = -1  # config version the priority tables were compiled from
 
 		# Info about the current gamestate
 		self.gamestate: requests.Response
 		self.session: dict = {}  # champselect session data
 		self.all_actions: dict = {}  # all champselect actions
-		self.ban_action: dict = {}  # local player champselect ban action
-		self.pick_action: dict = {}  # local player champselect pick action
+		self.champselect_snapshot: ChampselectSnapshot = ChampselectSnapshot()  # indexed view of the session
+		self.champselect_clock: ChampselectClock = ChampselectClock()  # converts the champselect timer to local time
+		self.champselect_differ: ChampselectDiffer = ChampselectDiffer()  # reports changes between sessions
+		self.champselect_differ.subscribe(
+			"clock", (champselect_diff.TIMER,), lambda snapshot, _: self.champselect_clock.add_sample(snapshot)
+		)
+		self.ban_action: Mapping = {}  # local player champselect ban action
+		self.pick_action: Mapping = {}  # local player champselect pick action
 		self.invalid_picks: dict[int, str] = {}  # champions that aren't valid picks
 		self.invalid_bans: dict[int, str] = {}  # champions that aren't valid bans
+		# (game version, champid, role) -> recommended runes. They're the same for every account, so they're shared if
+		# possible.
+		self.rune_recommendations: dict[tuple[str, int, str], list[dict]] = (
+			shared_data.rune_recommendations if shared_data is not None else {}
+		)
+		# Recommended runes the client couldn't provide, so that they aren't prefetched again every loop
+		self.failed_rune_recommendations: set[tuple[str, int, str]] = set()
+		self.runepages: RunepageCache = RunepageCache()  # the player's rune pages
+		self.status_feed: StatusFeed = StatusFeed()  # status shown in the web UI, updated as it changes
+		self.commands: CommandQueue = CommandQueue()  # work submitted by other threads, run by the main loop
 
 		# User intent and actual selections
 		self.user_pick: str = ""  # the user's intended pick
@@ -64,12 +128,28 @@ class Connection:
 
 		# Setup
 		self.endpoints: dict = {}  # dictionary to store commonly used endpoints
+		self.summoner_id: int = 0
 		self.indentation = indentation  # amount of tab characters used for certain print statements
+		self.startup_timings: dict[str, float] = {}  # seconds taken by each stage of startup
+		startup_start: float = time.perf_counter()
+		self.lockfile_watcher: LockfileWatcher = LockfileWatcher(self.get_lockfile_path)  # notices client restarts
+		self.startup_pending: bool = False  # whether startup calls need to be re-run for a new client instance
 		self.request_url: str
 		self.http_headers: dict[str, str]
-		self.request_url, self.http_headers = self.setup_http_requests()
+		self.request_url, self.http_headers = self.time_startup_stage("http_setup", self.setup_http_requests)
+		self.http_session = http_session.build_session(self.http_headers)  # pooled keep-alive connections
+		self.call_timings: deque[http_session.CallTiming] = deque(maxlen=100)  # timing info for recent API calls
+		self.metrics: Metrics = Metrics(u.get_config_option_bool("settings", "collect_metrics", self.config))
+		self.profiler: LoopProfiler = LoopProfiler(self.profile)  # profiles main loop ticks on demand
+		self.commands.around_command = self.profiler.command  # web API commands are profiled along with ticks
+		self.journal: DecisionJournal = DecisionJournal(
+			u.get_config_option_bool("settings", "journal_champselect", self.config), self.profile
+		)
+		self.profiler.configure(u.get_config_option_str("settings", "profile_main_loop", self.config))
 		self.setup_endpoints()
-		self.populate_champ_table()
+		self.run_startup_calls()
+		self.startup_timings["total"] = time.perf_counter() - startup_start
+		u.debug("Startup timings:", ", ".join(f"{stage} {secs:.3f}s" for stage, secs in self.startup_timings.items()))
 
 		# Bryan check
 		# self.is_bryan: bool = self.get_summoner_id() == self.BRYAN_SUMMONERID
@@ -78,22 +158,9 @@ class Connection:
 	# ----------------
 	# Connection Setup
 	# ----------------
-	@staticmethod
-	def parse_lockfile() -> u.Lockfile:
-		""" Parse the user's lockfile to connect to the LCU API. """
-		lockfile: u.Lockfile = u.Lockfile()
-		try:
-			with open(u.get_lockfile_path()) as f:
-				contents: list[str] = f.read().split(":")
-				lockfile.pid, lockfile.port, lockfile.password, lockfile.protocol = contents[1:5]
-
-		except FileNotFoundError as e:
-			raise champselect_exceptions.ClientConnectionError(MSG_CLIENT_CONNECTION_ERR) from e
-
-		except Exception as e:
-			raise Exception(f"Error while parsing lockfile") from e
-
-		return lockfile
+	def get_lockfile_path(self) -> str:
+		""" Get the path to the lockfile of the client this Connection is for. """
+		return self.lockfile_path or u.get_lockfile_path(self.config)
 
 	def setup_endpoints(self) -> None:
 		""" Set up a dictionary containing aliases tovarious API endpoints. """
@@ -111,20 +178,84 @@ class Connection:
 			"bannable_champs": "/lol-champ-select/v1/bannable-champion-ids",  # GET
 			"runes": "/lol-perks/v1/pages",  # GET / POST
 			"send_summs": "/lol-champ-select/v1/session/my-selection",  # PATCH
+			"game_version": "/lol-patch/v1/game-version",  # GET
 			# These endpoints need additional parameters added to the end of them
 			"send_runes": "/lol-perks/v1/pages/",  # PUT (+runepageid)
 			"summoner_info_byid": "/lol-summoner/v1/summoners/",  # GET (+summonerid)
 			"champselect_action": "/lol-champ-select/v1/session/actions/",  # PATCH (+actionid)
 		}
-		# This endpoint requires the player's summoner id, which requires the current_summoner endpoint
-		# to be initialized already, so initialize it separately
+		# The all_champs endpoint requires the player's summoner id, so it's added once that's known (see
+		# set_summoner_id())
+
+	def set_summoner_id(self, summoner_id: int) -> None:
+		""" Store the player's summoner id, and set up the endpoints that require it. """
+		self.summoner_id = summoner_id
 		self.endpoints.update(
-			{"all_champs": f"/lol-champions/v1/inventories/{self.get_summoner_id()}/champions-minimal"}  # GET
+			{"all_champs": f"/lol-champions/v1/inventories/{self.summoner_id}/champions-minimal"}  # GET
 		)
 
-	def populate_champ_table(self) -> None:
-		""" Load all champion data into dictionaries. """
-		response: requests.Response = self.api_get("all_champs")
+	def run_startup_calls(self) -> None:
+		"""
+		Request everything needed to get started from the client. Calls that don't depend on each other are sent at
+		the same time, so startup only takes as long as the slowest of them, rather than all of them added together.
+		"""
+		with ThreadPoolExecutor(max_workers=http_session.POOL_SIZE) as pool:
+			summoner_id = pool.submit(self.time_startup_stage, "summoner_id", self.get_summoner_id)
+			game_version = pool.submit(self.time_startup_stage, "game_version", self.get_game_version)
+			owned_champs = pool.submit(self.time_startup_stage, "owned_champs", self.api_get, "owned_champs")
+			lobby = pool.submit(self.time_startup_stage, "lobby", self.api_get, "lobby")
+
+			self.set_summoner_id(summoner_id.result())
+			self.populate_champ_table(game_version.result(), owned_champs)
+
+			# The role is only a default for later - don't let an unexpected lobby response stop startup
+			response: requests.Response = lobby.result()
+			if response.status_code == 200:
+				try:
+					self.set_primary_role(response.json())
+				except Exception as e:
+					warnings.warn(f"Unable to find player's role: {e}", RuntimeWarning)
+
+	def populate_champ_table(self, game_version: str, owned_champs: Future) -> None:
+		"""
+		Load all champion data, from the on-disk cache if it's up to date, otherwise from the client.
+		Args:
+			game_version: the version of the game client
+			owned_champs: the response from the owned_champs endpoint, which may still be in progress
+		"""
+		self.game_version = game_version
+		self.has_all_champs = True
+
+		# Another client on the same game version might have loaded everything but the player's champions already
+		shared_champs: list[dict] | None = (
+			self.shared_data.get_all_champs(game_version) if self.shared_data is not None else None
+		)
+		if shared_champs is not None:
+			response: requests.Response = owned_champs.result()
+			if response.status_code == 200:
+				self.set_champ_catalog(ChampionCatalog(shared_champs, response.json()))
+				champ_cache.save(game_version, self.summoner_id, shared_champs, response.json())
+				return
+
+		cached = champ_cache.load(game_version, self.summoner_id)
+		if cached is None:
+			self.download_champ_table(game_version, owned_champs.result())
+			return
+
+		self.set_champ_catalog(ChampionCatalog(*cached))
+		# The player might have bought champions since the cache was saved
+		response: requests.Response = owned_champs.result()
+		if response.status_code == 200:
+			self.update_owned_champs(response.json(), game_version)
+
+	def download_champ_table(self, game_version: str, owned_response: requests.Response) -> None:
+		"""
+		Download all champion data from the client, and save it to the cache.
+		Args:
+			game_version: the version of the game client
+			owned_response: the response from the owned_champs endpoint
+		"""
+		response: requests.Response = self.time_startup_stage("all_champs", self.api_get, "all_champs")
 
 		# TODO: Find a different endpoint for this (?)
 		# Handle this strange error that only happens on certain accounts
@@ -132,31 +263,102 @@ class Connection:
 		# 'message': 'Champion data has not yet been received.'}
 		if response.status_code == 404:
 			# Fall back to endpoint for player-owned champs, which, for some reason, breaks less
-			response = self.api_get("owned_champs")
-			if response.status_code == 404:
-				raise RuntimeError(f"Unable to get list of of champs: {response.json()}")
-		all_champs: dict = response.json()
+			response = owned_response
+			self.has_all_champs = False
+		if response.status_code == 404 or owned_response.status_code == 404:
+			# Also happens for a little while after the client starts, until it has loaded the player's champions
+			raise champselect_exceptions.ClientNotReadyError(
+				f"Unable to get list of of champs: {owned_response.json()}"
+			)
+
+		all_champs: list[dict] = response.json()
+		owned_champs: list[dict] = owned_response.json()
+		self.time_startup_stage("champ_catalog", self.set_champ_catalog, ChampionCatalog(all_champs, owned_champs))
+		# The cache is shared between accounts, so don't let others mistake this account's champions for every champion
+		if self.has_all_champs:
+			champ_cache.save(game_version, self.summoner_id, all_champs, owned_champs)
+
+	def time_startup_stage(self, stage: str, func: Callable, *args) -> Any:
+		""" Call a function, and record how long it took in startup_timings. """
+		start: float = time.perf_counter()
+		try:
+			return func(*args)
+		finally:
+			self.startup_timings[stage] = time.perf_counter() - start
 
-		for champ in all_champs:
-			champ_name = formatting.clean_name(self.all_champs, champ["alias"], should_filter=False)
-			self.all_champs[champ_name] = champ["id"]
+	def fetch_owned_champs(self) -> tuple[list[dict], str]:
+		""" Get the player's owned champions and the game version from the client, without changing anything. """
+		return self.api_get("owned_champs").json(), self.get_game_version()
 
-		owned_champs = self.api_get("owned_champs").json()
-		for champ in owned_champs:
-			champ_name = formatting.clean_name(self.all_champs, champ["alias"], should_filter=False)
-			self.owned_champs[champ_name] = champ["id"]
+	def apply_owned_champs(self, owned_champs: list[dict], game_version: str) -> None:
+		""" Update the catalog and cache with the player's owned champions, warning instead of raising on failure. """
+		try:
+			self.update_owned_champs(owned_champs, game_version)
+		except Exception as e:
+			warnings.warn(f"Unable to update the list of owned champions: {e}", RuntimeWarning)
+
+	def update_owned_champs(self, owned_champs: list[dict], game_version: str) -> None:
+		""" Update the catalog and cache with the player's owned champions, if they've changed. """
+		if self.champ_catalog.owns_same_champs(owned_champs):
+			return
+
+		catalog = ChampionCatalog(self.champ_catalog.all_champs_data, owned_champs)
+		self.set_champ_catalog(catalog)
+		if self.has_all_champs:
+			champ_cache.save(game_version, self.summoner_id, catalog.all_champs_data, owned_champs)
+
+	def revalidate_owned_champs_async(self) -> None:
+		"""
+		Check if the player's owned champions have changed, without waiting for the result. Only the API calls are made
+		on another thread - the catalog is replaced by the main loop's thread, since it's the only one allowed to modify
+		the Connection (see CommandQueue).
+		"""
+		def fetch() -> None:
+			try:
+				owned_champs, game_version = self.fetch_owned_champs()
+			except Exception as e:
+				warnings.warn(f"Unable to update the list of owned champions: {e}", RuntimeWarning)
+				return
+			self.commands.submit(self.apply_owned_champs, owned_champs, game_version)
+
+		threading.Thread(target=fetch, daemon=True).start()
+
+	def set_champ_catalog(self, catalog: ChampionCatalog) -> None:
+		""" Start using the specified champion catalog. """
+		self.champ_catalog = catalog
+		# Only share data that really covers every champion - not the fallback to the player's owned champions
+		if self.shared_data is not None and self.has_all_champs:
+			self.shared_data.set_all_champs(self.game_version, catalog.all_champs_data)
+			self.champ_resolver = self.shared_data.get_resolver(self.game_version, catalog)
+		else:
+			self.champ_resolver = ChampionResolver(catalog)
+		self.all_champs = catalog.ids
+		self.owned_champs = catalog.owned
+		self.compile_priority_tables()
+
+	def format_champ(self, name: str) -> str:
+		""" Format a champion name for user-facing display, using the names from this Connection's champion catalog. """
+		return formatting.champ(name, self.champ_catalog.display_names)
+
+	def compile_priority_tables(self) -> None:
+		""" Parse the backup champions in the user's config into champion ids. """
+		self.priority_tables_version = u.get_config_version()
+		self.priority_tables = u.compile_priority_tables(self.all_champs, self.config)
 
 	def update_primary_role(self) -> str:
 		""" Check what role the user is queueing for, update the Connection accordingly, and also return the role. """
 		try:
-			local_player_data: dict = self.api_get("lobby").json()["localMember"]
-			queued_role: str = local_player_data["firstPositionPreference"].strip().lower()
-			self.user_role = queued_role if queued_role != "fill" else ""
+			self.set_primary_role(self.api_get("lobby").json())
 		except Exception as e:
 			warnings.warn(f"Unable to find player's role: {e}", RuntimeWarning)
 
 		return self.user_role
 
+	def set_primary_role(self, lobby: dict) -> None:
+		""" Update the Connection with the role the user is queueing for, using lobby data from the client. """
+		queued_role: str = lobby["localMember"]["firstPositionPreference"].strip().lower()
+		self.user_role = queued_role if queued_role != "fill" else ""
+
 	# --------------
 	# Getter methods
 	# --------------
@@ -171,7 +373,7 @@ class Connection:
 			my_team = self.session["myTeam"]
 		except KeyError:
 			return self.user_role if self.user_role else ""
-		my_id = self.get_summoner_id()
+		my_id: int = self.summoner_id  # stored at startup (see run_startup_calls())
 		for player in my_team:
 			if player["summonerId"] == my_id:
 				role = player["assignedPosition"]
@@ -201,6 +403,13 @@ class Connection:
 		""" Get the current state of the game (Lobby, ChampSelect, etc.) """
 		return self.api_get("gamestate").json()
 
+	def get_game_version(self) -> str:
+		""" Get the version of the game client (changes every patch). Returns an empty string if unavailable. """
+		response: requests.Response = self.api_get("game_version")
+		if response.status_code != 200:
+			return ""
+		return response.json()
+
 	def get_localcellid(self) -> int:
 		""" Get the champselect cell id of the user. """
 		return self.session["localPlayerCellId"]
@@ -209,13 +418,37 @@ class Connection:
 		""" Get the summoner id of the user. """
 		return self.api_get("current_summoner").json()["accountId"]
 
+	def get_backup_champids(self, position: str, picking: bool = True) -> tuple[int, ...]:
+		"""
+		Get the ids of the backup champions listed in the user's config.
+		Args:
+			position: the position the user is playing
+			picking (True): a flag indicating whether the user is picking (True) or banning (False)
+		Returns:
+			a tuple of champion ids in order of preference
+		"""
+		if len(position) == 0:
+			warnings.warn(
+				f"Unable to find backup champions - the user wasn't assigned a role",
+				RuntimeWarning, stacklevel=2
+			)
+			return ()
+
+		# Config was changed without calling refresh_config()
+		if self.priority_tables_version != u.get_config_version():
+			self.reload_config_profile()
+			self.compile_priority_tables()
+
+		section_name: str = ("pick_" if picking else "ban_") + position
+		return self.priority_tables.get(section_name, ())
+
 	def get_champ_name_by_id(self, target_id: int) -> str:
 		""" Find the champion with the specified id number and return their name as a string. """
-		for name, id in self.all_champs.items():
-			if id == target_id:
-				return name
-		warnings.warn(f"Unable to find champion name with id {target_id}")
-		return "unknown"
+		name: str | None = self.champ_catalog.get_name(target_id)
+		if name is None:
+			warnings.warn(f"Unable to find champion name with id {target_id}")
+			return "unknown"
+		return name
 
 	def champ_exists(self, name: str) -> bool:
 		"""
@@ -223,20 +456,70 @@ class Connection:
 		"""
 		return formatting.clean_name(self.all_champs, name) != "invalid"
 
-	def re_parse_lockfile(self) -> None:
-		""" Re-parse the lockfile in case of a failed connection. """
-		try:
-			lockfile = self.parse_lockfile()
-		except champselect_exceptions.ClientConnectionError as e:
-			u.clean_exit(str(e))
+	def re_parse_lockfile(self, stop: threading.Event | None = None) -> None:
+		"""
+		Re-parse the lockfile in case of a failed connection. If the client has closed, wait for it to be started again
+		(running queued commands in the meantime) rather than exiting.
+		Args:
+			stop: (optional) an event that ends the wait early once it is set
+		"""
+		state: LockfileState | None = self.lockfile_watcher.wait_for_client(
+			lambda seconds: self.commands.run_for(seconds, stop), stop
+		)
+		if state is not None:
+			self.apply_lockfile(state)
 
-		self.request_url = self.get_request_url(lockfile)
-		self.http_headers = self.get_http_headers(lockfile)
+	def check_lockfile(self) -> bool:
+		"""
+		Check if the client has been restarted since the last check, and reconnect to the new instance if it has. Cheap
+		enough to call every main loop tick.
+		Returns:
+			True if the client is running, False otherwise
+		"""
+		if self.lockfile_watcher.poll():
+			self.apply_lockfile(self.lockfile_watcher.state)
+
+		if self.startup_pending and self.lockfile_watcher.state.client_is_running():
+			self.retry_startup_calls()
+		return self.lockfile_watcher.state.client_is_running()
+
+	def apply_lockfile(self, state: LockfileState) -> None:
+		""" Point API calls at the client instance described by the lockfile, if they don't already. """
+		request_url: str = self.get_request_url(state.lockfile)
+		http_headers: dict[str, str] = self.get_http_headers(state.lockfile)
+
+		# The client was restarted (new port/password) - pooled connections point at the old one, so start over
+		if request_url != self.request_url or http_headers != self.http_headers:
+			u.debug(f"Client restarted (pid {state.lockfile.pid}), reconnecting")
+			self.request_url, self.http_headers = request_url, http_headers
+			self.http_session.close()
+			self.http_session = http_session.build_session(self.http_headers)
+			# The new instance might be logged into a different account
+			self.startup_pending = True
+
+	def retry_startup_calls(self) -> None:
+		""" Re-run the startup calls for a new client instance, leaving them pending if the client isn't ready yet. """
+		try:
+			self.run_startup_calls()
+		except (
+			requests.exceptions.RequestException, champselect_exceptions.ClientNotReadyError, KeyError, ValueError
+		) as e:
+			# The client writes its lockfile a little while before it starts answering API calls
+			u.debug(f"Client isn't ready yet ({type(e).__name__}: {e})")
+			return
+		self.startup_pending = False
+		u.print_and_write("Reconnected to the League client.")
+
+	def warm_up_connections(self) -> None:
+		""" Open pooled connections to the client ahead of time, so that time-sensitive API calls skip the handshake. """
+		http_session.warm_up(self.http_session, self.request_url + self.endpoints["gamestate"])
 
 	def setup_http_requests(self) -> tuple[str, dict[str, str]]:
 		""" Set up the request URL and HTTP header data for API calls. """
-		lockfile = self.parse_lockfile()
-		return self.get_request_url(lockfile), self.get_http_headers(lockfile)
+		state: LockfileState = self.lockfile_watcher.check()
+		if not state.client_is_running():
+			raise champselect_exceptions.ClientConnectionError(MSG_CLIENT_CONNECTION_ERR)
+		return self.get_request_url(state.lockfile), self.get_http_headers(state.lockfile)
 
 	@staticmethod
 	def get_request_url(lockfile: u.Lockfile) -> str:
@@ -280,34 +563,55 @@ class Connection:
 			data: (optional) data to send with the HTTP request
 			should_print: (optional) a flag indicating whether or not to print debug info
 		"""
+		collect_metrics: bool = self.metrics.enabled
+		if collect_metrics:
+			label: str = metrics.endpoint_label(self.endpoints, endpoint)
+			self.metrics.call_started(label, method)
+
 		# Check if endpoint parameter is an alias for one stored in the endpoints dictionary, otherwise use as-is
 		endpoint = self.endpoints.get(endpoint, endpoint)
 
 		# Set up request URL
 		url = self.request_url + endpoint
-		headers = self.http_headers
-
-		# Choose proper http method
-		match method:
-			case "get":
-				request = requests.get
-			case "post":
-				request = requests.post
-			case "patch":
-				request = requests.patch
-			case "put":
-				request = requests.put
 
 		# Send the request
 		if should_print:  # debug print
 			u.print_and_write(f"Making API call...\n\tEndpoint: {endpoint}")
-		result = request(url, headers=headers, json=data, verify=False)
+		http_session.pop_connect_time()
+		start_time: float = time.perf_counter()
+		try:
+			result = self.http_session.request(method.upper(), url, json=data)
+		except requests.exceptions.RequestException:
+			if collect_metrics:
+				self.metrics.call_finished(label, method, None, time.perf_counter() - start_time)
+			raise
+		total_time: float = time.perf_counter() - start_time
+		if collect_metrics:
+			self.metrics.call_finished(label, method, result.status_code, total_time)
+
+		# Keep track of how much time was spent opening connections vs. actually sending/receiving data
+		connect_time: float = min(http_session.pop_connect_time(), total_time)
+		timing = http_session.CallTiming(endpoint, method, result.status_code, connect_time, total_time - connect_time)
+		self.call_timings.append(timing)
+
 		if should_print:  # debug print
-			u.print_and_write(f"\tResult: {result}\n")
+			u.print_and_write(f"\tResult: {result}\n\tTiming: {timing}\n")
+		else:
+			u.debug("\t", timing, sep="")
 		return result
 
 	def refresh_config(self):
 		""" Reload settings from the configuration file. """
-		self.lock_in_delay = int(u.get_config_option_str("settings", "lock_in_delay"))
+		self.reload_config_profile()
+		self.lock_in_delay = int(u.get_config_option_str("settings", "lock_in_delay", self.config))
 		# Overwrite changes made to the checkbox on the main interface - this is intentional, but may change
-		self.should_modify_runes = u.get_config_option_bool("settings", "auto_send_runes")
+		self.should_modify_runes = u.get_config_option_bool("settings", "auto_send_runes", self.config)
+		self.metrics.enabled = u.get_config_option_bool("settings", "collect_metrics", self.config)
+		self.profiler.configure(u.get_config_option_str("settings", "profile_main_loop", self.config))
+		self.journal.enabled = u.get_config_option_bool("settings", "journal_champselect", self.config)
+		self.compile_priority_tables()
+
+	def reload_config_profile(self) -> None:
+		""" Re-read this Connection's config profile, if it has one, to pick up changes to the user's config. """
+		if self.profile:
+			self.config = u.load_config_profile(self.profile)
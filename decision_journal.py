@@ -0,0 +1,159 @@
+from typing import IO, Any
+import threading
+import warnings
+import json
+import time
+import os
+
+from champselect_snapshot import ChampselectSnapshot
+from champselect_diff import ChampselectChange
+import utility as u
+
+JOURNAL_DIR: str = os.path.join(u.BASE_DIR, "journal")  # where champ select journals are written
+MAX_JOURNALS: int = 50  # number of journals to keep - the oldest ones are deleted when a new one is opened
+
+_prune_lock = threading.Lock()  # held while deleting old journals
+
+# Entry kinds
+OPENED: str = "opened"  # the journal was opened (wall clock time, for lining monotonic timestamps up with logs)
+SESSION: str = "session"  # a champselect session was consumed
+CANDIDATE: str = "candidate"  # a champion was checked as a possible pick or ban
+DECISION: str = "decision"  # the pick or ban intent was decided
+ACTION: str = "action"  # a hover, ban or pick was sent to the client
+LOCK_IN_WAIT: str = "lock_in_wait"  # the lock-in delay finished
+RUNES: str = "runes"  # a rune page was sent to the client (or skipped because it was already selected)
+SPELLS: str = "spells"  # summoner spells were sent to the client (or skipped)
+CLOSED: str = "closed"  # champ select ended
+
+
+class DecisionJournal:
+	"""
+	A Class to record every decision made during a champ select as JSON lines, one file per champ select, so that a
+	slow or wrong lock-in can be explained after the fact. Every entry has a "t" field: time.monotonic() when it was
+	recorded (the same clock the rest of the script uses). Recording does nothing unless a journal is open.
+	"""
+
+	def __init__(self, enabled: bool = True, name: str = ""):
+		"""
+		Args:
+			enabled: (optional) whether to write journals at all
+			name: (optional) added to the file names, to tell apart journals from different clients (see supervisor.py)
+		"""
+		self.enabled: bool = enabled
+		self.name: str = name
+		self.path: str | None = None  # path of the open journal, or the last one if none is open
+		self._file: IO[str] | None = None
+		self._revision: int = 0  # number of sessions consumed during this champ select
+		self._lock = threading.Lock()
+
+	def is_open(self) -> bool:
+		return self._file is not None
+
+	def open(self) -> None:
+		""" Start a new journal for a new champ select, closing the last one if it's still open. """
+		self.close()
+		if not self.enabled:
+			return
+
+		try:
+			os.makedirs(JOURNAL_DIR, exist_ok=True)
+			self._delete_old_journals()
+			path, file = self._create_file()
+		except OSError as e:
+			warnings.warn(f"Unable to open the champ select journal: {e}", RuntimeWarning)
+			return
+
+		with self._lock:
+			self.path = path
+			self._file = file
+			self._revision = 0
+		self.record(OPENED, wallTime=time.time())
+
+	def close(self) -> None:
+		""" Finish the current journal, if there is one. """
+		if not self.is_open():
+			return
+		self.record(CLOSED, sessions=self._revision)
+		with self._lock:
+			self._file.close()
+			self._file = None
+
+	def record(self, kind: str, t: float | None = None, **fields: Any) -> None:
+		"""
+		Add an entry to the journal.
+		Args:
+			kind: the kind of entry (SESSION, ACTION, etc.)
+			t: (optional) the time.monotonic() timestamp to record - defaults to now
+			fields: the data to record
+		"""
+		if self._file is None:
+			return
+		entry: dict = {"t": round(time.monotonic() if t is None else t, 4), "kind": kind, **fields}
+		line: str = json.dumps(entry, separators=(",", ":"), default=_to_json)
+		with self._lock:
+			if self._file is not None:
+				self._file.write(line + "\n")
+
+	def record_session(self, snapshot: ChampselectSnapshot, changes: list[ChampselectChange]) -> None:
+		""" Record a consumed champselect session, along with what changed since the last one. """
+		if self._file is None:
+			return
+		self._revision += 1
+		self.record(
+			SESSION,
+			t=snapshot.received_at,
+			rev=self._revision,
+			phase=snapshot.phase,
+			timeLeftMs=snapshot.time_left_ms,
+			clientNowMs=snapshot.client_now_ms,
+			turnsUntilMyAction=snapshot.turns_until_my_action,
+			changes=[[change.kind, change.value] for change in changes],
+		)
+
+	def _create_file(self) -> tuple[str, IO[str]]:
+		""" Create a new journal file, never reusing an existing one (e.g. two champ selects started in one second). """
+		now: float = time.time()
+		timestamp: str = f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(now))}_{int(now % 1 * 1000):03d}"
+		base_name: str = f"champselect_{self.name}_{timestamp}" if self.name else f"champselect_{timestamp}"
+
+		attempt: int = 0
+		while True:
+			path: str = os.path.join(JOURNAL_DIR, f"{base_name}_{attempt}.jsonl" if attempt else f"{base_name}.jsonl")
+			try:
+				return path, open(path, "x", encoding="utf-8", buffering=1)  # line buffered - flush every entry
+			except FileExistsError:
+				attempt += 1
+
+	@staticmethod
+	def _delete_old_journals() -> None:
+		# Several clients (see supervisor.py) can open journals at the same time - don't let them prune at once
+		with _prune_lock:
+			# File names start with the client's name (if any), so sort by age rather than by name
+			ages: list[tuple[float, str]] = []
+			for name in os.listdir(JOURNAL_DIR):
+				if not name.endswith(".jsonl"):
+					continue
+				path: str = os.path.join(JOURNAL_DIR, name)
+				try:
+					ages.append((os.path.getmtime(path), path))
+				except FileNotFoundError:
+					pass  # deleted by something else in the meantime
+
+			ages.sort()
+			for _, path in ages[:max(len(ages) - MAX_JOURNALS + 1, 0)]:
+				try:
+					os.remove(path)
+				except FileNotFoundError:
+					pass
+
+
+def elapsed_ms(since: float) -> float:
+	""" Get the number of milliseconds since a time.monotonic() timestamp, rounded for the journal. """
+	return round((time.monotonic() - since) * 1000, 1)
+
+
+def _to_json(value: Any) -> Any:
+	""" Convert values json can't handle on its own (sets, read-only dicts, etc.) """
+	if isinstance(value, (set, frozenset)):
+		return sorted(value)
+	return dict(value)
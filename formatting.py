@@ -1,3 +1,19 @@
+from typing import Mapping
+
+# Names of champions as they're shown in the client, keyed by cleaned name. Only used when no champion catalog's names
+# are passed to champ() - Connections pass their own (see Connection.format_champ()), since each can be on a different
+# game version.
+_display_names: dict[str, str] = {}
+
+# Characters removed from champion names by clean_string()
+_ILLEGAL_CHARS: dict[int, None] = str.maketrans("", "", " '.")
+
+# Display names that differ from the client's on purpose
+DISPLAY_NAME_OVERRIDES: dict[str, str] = {
+	"neeko": "Not Neeko",
+}
+
+
 def gamestate(gamestate: str) -> str:
 	""" Format the gamestate to be more readable for the user, e.g. 'None' -> 'Main Menu' """
 	match gamestate:
@@ -71,18 +87,35 @@ def clean_name(all_champs: dict[str, int], name: str, should_filter: bool = True
 
 def clean_string(string: str) -> str:
 	""" Remove whitespace and illegal characters from a string, and convert it to lowercase. """
-	illegal = (" ", "'", ".")
-	new_string = ""
-	for char in string:
-		if char not in illegal:
-			new_string += char.lower()
-	return new_string
+	return string.translate(_ILLEGAL_CHARS).lower()
+
+
+def set_display_names(display_names: dict[str, str]) -> None:
+	"""
+	Set the names used to display champions to the user.
+	Args:
+		display_names: a dictionary mapping cleaned champion names to the name shown in the client
+	"""
+	global _display_names
+	_display_names = {**display_names, **DISPLAY_NAME_OVERRIDES}
 
 
-def champ(name: str) -> str:
-	""" Format a champion name for user-facing display. Does NOT perform input validation. """
+def champ(name: str, display_names: Mapping[str, str] | None = None) -> str:
+	"""
+	Format a champion name for user-facing display. Does NOT perform input validation.
+	Args:
+		name: the cleaned champion name
+		display_names: (optional) names as shown in the client, keyed by cleaned name (see ChampionCatalog) - defaults
+			to the ones set with set_display_names()
+	"""
 	# This method is intended to be used only for display to the user; clean_name is used internally
-	# There may be an endpoint provided by the LCU API for this, but this is good enough (for now ?).
+	display_name: str | None = DISPLAY_NAME_OVERRIDES.get(name) or (
+		display_names if display_names is not None else _display_names
+	).get(name)
+	if display_name is not None:
+		return display_name
+
+	# Fall back to formatting the name by hand if the champion catalog hasn't been loaded (or doesn't have them)
 	name = capitalize(name)
 	match name:
 		case "Belveth" | "Kaisa" | "Reksai" | "Kogmaw" | "Velkoz":
@@ -1,4 +1,6 @@
 let startButton = document.getElementById("startbutton");
+let statusEvents = null;  // EventSource for status updates from the script
+let shownReasons = new Set();  // invalid pick/ban reasons that have already been shown to the user
 
 /**
  * Make an API call.
@@ -152,6 +154,19 @@ async function formatName(name) {
 }
 
 
+/**
+ * Get the display names of champions matching a partial name. If unable to, return an empty list instead.
+ * @param query the partial (or misspelled) champion name
+ */
+async function getSuggestions(query) {
+	let response = await get(`data/autocomplete?q=${encodeURIComponent(query)}&limit=8`);
+	if (response && response["success"]) {
+		return response["data"].map((candidate) => candidate["displayName"]);
+	}
+	return [];
+}
+
+
 /**
  * Set the user's preference for whether or not their runes should be changed by the script.
  */
@@ -208,6 +223,53 @@ async function updateStatus() {
 }
 
 
+/**
+ * Listen for status updates pushed by the script, and update the display as soon as one arrives.
+ */
+function listenForStatus() {
+	if (statusEvents !== null) {
+		statusEvents.close();
+	}
+	statusEvents = new EventSource("http://127.0.0.1:42069/events");
+
+	statusEvents.addEventListener("status", (event) => {
+		displayStatus(JSON.parse(event.data));
+	});
+
+	statusEvents.onerror = async () => {
+		// The browser reconnects on its own, unless the server refused the connection (e.g. the script isn't running)
+		if (statusEvents.readyState === EventSource.CLOSED) {
+			statusEvents = null;
+			await updateStatus();
+		}
+	};
+}
+
+
+/**
+ * Show a status update from the script.
+ * @param status the status sent by the /events endpoint
+ */
+function displayStatus(status) {
+	scriptCurrentlyRunning = true;
+	pickDisplay.textContent = status["pick"];
+	banDisplay.textContent = status["ban"];
+	gamestateDisplay.textContent = status["gamestate"] ?? "";
+	roleDisplay.textContent = status["role"] ?? "";
+	statusDisplay.textContent = "Running!";
+	startButton.disabled = true;
+	document.getElementById("setrunes").checked = status["setRunes"];
+
+	// Only show each invalid pick/ban reason once
+	for (let reason of [...status["invalidPicks"], ...status["invalidBans"]]) {
+		if (! shownReasons.has(reason)) {
+			shownReasons.add(reason);
+			showUser(reason);
+		}
+	}
+}
+
+
 /**
  * Check if the script is currently running.
  */
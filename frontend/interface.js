@@ -17,12 +17,38 @@ function setUpStartButton() {
 		event.preventDefault();
 
 		scriptCurrentlyRunning = await startScript();
+		if (scriptCurrentlyRunning) {
+			listenForStatus();
+		}
+	});
+}
+
+/**
+ * Suggest champion names in a text box's dropdown as the user types.
+ * @param input the text box
+ * @param datalist the datalist element attached to the text box
+ */
+function setUpAutocomplete(input, datalist) {
+	input.addEventListener("input", async (event) => {
+		let query = event.target.value;
+		let suggestions = query === "" ? [] : await getSuggestions(query);
+
+		// Ignore responses for text the user has already changed
+		if (event.target.value !== query) {
+			return;
+		}
+		datalist.replaceChildren(...suggestions.map((name) => {
+			let option = document.createElement("option");
+			option.value = name;
+			return option;
+		}));
 	});
 }
 
 function setUpPickInput() {
 	// Take input for the desired pick
 	let pickInput = document.getElementById("pick-intent-input");
+	setUpAutocomplete(pickInput, document.getElementById("pick-suggestions"));
 	pickInput.addEventListener("blur", async (event) => {
 		event.preventDefault();
 
@@ -46,6 +72,7 @@ function setUpPickInput() {
 function setUpBanInput() {
 	// Take input for the desired ban
 	let banInput = document.getElementById("ban-intent-input");
+	setUpAutocomplete(banInput, document.getElementById("ban-suggestions"));
 	banInput.addEventListener("blur", async (event) => {
 		event.preventDefault();
 
@@ -145,10 +172,9 @@ async function main() {
 		// Only try to start the script automatically once. If that fails, wait for user to start manually
 		scriptCurrentlyRunning = await scriptIsRunning();
 		await updateStatus();
-		setInterval(async () => {
-			if (scriptCurrentlyRunning) {
-				await updateStatus();
-			}
-		}, 3000);
+		// The script pushes its status whenever it changes, so there's no need to keep asking for it
+		if (scriptCurrentlyRunning) {
+			listenForStatus();
+		}
 	});
 }
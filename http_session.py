@@ -0,0 +1,119 @@
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from requests.adapters import HTTPAdapter
+from dataclasses import dataclass
+import threading
+import requests
+import time
+
+POOL_SIZE: int = 4  # max number of keep-alive connections to hold open to the client
+
+# Time spent opening connections (TCP + TLS handshake) on the current thread since the last call to pop_connect_time()
+_connect_time = threading.local()
+
+
+@dataclass
+class CallTiming:
+	""" A Class to store timing info about a single API call. """
+	endpoint: str
+	method: str
+	status: int
+	connect_seconds: float  # time spent opening a new connection (0 if a pooled connection was reused)
+	transfer_seconds: float  # time spent sending the request and receiving the response
+
+	@property
+	def total_seconds(self) -> float:
+		return self.connect_seconds + self.transfer_seconds
+
+	@property
+	def reused_connection(self) -> bool:
+		return self.connect_seconds == 0
+
+	def __str__(self) -> str:
+		return (
+			f"{self.method.upper()} {self.endpoint} -> {self.status} in {self.total_seconds * 1000:.1f}ms "
+			f"(connect {self.connect_seconds * 1000:.1f}ms, transfer {self.transfer_seconds * 1000:.1f}ms)"
+		)
+
+
+def _add_connect_time(seconds: float) -> None:
+	_connect_time.seconds = getattr(_connect_time, "seconds", 0.0) + seconds
+
+
+def pop_connect_time() -> float:
+	""" Return the time spent opening connections on this thread since the last call, and reset the counter. """
+	seconds: float = getattr(_connect_time, "seconds", 0.0)
+	_connect_time.seconds = 0.0
+	return seconds
+
+
+class _TimedHTTPConnection(HTTPConnection):
+	def connect(self):
+		start: float = time.perf_counter()
+		super().connect()
+		_add_connect_time(time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+	def connect(self):
+		start: float = time.perf_counter()
+		super().connect()  # includes the TLS handshake
+		_add_connect_time(time.perf_counter() - start)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+	ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+	ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+	""" An HTTPAdapter whose connections record how long it took to open them. """
+
+	def init_poolmanager(self, *args, **kwargs):
+		super().init_poolmanager(*args, **kwargs)
+		self.poolmanager.pool_classes_by_scheme = {
+			"http": _TimedHTTPConnectionPool,
+			"https": _TimedHTTPSConnectionPool,
+		}
+
+
+def build_session(headers: dict[str, str]) -> requests.Session:
+	"""
+	Build a keep-alive HTTP session for talking to the League client.
+	Args:
+		headers: the http headers to send with every request (auth, etc.)
+	"""
+	session = requests.Session()
+	session.headers.update(headers)
+	session.verify = False  # the client uses a self-signed certificate
+
+	adapter = _TimedAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+	session.mount("https://", adapter)
+	session.mount("http://", adapter)
+	return session
+
+
+def warm_up(session: requests.Session, url: str, count: int = POOL_SIZE) -> None:
+	"""
+	Open up to ``count`` pooled connections ahead of time, so that later requests don't have to pay for a handshake.
+	Args:
+		session: the session to warm up
+		url: the url to send (cheap) GET requests to
+		count: the number of connections to open
+	"""
+	def send():
+		try:
+			session.get(url)
+		except requests.exceptions.RequestException:
+			pass
+		pop_connect_time()  # don't let warm-up handshakes show up in the timing of later calls
+
+	# Requests need to be sent at the same time, otherwise they'd all reuse the same connection
+	threads = [threading.Thread(target=send) for _ in range(count)]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
@@ -0,0 +1,123 @@
+from dataclasses import dataclass
+import threading
+import warnings
+import queue
+import json
+import ssl
+
+import connect as c
+import utility as u
+
+# WAMP message types used by the LCU websocket
+WAMP_SUBSCRIBE: int = 5
+WAMP_EVENT: int = 8
+
+# URIs of the events we care about
+GAMEFLOW_URI: str = "/lol-gameflow/v1/gameflow-phase"
+READY_CHECK_URI: str = "/lol-matchmaking/v1/ready-check"
+CHAMPSELECT_URI: str = "/lol-champ-select/v1/session"
+
+SUBSCRIPTIONS: tuple[str, ...] = (
+	"OnJsonApiEvent_lol-gameflow_v1_gameflow-phase",
+	"OnJsonApiEvent_lol-matchmaking_v1_ready-check",
+	"OnJsonApiEvent_lol-champ-select_v1_session",
+)
+
+
+@dataclass
+class LcuEvent:
+	""" A Class to store a single event pushed by the League client. """
+	uri: str
+	event_type: str  # Create, Update, or Delete
+	data: object
+
+
+class EventListener:
+	"""
+	A Class to manage a websocket subscription to the League client's events. Events are read on a background thread
+	and handed to the caller through a queue.
+	"""
+
+	def __init__(self, connection: c.Connection):
+		self._connection: c.Connection = connection
+		self._events: queue.Queue[LcuEvent | None] = queue.Queue()
+		self._socket = None
+		self._thread: threading.Thread | None = None
+		self._closed = threading.Event()
+
+	def start(self) -> bool:
+		""" Connect to the client's websocket and subscribe to events. Return a bool indicating success. """
+		try:
+			import websocket  # lazy import - websocket-client is an optional dependency
+		except ImportError:
+			warnings.warn("Package 'websocket-client' is not installed - falling back to polling", RuntimeWarning)
+			return False
+
+		url: str = self._connection.request_url.replace("https://", "wss://").replace("http://", "ws://") + "/"
+		try:
+			self._socket = websocket.create_connection(
+				url,
+				header=[f"Authorization: {self._connection.http_headers['Authorization']}"],
+				sslopt={"cert_reqs": ssl.CERT_NONE},  # the client uses a self-signed certificate
+			)
+			for subscription in SUBSCRIPTIONS:
+				self._socket.send(json.dumps([WAMP_SUBSCRIBE, subscription]))
+		except Exception as e:
+			warnings.warn(f"Unable to subscribe to client events, falling back to polling: {e}", RuntimeWarning)
+			self.stop()
+			return False
+
+		self._thread = threading.Thread(target=self._read_events, daemon=True)
+		self._thread.start()
+		return True
+
+	def stop(self) -> None:
+		""" Close the websocket. """
+		self._closed.set()
+		if self._socket is not None:
+			try:
+				self._socket.close()
+			except Exception:
+				pass
+
+	def is_alive(self) -> bool:
+		""" Check whether or not the websocket is still open. """
+		return not self._closed.is_set()
+
+	def get(self, timeout: float) -> LcuEvent | None:
+		""" Wait for the next event. Returns None if no event arrived in time, or if the websocket was closed. """
+		try:
+			return self._events.get(timeout=timeout)
+		except queue.Empty:
+			return None
+
+	def _read_events(self) -> None:
+		""" Read events from the websocket until it closes. """
+		try:
+			while not self._closed.is_set():
+				message: str = self._socket.recv()
+				if not message:  # empty messages are sent on subscription
+					continue
+
+				event = parse_event(message)
+				if event is not None:
+					self._events.put(event)
+
+		except Exception as e:
+			if not self._closed.is_set():
+				u.print_and_write(f"Lost connection to the client's event stream: {e}")
+		finally:
+			self._closed.set()
+			self._events.put(None)  # wake up anyone waiting for an event
+
+
+def parse_event(message: str) -> LcuEvent | None:
+	""" Parse a message from the websocket. Returns None if the message isn't an event. """
+	try:
+		opcode, _, payload = json.loads(message)
+	except (ValueError, TypeError):
+		return None
+
+	if opcode != WAMP_EVENT:
+		return None
+	return LcuEvent(payload["uri"], payload["eventType"], payload["data"])
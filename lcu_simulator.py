@@ -0,0 +1,816 @@
+# A stand-in for the League client's API, for developing and benchmarking without a live client.
+#
+# The simulator writes a lockfile to the chosen directory and walks through a scripted gameflow:
+# Lobby -> Matchmaking -> ReadyCheck -> ChampSelect (PLANNING, BAN_PICK, FINALIZATION) -> InProgress
+# To point the script at it, set the 'directory' option in config.ini to the same directory.
+#
+# Usage: python lcu_simulator.py [directory] [--scenario scenarios/default.json] [--latency 5]
+#
+# Only the HTTP API is simulated - the websocket event stream isn't, so use_event_stream falls back to polling.
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dataclasses import dataclass, field
+from base64 import b64encode
+import threading
+import argparse
+import secrets
+import random
+import json
+import time
+import ssl
+import os
+import re
+
+# (id, alias, name) for each champion the simulated client knows about
+CHAMPIONS: tuple[tuple[int, str, str], ...] = (
+	(1, "Annie", "Annie"),
+	(3, "Galio", "Galio"),
+	(4, "TwistedFate", "Twisted Fate"),
+	(5, "XinZhao", "Xin Zhao"),
+	(7, "Leblanc", "LeBlanc"),
+	(11, "MasterYi", "Master Yi"),
+	(12, "Alistar", "Alistar"),
+	(16, "Soraka", "Soraka"),
+	(17, "Teemo", "Teemo"),
+	(19, "Warwick", "Warwick"),
+	(20, "Nunu", "Nunu & Willump"),
+	(21, "MissFortune", "Miss Fortune"),
+	(24, "Jax", "Jax"),
+	(25, "Morgana", "Morgana"),
+	(32, "Amumu", "Amumu"),
+	(33, "Rammus", "Rammus"),
+	(34, "Anivia", "Anivia"),
+	(36, "DrMundo", "Dr. Mundo"),
+	(40, "Janna", "Janna"),
+	(45, "Veigar", "Veigar"),
+	(51, "Caitlyn", "Caitlyn"),
+	(59, "JarvanIV", "Jarvan IV"),
+	(61, "Orianna", "Orianna"),
+	(62, "MonkeyKing", "Wukong"),
+	(64, "LeeSin", "Lee Sin"),
+	(76, "Nidalee", "Nidalee"),
+	(81, "Ezreal", "Ezreal"),
+	(82, "Mordekaiser", "Mordekaiser"),
+	(84, "Akali", "Akali"),
+	(89, "Leona", "Leona"),
+	(96, "KogMaw", "Kog'Maw"),
+	(101, "Xerath", "Xerath"),
+	(103, "Ahri", "Ahri"),
+	(111, "Nautilus", "Nautilus"),
+	(114, "Fiora", "Fiora"),
+	(119, "Draven", "Draven"),
+	(122, "Darius", "Darius"),
+	(131, "Diana", "Diana"),
+	(134, "Syndra", "Syndra"),
+	(136, "AurelionSol", "Aurelion Sol"),
+	(141, "Kayn", "Kayn"),
+	(143, "Zyra", "Zyra"),
+	(145, "Kaisa", "Kai'Sa"),
+	(154, "Zac", "Zac"),
+	(161, "Velkoz", "Vel'Koz"),
+	(200, "Belveth", "Bel'Veth"),
+	(202, "Jhin", "Jhin"),
+	(222, "Jinx", "Jinx"),
+	(223, "TahmKench", "Tahm Kench"),
+	(233, "Briar", "Briar"),
+	(234, "Viego", "Viego"),
+	(240, "Kled", "Kled"),
+	(254, "Vi", "Vi"),
+	(266, "Aatrox", "Aatrox"),
+	(267, "Nami", "Nami"),
+	(350, "Yuumi", "Yuumi"),
+	(360, "Samira", "Samira"),
+	(420, "Illaoi", "Illaoi"),
+	(421, "RekSai", "Rek'Sai"),
+	(517, "Sylas", "Sylas"),
+	(518, "Neeko", "Neeko"),
+	(555, "Pyke", "Pyke"),
+	(875, "Sett", "Sett"),
+	(897, "KSante", "K'Sante"),
+	(902, "Milio", "Milio"),
+)
+CHAMPION_IDS: dict[str, int] = {alias.lower(): champid for champid, alias, _ in CHAMPIONS}
+
+POSITIONS: tuple[str, ...] = ("top", "jungle", "middle", "bottom", "utility")
+ACCOUNT_ID: int = 2468013579
+SUMMONER_ID: int = 97531
+FLASH: int = 4
+IGNITE: int = 14
+TELEPORT: int = 12
+
+# Blue side picks 1-2-2-2-2-1 with red side, starting from cell 0
+PICK_ORDER: tuple[tuple[int, ...], ...] = ((0,), (5, 6), (1, 2), (7, 8), (3, 4), (9,))
+
+
+@dataclass
+class Scenario:
+	""" A Class to store the script for a simulated game. Loaded from a JSON file with the same keys. """
+	local_cell_id: int = 2  # 0-4 is the local player's team, 5-9 is the enemy team
+	position: str = "middle"  # the position the local player is queueing for and is assigned
+	latency_ms: float = 0  # delay before each response is sent
+	latency_jitter_ms: float = 0  # random extra delay (0 to this value) added to each response
+	queue_automatically: bool = False  # start matchmaking without waiting for the script to start the queue
+	matchmaking_seconds: float = 1
+	ready_check_seconds: float = 10  # time until the ready check is declined if nobody accepts it
+	planning_seconds: float = 3
+	ban_seconds: float = 5
+	pick_seconds: float = 5  # length of each pick turn
+	finalization_seconds: float = 5
+	bot_action_seconds: float = 1  # how long other players take to ban or lock in after their turn starts
+	bans: dict[str, str] = field(default_factory=dict)  # cell id -> champion alias banned by that player
+	picks: dict[str, str] = field(default_factory=dict)  # cell id -> champion alias picked by that player
+	owned: list[str] | None = None  # champion aliases the local player owns (all of them if None)
+	dodges: list[str] = field(default_factory=list)  # a champselect phase per dodge, e.g. ["BAN_PICK"]
+	dodge_after_seconds: float = 1  # how far into the phase the dodge happens
+	runepages: list[str] = field(default_factory=lambda: ["Page 1", "Page 2"])  # names of existing rune pages
+	max_runepages: int = 5
+	inventory_404: bool = False  # simulate the "Champion data has not yet been received" error
+	game_version: str = "15.20.715.1234"
+
+	@classmethod
+	def load(cls, path: str) -> "Scenario":
+		""" Load a scenario from a JSON file. """
+		with open(path) as file:
+			return cls(**json.load(file))
+
+
+class SimulatedClient:
+	"""
+	A Class to store the state of a simulated League client. The gameflow is advanced by a background thread, while
+	API calls from the HTTP server read and modify the state under a lock.
+	"""
+
+	TICK_SECONDS: float = 0.01
+
+	def __init__(self, scenario: Scenario):
+		self.scenario: Scenario = scenario
+		self.lock = threading.RLock()
+		self.gameflow: str = "Lobby"
+		self.phase_started: float = time.monotonic()
+		self.in_game = threading.Event()  # set once the game starts
+
+		# Champselect state
+		self.session: dict = {}
+		self.phase: str = ""
+		self.phase_deadline: float = 0
+		self.pick_turn: int = -1  # index of the action group in progress (0 is the ban group), or -1 during planning
+		self.dodges_left: list[str] = list(scenario.dodges)
+
+		# Rune pages
+		self.runepages: list[dict] = []
+		self.next_page_id: int = 1000
+		for name in scenario.runepages:
+			self._add_runepage({"name": name, "isDeletable": True})
+
+		# Instrumentation - used by the benchmarks
+		self.calls: list[tuple[float, str, str, int]] = []  # (time, method, path, status) for each API call
+		self.action_timings: list[dict] = []  # when each of the local player's actions started and was completed
+		self.champselect_started: float | None = None  # when the most recent champselect started
+		self.game_started: float | None = None
+
+	# ---------
+	# Gameflow
+	# ---------
+	def run(self, stop: threading.Event) -> None:
+		""" Advance the gameflow until ``stop`` is set. """
+		while not stop.is_set():
+			with self.lock:
+				self.tick(time.monotonic())
+			time.sleep(self.TICK_SECONDS)
+
+	def tick(self, now: float) -> None:
+		""" Advance the gameflow based on the current time. """
+		elapsed: float = now - self.phase_started
+		match self.gameflow:
+			case "Lobby":
+				if self.scenario.queue_automatically:
+					self.set_gameflow("Matchmaking")
+			case "Matchmaking":
+				if elapsed >= self.scenario.matchmaking_seconds:
+					self.set_gameflow("ReadyCheck")
+			case "ReadyCheck":
+				if elapsed >= self.scenario.ready_check_seconds:
+					self.set_gameflow("Matchmaking")
+			case "ChampSelect":
+				self.tick_champselect(now)
+
+	def set_gameflow(self, gameflow: str) -> None:
+		self.gameflow = gameflow
+		self.phase_started = time.monotonic()
+		if gameflow == "ChampSelect":
+			self.champselect_started = self.phase_started
+			self.start_champselect()
+		else:
+			self.session = {}
+			self.phase = ""
+		if gameflow == "InProgress":
+			self.game_started = self.phase_started
+			self.in_game.set()
+
+	def start_champselect(self) -> None:
+		""" Build a fresh champselect session. """
+		local: int = self.scenario.local_cell_id
+		ally_cells = range(0, 5) if local < 5 else range(5, 10)
+		actions: list[list[dict]] = []
+		action_id: int = 1
+
+		# All bans happen at the same time
+		ban_group: list[dict] = []
+		for cell in range(10):
+			ban_group.append(self._new_action(action_id, cell, "ban", cell in ally_cells))
+			action_id += 1
+		actions.append(ban_group)
+
+		for turn, cells in enumerate(PICK_ORDER):
+			group: list[dict] = []
+			for cell in cells:
+				action = self._new_action(action_id, cell, "pick", cell in ally_cells)
+				action["pickTurn"] = turn + 1
+				group.append(action)
+				action_id += 1
+			actions.append(group)
+
+		def player(cell: int) -> dict:
+			return {
+				"cellId": cell,
+				"championId": 0,
+				"championPickIntent": 0,
+				"summonerId": SUMMONER_ID if cell == local else 1000 + cell,
+				"assignedPosition": POSITIONS[cell % 5] if cell != local else self.scenario.position,
+				"spell1Id": FLASH,
+				"spell2Id": IGNITE,
+				"team": 1 if cell < 5 else 2,
+			}
+
+		self.session = {
+			"actions": actions,
+			"bans": {"myTeamBans": [], "theirTeamBans": [], "numBans": 10},
+			"localPlayerCellId": local,
+			"myTeam": [player(cell) for cell in ally_cells],
+			"theirTeam": [player(cell) for cell in range(10) if cell not in ally_cells],
+			"timer": {},
+			"isSpectating": False,
+		}
+		self.pick_turn = -1
+		self.set_phase("PLANNING", self.scenario.planning_seconds)
+
+		# Allies show what they want to play during planning
+		for action in self.pick_actions():
+			if action["isAllyAction"] and action["actorCellId"] != local:
+				action["championId"] = self._champid(self.scenario.picks.get(str(action["actorCellId"]), ""))
+
+	def set_phase(self, phase: str, duration: float) -> None:
+		now: float = time.monotonic()
+		self.phase = phase
+		self.phase_started = now
+		self.phase_deadline = now + duration
+		self.session["timer"] = {
+			"phase": phase,
+			"adjustedTimeLeftInPhase": int(duration * 1000),
+			"totalTimeInPhase": int(duration * 1000),
+			"internalNowInEpochMs": int(time.time() * 1000),
+			"isInfinite": False,
+		}
+
+	def tick_champselect(self, now: float) -> None:
+		""" Advance champselect based on the current time. """
+		# Someone dodges
+		if (
+			self.dodges_left and self.dodges_left[0] == self.phase
+			and now - self.phase_started >= self.scenario.dodge_after_seconds
+		):
+			self.dodges_left.pop(0)
+			self.set_gameflow("Matchmaking")
+			return
+
+		self.session["timer"]["adjustedTimeLeftInPhase"] = max(0, int((self.phase_deadline - now) * 1000))
+		self.session["timer"]["internalNowInEpochMs"] = int(time.time() * 1000)
+
+		# Other players act partway through their turn
+		if self.phase == "BAN_PICK" and now - self.phase_started >= self.scenario.bot_action_seconds:
+			for action in self.current_actions():
+				if action["actorCellId"] != self.scenario.local_cell_id and not action["completed"]:
+					self.bot_act(action)
+
+		if now < self.phase_deadline and not (self.phase == "BAN_PICK" and self.turn_is_complete()):
+			return
+
+		match self.phase:
+			case "PLANNING":
+				self.start_turn(0)
+			case "BAN_PICK":
+				self.end_turn()
+			case "FINALIZATION":
+				self.set_gameflow("InProgress")
+
+	def start_turn(self, group_index: int) -> None:
+		""" Start the specified action group (the ban group is index 0, and each pick turn follows it). """
+		self.pick_turn = group_index
+		group: list[dict] = self.session["actions"][group_index]
+		duration = self.scenario.ban_seconds if group_index == 0 else self.scenario.pick_seconds
+		self.set_phase("BAN_PICK", duration)
+		for action in group:
+			action["isInProgress"] = True
+			if action["actorCellId"] == self.scenario.local_cell_id:
+				self.action_timings.append({
+					"actionId": action["id"],
+					"type": action["type"],
+					"started": time.monotonic(),
+					"completed": None,
+				})
+
+	def end_turn(self) -> None:
+		""" End the current action group, completing any leftover actions, and start the next one. """
+		group: list[dict] = self.session["actions"][self.pick_turn]
+		for action in group:
+			if not action["completed"]:
+				# Local player didn't lock in - in the real client, this counts as a dodge
+				if action["type"] == "pick" and action["actorCellId"] == self.scenario.local_cell_id:
+					self.set_gameflow("Lobby")
+					return
+				if action["type"] == "ban":
+					action["championId"] = 0
+				action["completed"] = True
+			action["isInProgress"] = False
+
+		if self.pick_turn == 0:
+			self.session["bans"]["myTeamBans"] = [a["championId"] for a in group if a["isAllyAction"] and a["championId"]]
+			self.session["bans"]["theirTeamBans"] = [
+				a["championId"] for a in group if not a["isAllyAction"] and a["championId"]
+			]
+
+		if self.pick_turn + 1 < len(self.session["actions"]):
+			self.start_turn(self.pick_turn + 1)
+		else:
+			self.set_phase("FINALIZATION", self.scenario.finalization_seconds)
+
+	def turn_is_complete(self) -> bool:
+		return all(action["completed"] for action in self.current_actions())
+
+	def bot_act(self, action: dict) -> None:
+		""" Complete an action for a player other than the local one, as described by the scenario. """
+		cell: str = str(action["actorCellId"])
+		if action["type"] == "ban":
+			champid: int = self._champid(self.scenario.bans.get(cell, ""))
+		else:
+			champid = self._champid(self.scenario.picks.get(cell, ""))
+			if champid in self.unavailable_champids():
+				champid = 0
+		action["championId"] = champid
+		action["completed"] = True
+		if action["type"] == "pick":
+			self._player(action["actorCellId"])["championId"] = champid
+
+	# -------
+	# Helpers
+	# -------
+	def current_actions(self) -> list[dict]:
+		if self.pick_turn < 0:
+			return []
+		return self.session["actions"][self.pick_turn]
+
+	def pick_actions(self) -> list[dict]:
+		return [action for group in self.session["actions"] for action in group if action["type"] == "pick"]
+
+	def local_action(self, action_type: str) -> dict | None:
+		for group in self.session.get("actions", []):
+			for action in group:
+				if action["actorCellId"] == self.scenario.local_cell_id and action["type"] == action_type:
+					return action
+		return None
+
+	def banned_champids(self) -> set[int]:
+		# Bans are only revealed at the end of the ban turn - until then, players can ban the same champion
+		return set(self.session["bans"]["myTeamBans"] + self.session["bans"]["theirTeamBans"])
+
+	def unavailable_champids(self) -> set[int]:
+		""" Get the ids of all champions that are banned or have been locked in. """
+		locked: set[int] = {a["championId"] for a in self.pick_actions() if a["completed"] and a["championId"]}
+		return locked | self.banned_champids()
+
+	def owned_champions(self) -> list[tuple[int, str, str]]:
+		if self.scenario.owned is None:
+			return list(CHAMPIONS)
+		owned: set[str] = {alias.lower() for alias in self.scenario.owned}
+		return [champ for champ in CHAMPIONS if champ[1].lower() in owned]
+
+	def _player(self, cell: int) -> dict:
+		for player in self.session["myTeam"] + self.session["theirTeam"]:
+			if player["cellId"] == cell:
+				return player
+		raise KeyError(cell)
+
+	@staticmethod
+	def _champid(alias: str) -> int:
+		return CHAMPION_IDS.get(alias.lower().replace(" ", "").replace("'", "").replace(".", ""), 0)
+
+	@staticmethod
+	def _new_action(action_id: int, cell: int, action_type: str, is_ally: bool) -> dict:
+		return {
+			"id": action_id,
+			"actorCellId": cell,
+			"championId": 0,
+			"completed": False,
+			"isAllyAction": is_ally,
+			"isInProgress": False,
+			"pickTurn": 0,
+			"type": action_type,
+		}
+
+	def _add_runepage(self, page: dict) -> dict:
+		new_page: dict = {
+			"id": self.next_page_id,
+			"name": page.get("name", ""),
+			"current": page.get("current", False),
+			"isDeletable": True,
+			"isEditable": True,
+			"isActive": False,
+			"order": page.get("order", 0),
+			"primaryStyleId": page.get("primaryStyleId", 8000),
+			"subStyleId": page.get("subStyleId", 8100),
+			"selectedPerkIds": page.get("selectedPerkIds", []),
+		}
+		self.next_page_id += 1
+		self.runepages.append(new_page)
+		if new_page["current"]:
+			self._set_current_runepage(new_page["id"])
+		return new_page
+
+	def _set_current_runepage(self, page_id: int) -> None:
+		for page in self.runepages:
+			page["current"] = page["id"] == page_id
+
+	# -------------
+	# API responses
+	# -------------
+	def handle(self, method: str, path: str, body: object) -> tuple[int, object]:
+		""" Handle an API call, and return the status code and response body. """
+		with self.lock:
+			self.tick(time.monotonic())
+			status, response = self._route(method, path, body)
+			self.calls.append((time.monotonic(), method, path, status))
+			return status, response
+
+	def _route(self, method: str, path: str, body: object) -> tuple[int, object]:
+		not_found: tuple[int, dict] = (404, {"errorCode": "RPC_ERROR", "httpStatus": 404, "message": "Not found"})
+		in_champselect: bool = self.gameflow == "ChampSelect"
+
+		match method, path:
+			case "GET", "/lol-gameflow/v1/gameflow-phase":
+				return 200, self.gameflow
+
+			case "GET", "/lol-patch/v1/game-version":
+				return 200, self.scenario.game_version
+
+			case "GET", "/lol-summoner/v1/current-summoner":
+				return 200, {"accountId": ACCOUNT_ID, "summonerId": SUMMONER_ID, "gameName": "Simulated"}
+
+			case "GET", "/lol-lobby/v2/lobby":
+				if self.gameflow == "None":
+					return not_found
+				return 200, {
+					"gameConfig": {"queueId": 400},
+					"localMember": {
+						"summonerId": SUMMONER_ID,
+						"firstPositionPreference": self.scenario.position.upper(),
+						"secondPositionPreference": "FILL",
+					},
+				}
+
+			case "POST", "/lol-lobby/v2/lobby":
+				self.set_gameflow("Lobby")
+				return 200, {}
+
+			case "POST", "/lol-lobby/v2/lobby/matchmaking/search":
+				if self.gameflow != "Lobby":
+					return 400, {"message": "Not in a lobby"}
+				self.set_gameflow("Matchmaking")
+				return 204, None
+
+			case "GET", "/lol-matchmaking/v1/ready-check":
+				if self.gameflow != "ReadyCheck":
+					return not_found
+				return 200, {"state": "InProgress", "playerResponse": "None", "timer": time.monotonic() - self.phase_started}
+
+			case "POST", "/lol-matchmaking/v1/ready-check/accept":
+				if self.gameflow != "ReadyCheck":
+					return 500, {"message": "Not in a ready check"}
+				self.set_gameflow("ChampSelect")
+				return 204, None
+
+			case "GET", "/lol-champ-select/v1/session":
+				if not in_champselect:
+					return 404, {"errorCode": "RPC_ERROR", "httpStatus": 404, "message": "No active delegate"}
+				return 200, self.session
+
+			case "GET", "/lol-champ-select/v1/current-champion":
+				action: dict | None = self.local_action("pick")
+				if not in_champselect or action is None or not action["completed"]:
+					return 200, 0
+				return 200, action["championId"]
+
+			case "GET", "/lol-champ-select/v1/pickable-champions":
+				unavailable: set[int] = self.unavailable_champids() if in_champselect else set()
+				return 200, {"championIds": [c[0] for c in self.owned_champions() if c[0] not in unavailable]}
+
+			case "GET", "/lol-champ-select/v1/bannable-champion-ids":
+				banned: set[int] = self.banned_champids() if in_champselect else set()
+				return 200, [c[0] for c in CHAMPIONS if c[0] not in banned]
+
+			case "PATCH", "/lol-champ-select/v1/session/my-selection":
+				if not in_champselect:
+					return 404, {"message": "No active delegate"}
+				player: dict = self._player(self.scenario.local_cell_id)
+				for key in ("spell1Id", "spell2Id"):
+					if key in body:
+						player[key] = body[key]
+				return 204, None
+
+			case "GET", "/lol-champions/v1/owned-champions-minimal":
+				return 200, [self._champion_json(champ, owned=True) for champ in self.owned_champions()]
+
+			case "GET", "/lol-perks/v1/pages":
+				return 200, self.runepages
+
+			case "POST", "/lol-perks/v1/pages":
+				if len(self.runepages) >= self.scenario.max_runepages:
+					return 400, {"errorCode": "RPC_ERROR", "httpStatus": 400, "message": "Max pages reached"}
+				return 200, self._add_runepage(body or {})
+
+		# Endpoints with parameters
+		if match := re.fullmatch(r"/lol-champ-select/v1/session/actions/(\d+)", path):
+			if method != "PATCH" or not in_champselect:
+				return not_found
+			return self._patch_action(int(match.group(1)), body or {})
+
+		if match := re.fullmatch(r"/lol-perks/v1/pages/(\d+)", path):
+			page_id: int = int(match.group(1))
+			for index, page in enumerate(self.runepages):
+				if page["id"] == page_id:
+					if method == "GET":
+						return 200, page
+					if method == "PUT":
+						page.update({key: value for key, value in (body or {}).items() if key != "id"})
+						if page["current"]:
+							self._set_current_runepage(page_id)
+						return 201, page
+					if method == "DELETE":
+						self.runepages.pop(index)
+						return 204, None
+			return not_found
+
+		if match := re.fullmatch(r"/lol-champions/v1/inventories/(\d+)/champions-minimal", path):
+			if self.scenario.inventory_404:
+				return 404, {
+					"errorCode": "RPC_ERROR", "httpStatus": 404, "implementationDetails": {},
+					"message": "Champion data has not yet been received."
+				}
+			owned: set[int] = {c[0] for c in self.owned_champions()}
+			return 200, [self._champion_json(champ, champ[0] in owned) for champ in CHAMPIONS]
+
+		if match := re.fullmatch(r"/lol-summoner/v1/summoners/(\d+)", path):
+			return 200, {"summonerId": int(match.group(1)), "gameName": f"Player {match.group(1)}"}
+
+		if match := re.fullmatch(r"/lol-perks/v1/recommended-pages/champion/(\d+)/position/(\w*)/map/(\d+)", path):
+			return 200, self._recommended_pages(int(match.group(1)))
+
+		return not_found
+
+	def _patch_action(self, action_id: int, body: dict) -> tuple[int, object]:
+		""" Hover, pick, or ban a champion for the local player. """
+		action: dict | None = None
+		for group in self.session["actions"]:
+			for candidate in group:
+				if candidate["id"] == action_id:
+					action = candidate
+		if action is None or action["actorCellId"] != self.scenario.local_cell_id:
+			return 500, {"message": f"Action {action_id} does not belong to the local player"}
+		if action["completed"]:
+			return 500, {"message": "Action has already been completed"}
+
+		champid: int = body.get("championId", action["championId"])
+		completing: bool = body.get("completed", False)
+		if completing and not action["isInProgress"]:
+			return 500, {"message": "Action is not in progress"}
+		if action["type"] == "ban" and not action["isInProgress"]:
+			return 500, {"message": "Unable to hover a ban outside of the ban phase"}
+
+		# Validate the champion
+		if champid not in {c[0] for c in CHAMPIONS} and champid != 0:
+			return 500, {"message": f"Invalid champion id {champid}"}
+		if action["type"] == "pick":
+			if champid in self.banned_champids():
+				return 500, {"message": "Champion is banned."}
+			if champid in self.unavailable_champids():
+				return 500, {"message": "Champion has already been picked."}
+			if champid not in {c[0] for c in self.owned_champions()}:
+				return 500, {"message": "Champion is not owned."}
+		elif champid in self.banned_champids():
+			return 500, {"message": "Champion has already been banned."}
+
+		action["championId"] = champid
+		if action["type"] == "pick":
+			self._player(action["actorCellId"])["championPickIntent"] = champid
+		if completing:
+			action["completed"] = True
+			action["isInProgress"] = False
+			if action["type"] == "pick":
+				self._player(action["actorCellId"])["championId"] = champid
+			for timing in self.action_timings:
+				if timing["actionId"] == action_id and timing["completed"] is None:
+					timing["completed"] = time.monotonic()
+		return 204, None
+
+	@staticmethod
+	def _champion_json(champ: tuple[int, str, str], owned: bool) -> dict:
+		champid, alias, name = champ
+		return {
+			"id": champid,
+			"alias": alias,
+			"name": name,
+			"title": "",
+			"active": True,
+			"freeToPlay": False,
+			"ownership": {"owned": owned, "rental": {"rented": False}},
+		}
+
+	@staticmethod
+	def _recommended_pages(champid: int) -> list[dict]:
+		""" Build a deterministic recommended rune page for the specified champion. """
+		styles: tuple[int, ...] = (8000, 8100, 8200, 8300, 8400)
+		primary: int = styles[champid % len(styles)]
+		secondary: int = styles[(champid + 1) % len(styles)]
+		perks: list[int] = [primary + 5 + i for i in range(4)] + [secondary + 20 + i for i in range(2)]
+		perks += [5008, 5008, 5001]
+		return [{
+			"primaryPerkStyleId": primary,
+			"secondaryPerkStyleId": secondary,
+			"perks": [{"id": perk} for perk in perks],
+			"summonerSpellIds": [FLASH, IGNITE if champid % 2 else TELEPORT],
+			"isDefaultPosition": True,
+		}]
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"  # keep-alive, like the real client
+	disable_nagle_algorithm = True  # headers and body are written separately - don't let them wait on each other
+	client: SimulatedClient
+	authorization: str
+
+	def _handle(self, method: str) -> None:
+		length: int = int(self.headers.get("Content-Length", 0))
+		raw_body: bytes = self.rfile.read(length) if length else b""
+
+		if self.headers.get("Authorization") != self.authorization:
+			self._respond(401, {"message": "Unauthorized"})
+			return
+
+		try:
+			body: object = json.loads(raw_body) if raw_body else None
+		except ValueError:
+			self._respond(400, {"message": "Invalid JSON"})
+			return
+
+		scenario: Scenario = self.client.scenario
+		delay_ms: float = scenario.latency_ms + random.uniform(0, scenario.latency_jitter_ms)
+		if delay_ms > 0:
+			time.sleep(delay_ms / 1000)
+
+		status, response = self.client.handle(method, self.path, body)
+		self._respond(status, response)
+
+	def _respond(self, status: int, response: object) -> None:
+		payload: bytes = b"" if status == 204 else json.dumps(response).encode()
+		self.send_response(status)
+		self.send_header("Content-Type", "application/json")
+		self.send_header("Content-Length", str(len(payload)))
+		self.end_headers()
+		self.wfile.write(payload)
+
+	def do_GET(self):
+		self._handle("GET")
+
+	def do_POST(self):
+		self._handle("POST")
+
+	def do_PUT(self):
+		self._handle("PUT")
+
+	def do_PATCH(self):
+		self._handle("PATCH")
+
+	def do_DELETE(self):
+		self._handle("DELETE")
+
+	def log_message(self, *args):
+		pass  # don't spam the console
+
+
+class Simulator:
+	"""
+	A Class to run a simulated League client's HTTP server, and manage its lockfile.
+	Can be used as a context manager, which starts the simulator on entry and stops it on exit.
+	"""
+
+	def __init__(
+		self, directory: str, scenario: Scenario | None = None, port: int = 0,
+		certfile: str | None = None, keyfile: str | None = None
+	):
+		"""
+		Args:
+			directory: the directory to write the lockfile to
+			scenario: (optional) the scenario to play through
+			port: (optional) the port to listen on - a random free port is used by default
+			certfile: (optional) a certificate to serve HTTPS with - plain HTTP is used by default
+			keyfile: (optional) the private key for the certificate
+		"""
+		self.directory: str = directory
+		self.client = SimulatedClient(scenario or Scenario())
+		self.password: str = secrets.token_urlsafe(16)
+		self.protocol: str = "https" if certfile else "http"
+
+		handler = type("Handler", (_RequestHandler,), {
+			"client": self.client,
+			"authorization": f"Basic {b64encode(f'riot:{self.password}'.encode()).decode()}",
+		})
+		self.server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+		self.server.daemon_threads = True
+		if certfile:
+			context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+			context.load_cert_chain(certfile, keyfile)
+			self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+
+		self._stop = threading.Event()
+		self._threads: list[threading.Thread] = []
+
+	@property
+	def port(self) -> int:
+		return self.server.server_address[1]
+
+	@property
+	def lockfile_path(self) -> str:
+		return os.path.join(self.directory, "lockfile")
+
+	def start(self) -> "Simulator":
+		""" Start serving requests and write the lockfile. """
+		os.makedirs(self.directory, exist_ok=True)
+		self._threads = [
+			threading.Thread(target=self.server.serve_forever, daemon=True),
+			threading.Thread(target=self.client.run, args=(self._stop,), daemon=True),
+		]
+		for thread in self._threads:
+			thread.start()
+
+		with open(self.lockfile_path, "w") as file:
+			file.write(f"LeagueClient:{os.getpid()}:{self.port}:{self.password}:{self.protocol}")
+		return self
+
+	def stop(self) -> None:
+		""" Stop serving requests and remove the lockfile. """
+		self._stop.set()
+		self.server.shutdown()
+		self.server.server_close()
+		try:
+			os.remove(self.lockfile_path)
+		except FileNotFoundError:
+			pass
+
+	def __enter__(self):
+		return self.start()
+
+	def __exit__(self, exc_type, exc_val, exc_tb):
+		self.stop()
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Run a simulated League client.")
+	parser.add_argument("directory", nargs="?", default="lcu-simulator", help="directory to write the lockfile to")
+	parser.add_argument("--scenario", help="path to a scenario JSON file")
+	parser.add_argument("--latency", type=float, help="response latency in milliseconds (overrides the scenario)")
+	parser.add_argument("--port", type=int, default=0)
+	parser.add_argument("--certfile", help="serve HTTPS using this certificate")
+	parser.add_argument("--keyfile", help="private key for --certfile")
+	args = parser.parse_args()
+
+	scenario: Scenario = Scenario.load(args.scenario) if args.scenario else Scenario()
+	if args.latency is not None:
+		scenario.latency_ms = args.latency
+
+	with Simulator(os.path.abspath(args.directory), scenario, args.port, args.certfile, args.keyfile) as simulator:
+		print(f"Simulated client listening on port {simulator.port}. Lockfile: {simulator.lockfile_path}")
+		print(f"Set 'directory = {simulator.directory}' in config.ini to connect to it. Press Ctrl+C to stop.")
+		last_gameflow: str = ""
+		try:
+			while True:
+				time.sleep(0.1)
+				gameflow: str = simulator.client.gameflow
+				phase: str = simulator.client.phase if gameflow == "ChampSelect" else ""
+				if f"{gameflow}{phase}" != last_gameflow:
+					print(f"Gameflow: {gameflow} {phase}".rstrip())
+					last_gameflow = f"{gameflow}{phase}"
+		except KeyboardInterrupt:
+			pass
+
+
+if __name__ == "__main__":
+	main()
@@ -43,3 +43,6 @@ def reset_after_dodge(connection: c.Connection) -> None:
 	connection.assigned_role = connection.user_role
 	connection.invalid_picks.clear()
 	connection.invalid_bans.clear()
+	connection.runepages.invalidate()
+	connection.champselect_clock.reset()
+	connection.champselect_differ.reset()
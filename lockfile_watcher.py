@@ -0,0 +1,189 @@
+from dataclasses import dataclass
+from typing import Callable
+import threading
+import os
+
+import utility as u
+
+MIN_RETRY_INTERVAL: float = 0.25  # seconds between lockfile checks right after the client closes
+MAX_RETRY_INTERVAL: float = 2  # longest interval to back off to while no client is running
+BACKOFF_FACTOR: float = 2  # how much the interval grows after each check that didn't find a client
+
+MSG_WAITING_FOR_CLIENT: str = "Waiting for the League client to start..."
+
+# Windows API constants, used to check if a process is still running
+_PROCESS_QUERY_LIMITED_INFORMATION: int = 0x1000
+_STILL_ACTIVE: int = 259
+_ERROR_ACCESS_DENIED: int = 5
+
+
+@dataclass(frozen=True)
+class LockfileState:
+	""" A Class to store what the lockfile looked like the last time it was checked. """
+	exists: bool = False
+	mtime_ns: int = 0
+	size: int = 0
+	contents: str = ""
+	lockfile: u.Lockfile | None = None  # None if the lockfile doesn't exist or couldn't be parsed
+	alive: bool = False  # whether the process that wrote the lockfile is still running
+
+	def client_is_running(self) -> bool:
+		return self.lockfile is not None and self.alive
+
+
+class Backoff:
+	""" A Class to produce exponentially growing retry intervals, between MIN_RETRY_INTERVAL and MAX_RETRY_INTERVAL. """
+
+	def __init__(self, minimum: float = MIN_RETRY_INTERVAL, maximum: float = MAX_RETRY_INTERVAL):
+		self.minimum: float = minimum
+		self.maximum: float = maximum
+		self.interval: float = minimum
+
+	def next(self) -> float:
+		""" Get the next interval to wait for. """
+		interval: float = self.interval
+		self.interval = min(self.interval * BACKOFF_FACTOR, self.maximum)
+		return interval
+
+	def reset(self) -> None:
+		self.interval = self.minimum
+
+
+class LockfileWatcher:
+	"""
+	A Class to keep track of the League client's lockfile: whether it exists, whether it has been rewritten (the client
+	writes a new port and password every time it starts), and whether the process it names is still running. Checking
+	only costs a stat() call and a liveness check unless the file has changed.
+	"""
+
+	def __init__(self, get_path: Callable[[], str] = u.get_lockfile_path):
+		"""
+		Args:
+			get_path: (optional) a function returning the path to the lockfile - called on every check, so that
+				changes to the game directory in the config are picked up
+		"""
+		self._get_path: Callable[[], str] = get_path
+		self.state: LockfileState = LockfileState()  # the state as of the last check
+
+	def check(self) -> LockfileState:
+		""" Look at the lockfile and the process it names, and return (and remember) what was found. """
+		self.state = self._read(self.state)
+		return self.state
+
+	def poll(self) -> bool:
+		"""
+		Check the lockfile for changes.
+		Returns:
+			True if a different client instance (or the same one, with a new port/password) is now running, False
+			otherwise
+		"""
+		last: LockfileState = self.state
+		current: LockfileState = self.check()
+		return current.client_is_running() and (current.contents != last.contents or not last.client_is_running())
+
+	def wait_for_client(
+		self, sleep: Callable[[float], None] | None = None, stop: threading.Event | None = None
+	) -> LockfileState | None:
+		"""
+		Wait until a client is running, checking the lockfile less and less often while there isn't one.
+		Args:
+			sleep: (optional) the function to wait with, e.g. CommandQueue.run_for - defaults to waiting on ``stop``
+			stop: (optional) an event that ends the wait early once it is set
+		Returns:
+			the state of the lockfile once a client is running, or None if ``stop`` was set first
+		"""
+		stop = stop if stop is not None else threading.Event()
+		sleep = sleep if sleep is not None else stop.wait
+		backoff = Backoff()
+		has_printed: bool = False
+
+		while not stop.is_set():
+			state: LockfileState = self.check()
+			if state.client_is_running():
+				return state
+
+			if not has_printed:
+				u.print_and_write(MSG_WAITING_FOR_CLIENT)
+				has_printed = True
+			sleep(backoff.next())
+		return None
+
+	def _read(self, last: LockfileState) -> LockfileState:
+		try:
+			stat: os.stat_result = os.stat(self._get_path())
+		except OSError:
+			return LockfileState()
+
+		# Only re-read the file if it has changed since the last check - otherwise, just see if the client is still alive
+		if last.exists and stat.st_mtime_ns == last.mtime_ns and stat.st_size == last.size:
+			alive: bool = last.lockfile is not None and is_process_alive(int(last.lockfile.pid))
+			return LockfileState(True, last.mtime_ns, last.size, last.contents, last.lockfile, alive)
+
+		try:
+			with open(self._get_path()) as file:
+				contents: str = file.read()
+		except OSError:
+			return LockfileState()
+
+		lockfile: u.Lockfile | None = parse_lockfile_contents(contents)
+		alive = lockfile is not None and is_process_alive(int(lockfile.pid))
+		return LockfileState(True, stat.st_mtime_ns, stat.st_size, contents, lockfile, alive)
+
+
+def parse_lockfile_contents(contents: str) -> u.Lockfile | None:
+	"""
+	Parse the contents of a lockfile (name:pid:port:password:protocol).
+	Returns:
+		the parsed lockfile, or None if it's incomplete (e.g. the client is still writing it)
+	"""
+	fields: list[str] = contents.strip().split(":")
+	if len(fields) < 5 or not fields[1].isdigit() or not fields[2].isdigit():
+		return None
+
+	lockfile: u.Lockfile = u.Lockfile()
+	lockfile.pid, lockfile.port, lockfile.password, lockfile.protocol = fields[1:5]
+	return lockfile
+
+
+def is_process_alive(pid: int) -> bool:
+	""" Check if the process with the given id is still running. """
+	if pid <= 0:
+		return False
+	if os.name == "nt":
+		return _is_process_alive_windows(pid)
+
+	try:
+		os.kill(pid, 0)  # signal 0 doesn't do anything, but still fails if the process doesn't exist
+	except ProcessLookupError:
+		return False
+	except PermissionError:
+		return True  # the process exists, but belongs to another user
+	except OSError:
+		return False
+	return True
+
+
+def _is_process_alive_windows(pid: int) -> bool:
+	# os.kill() on Windows can't check for a process without terminating it, so ask the Windows API instead
+	import ctypes
+	from ctypes import wintypes
+
+	kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+	kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+	kernel32.OpenProcess.restype = wintypes.HANDLE
+	kernel32.GetExitCodeProcess.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+	kernel32.GetExitCodeProcess.restype = wintypes.BOOL
+	kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+	handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+	if not handle:
+		# Access denied means the process exists, but we aren't allowed to look at it
+		return ctypes.get_last_error() == _ERROR_ACCESS_DENIED
+
+	try:
+		exit_code = wintypes.DWORD()
+		if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+			return True
+		return exit_code.value == _STILL_ACTIVE
+	finally:
+		kernel32.CloseHandle(handle)
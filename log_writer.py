@@ -0,0 +1,99 @@
+import threading
+import queue
+import os
+
+
+class LogWriter:
+	"""
+	A Class to write to a log file on a background thread, so that logging never waits on disk I/O. Writes are batched,
+	and the file is rotated once it gets too big (output.log -> output.log.1 -> output.log.2 ...).
+	"""
+
+	BATCH_SIZE: int = 256  # max number of messages to write before flushing
+
+	def __init__(self, path: str, max_bytes: int, backup_count: int, queue_size: int = 10000):
+		"""
+		Args:
+			path: the path of the log file
+			max_bytes: the size at which the log file is rotated
+			backup_count: the number of old log files to keep
+			queue_size: the max number of messages waiting to be written - further messages are dropped
+		"""
+		self.path: str = path
+		self.max_bytes: int = max_bytes
+		self.backup_count: int = backup_count
+		self.dropped: int = 0  # number of messages dropped because the queue was full
+
+		self._queue: queue.Queue[str | None] = queue.Queue(maxsize=queue_size)
+		self._lock = threading.Lock()
+		self._thread: threading.Thread | None = None
+
+	def write(self, text: str) -> None:
+		""" Queue text to be written to the log file. """
+		if self._thread is None:
+			self._start()
+		try:
+			self._queue.put_nowait(text)
+		except queue.Full:
+			self.dropped += 1
+
+	def flush(self) -> None:
+		""" Wait until everything queued so far has been written. """
+		if self._thread is not None:
+			self._queue.join()
+
+	def close(self) -> None:
+		""" Write everything that's queued, and stop the background thread. """
+		if self._thread is None:
+			return
+		self._queue.put(None)
+		self._thread.join()
+		self._thread = None
+
+	def _start(self) -> None:
+		with self._lock:
+			if self._thread is None:
+				self._thread = threading.Thread(target=self._run, daemon=True)
+				self._thread.start()
+
+	def _run(self) -> None:
+		while True:
+			# Wait for a message, then grab whatever else is already waiting so it can all be written at once
+			batch: list[str | None] = [self._queue.get()]
+			while len(batch) < self.BATCH_SIZE:
+				try:
+					batch.append(self._queue.get_nowait())
+				except queue.Empty:
+					break
+
+			should_stop: bool = None in batch
+			try:
+				self._write_batch([text for text in batch if text is not None])
+			except OSError:
+				pass  # nowhere to report this - don't take the program down over a log file
+			finally:
+				for _ in batch:
+					self._queue.task_done()
+
+			if should_stop:
+				return
+
+	def _write_batch(self, batch: list[str]) -> None:
+		if not batch:
+			return
+		with open(self.path, "a") as file:
+			file.write("".join(batch))
+			size: int = file.tell()
+		if size >= self.max_bytes:
+			self._rotate()
+
+	def _rotate(self) -> None:
+		""" Rename output.log to output.log.1, output.log.1 to output.log.2, etc., dropping the oldest file. """
+		for index in range(self.backup_count - 1, 0, -1):
+			older: str = f"{self.path}.{index}"
+			if os.path.exists(older):
+				os.replace(older, f"{self.path}.{index + 1}")
+		if self.backup_count > 0:
+			os.replace(self.path, f"{self.path}.1")
+		else:
+			os.remove(self.path)
@@ -0,0 +1,243 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+import threading
+import warnings
+import cProfile
+import pstats
+import time
+import os
+
+import utility as u
+
+PROFILE_DIR: str = os.path.join(u.BASE_DIR, "profiles")  # where finished profiles are written
+TOP_FUNCTIONS: int = 20  # number of functions to report, sorted by cumulative time
+CHAMPSELECT: str = "champselect"  # profiling mode that covers a whole champ select, rather than a number of ticks
+OFF: str = "off"
+
+# Gamestates a champ select profile starts in. The ready check is included so that the first tick of champ select
+# (where the gamestate changes) is profiled too.
+_CHAMPSELECT_START_STATES: tuple[str, ...] = ("ReadyCheck", "ChampSelect")
+
+# Only one profiler can be active per thread, and clients driven by a Supervisor share worker threads, so only one
+# LoopProfiler in the process may be armed at a time
+_armed_profiler: "LoopProfiler | None" = None
+_armed_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class FunctionStats:
+	""" A Class to store profiling results for a single function. """
+	function: str  # file:line(name)
+	calls: int
+	total_seconds: float  # time spent in the function itself
+	cumulative_seconds: float  # time spent in the function and everything it called
+
+	def to_dict(self) -> dict:
+		return {
+			"function": self.function,
+			"calls": self.calls,
+			"totalSeconds": self.total_seconds,
+			"cumulativeSeconds": self.cumulative_seconds,
+		}
+
+
+@dataclass(frozen=True)
+class ProfileReport:
+	""" A Class to store a summary of a finished profile. """
+	path: str  # where the full profile was written (readable with pstats or snakeviz)
+	mode: str  # CHAMPSELECT, or the number of ticks that were requested
+	ticks: int  # number of ticks that were actually profiled
+	commands: int  # number of commands from other threads (e.g. the web API) profiled between ticks
+	seconds: float  # wall time spent in profiled ticks and commands
+	top_functions: tuple[FunctionStats, ...]
+
+	def to_dict(self) -> dict:
+		return {
+			"path": self.path,
+			"mode": self.mode,
+			"ticks": self.ticks,
+			"commands": self.commands,
+			"seconds": self.seconds,
+			"topFunctions": [stats.to_dict() for stats in self.top_functions],
+		}
+
+	def __str__(self) -> str:
+		lines: list[str] = [
+			f"Profiled {self.ticks} main loop ticks and {self.commands} commands ({self.seconds:.3f}s) - saved to "
+			f"{self.path}",
+			f"{'cumulative':>10}  {'total':>10}  {'calls':>8}  function",
+		]
+		lines += [
+			f"{stats.cumulative_seconds:>9.4f}s  {stats.total_seconds:>9.4f}s  {stats.calls:>8}  {stats.function}"
+			for stats in self.top_functions
+		]
+		return "\n".join(lines)
+
+
+class LoopProfiler:
+	"""
+	A Class to profile main loop ticks on demand, with cProfile. Once armed (through the profile_main_loop config
+	option or the web API), it profiles either the next N ticks, or the next champ select from start to finish, then
+	writes the profile to disk and reports the functions that took the most time. Commands the main loop runs for the
+	web API are profiled too (see command()), but the Flask handlers themselves aren't - they only parse requests and
+	hand the work to the main loop. Only one LoopProfiler per process can be armed at a time. Must only be armed and
+	ticked by the main loop's thread.
+	"""
+
+	def __init__(self, name: str = ""):
+		"""
+		Args:
+			name: (optional) added to the file names, to tell apart profiles from different clients (see supervisor.py)
+		"""
+		self.name: str = name
+		self.mode: str = OFF  # OFF, CHAMPSELECT, or the number of ticks to profile
+		self.last_report: ProfileReport | None = None
+		self._config_value: str = OFF  # last value of the config option, so that it only arms the profiler on changes
+		self._profile: cProfile.Profile | None = None
+		self._ticks_left: int = 0
+		self._ticks: int = 0
+		self._commands: int = 0
+		self._seconds: float = 0.0
+		self._seen_champselect: bool = False
+		self._enabled: bool = False  # whether the profile is collecting right now
+
+	def is_armed(self) -> bool:
+		return self.mode != OFF
+
+	def arm(self, mode: str | int) -> None:
+		"""
+		Start profiling from the next tick on. Anything that was being profiled is discarded.
+		Args:
+			mode: the number of ticks to profile, CHAMPSELECT to profile the next champ select, or OFF to stop
+		"""
+		mode = str(mode).strip().lower()
+		if mode not in (OFF, CHAMPSELECT) and not mode.isdigit():
+			raise ValueError(f"Invalid profiling mode '{mode}' - expected a number of ticks, '{CHAMPSELECT}' or '{OFF}'")
+		mode = OFF if mode == "0" else mode
+
+		global _armed_profiler
+		with _armed_lock:
+			if mode != OFF and _armed_profiler not in (None, self):
+				raise RuntimeError("Another client is already being profiled - only one profile can run at a time.")
+			if mode != OFF:
+				_armed_profiler = self
+			elif _armed_profiler is self:
+				_armed_profiler = None
+
+		self.mode = mode
+		self._profile = cProfile.Profile() if self.is_armed() else None
+		self._ticks_left = int(mode) if mode.isdigit() else 0
+		self._ticks = 0
+		self._commands = 0
+		self._seconds = 0.0
+		self._seen_champselect = False
+
+	def configure(self, config_value: str) -> None:
+		""" Arm the profiler if the profile_main_loop config option has changed since it was last read. """
+		if config_value == self._config_value:
+			return
+		self._config_value = config_value
+		try:
+			self.arm(config_value or OFF)
+		except ValueError as e:
+			warnings.warn(f"{e} in {u.CFG_PATH} - profiling is disabled", RuntimeWarning)
+			self.arm(OFF)
+		except RuntimeError as e:
+			warnings.warn(f"{e} Ignoring profile_main_loop in {u.CFG_PATH}.", RuntimeWarning)
+
+	@contextmanager
+	def tick(self, last_gamestate: str) -> Iterator[None]:
+		"""
+		Profile a single main loop tick, if the profiler is armed.
+		Args:
+			last_gamestate: the gamestate seen on the previous tick
+		"""
+		if not self._should_profile(last_gamestate):
+			yield
+			return
+
+		profile: cProfile.Profile = self._profile
+		start_time: float = time.perf_counter()
+		profile.enable()
+		self._enabled = True
+		try:
+			yield
+		finally:
+			# A command run during the tick might have re-armed the profiler (see command())
+			profile.disable()
+			self._enabled = False
+			if self._profile is profile:
+				self._seconds += time.perf_counter() - start_time
+				self._ticks += 1
+				self._ticks_left -= 1
+
+	@contextmanager
+	def command(self) -> Iterator[None]:
+		"""
+		Profile a command that the main loop runs for another thread (e.g. a web API request - see CommandQueue), if a
+		profile is in progress. Commands run during a tick (e.g. while waiting to lock in) are covered by the tick.
+		"""
+		profile: cProfile.Profile | None = self._profile
+		if profile is None or self._enabled or (self.mode == CHAMPSELECT and self._ticks == 0):
+			yield
+			return
+
+		start_time: float = time.perf_counter()
+		profile.enable()
+		self._enabled = True
+		try:
+			yield
+		finally:
+			# The command itself might have re-armed the profiler (see webapp.start_profile())
+			profile.disable()
+			self._enabled = False
+			if self._profile is profile:
+				self._seconds += time.perf_counter() - start_time
+				self._commands += 1
+
+	def after_tick(self, gamestate: str) -> None:
+		"""
+		Finish profiling if enough ticks have run, or champ select is over.
+		Args:
+			gamestate: the gamestate seen on the tick that just ran
+		"""
+		if not self.is_armed() or self._ticks == 0:
+			return
+
+		if self.mode == CHAMPSELECT:
+			self._seen_champselect = self._seen_champselect or gamestate == "ChampSelect"
+			if gamestate in _CHAMPSELECT_START_STATES:
+				return
+			if not self._seen_champselect:
+				self.arm(CHAMPSELECT)  # the ready check was declined - wait for the next one
+				return
+		elif self._ticks_left > 0:
+			return
+
+		self.last_report = self._write_report()
+		u.print_and_write(str(self.last_report))
+		self.arm(OFF)
+
+	def _should_profile(self, last_gamestate: str) -> bool:
+		if self.mode == CHAMPSELECT:
+			return self._ticks > 0 or last_gamestate in _CHAMPSELECT_START_STATES
+		return self.is_armed()
+
+	def _write_report(self) -> ProfileReport:
+		""" Save the profile to disk, and summarize it. """
+		os.makedirs(PROFILE_DIR, exist_ok=True)
+		prefix: str = f"main_loop_{self.name}" if self.name else "main_loop"
+		path: str = os.path.join(PROFILE_DIR, f"{prefix}_{time.strftime('%Y%m%d_%H%M%S')}_{self.mode}.prof")
+		self._profile.dump_stats(path)
+
+		stats = pstats.Stats(self._profile)
+		functions: list[FunctionStats] = []
+		for (filename, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+			location: str = f"{os.path.basename(filename)}:{line}({name})" if line else name
+			functions.append(FunctionStats(location, calls, total, cumulative))
+		functions.sort(key=lambda stats: stats.cumulative_seconds, reverse=True)
+
+		return ProfileReport(
+			path, self.mode, self._ticks, self._commands, self._seconds, tuple(functions[:TOP_FUNCTIONS])
+		)
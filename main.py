@@ -1,8 +1,11 @@
 from configparser import NoSectionError, NoOptionError
+from lockfile_watcher import LockfileWatcher, Backoff
 import requests
+import time
 import sys
 import os
 
+import champselect_exceptions
 import connect as c
 import utility as u
 import main_loop
@@ -33,23 +36,36 @@ def handle_error(original_err: Exception, err_msg: str = ""):
 
 
 def initialize_connection() -> c.Connection:
-	""" Initialize a connection to the League client. """
+	""" Initialize a connection to the League client, waiting for it to open if it's not open already. """
 	# Remove old log file if it exists
 	try:
 		os.remove(LOGFILE)
 	except FileNotFoundError:
 		pass
 
-	# Wait for client to open if it's not open already
+	connection: c.Connection = connect_when_ready()
+	userinput.get_first_choices(connection)
+	return connection
+
+
+def connect_when_ready() -> c.Connection:
+	""" Create a Connection, waiting for the client to open (and be ready to answer API calls) if it isn't already. """
+	watcher: LockfileWatcher = LockfileWatcher()
+	backoff: Backoff = Backoff()
 	while True:
+		watcher.wait_for_client(time.sleep)
 		try:
-			connection = c.Connection()
-			userinput.get_first_choices(connection)
-			return connection
+			return c.Connection()
+
+		# The client writes its lockfile a little while before it starts answering API calls, and might close again
+		# before it does - either way, try again once it's (back) up
+		except (
+			requests.exceptions.ConnectionError, champselect_exceptions.ClientConnectionError,
+			champselect_exceptions.ClientNotReadyError, KeyError
+		) as e:
+			u.debug(f"Client isn't ready yet ({type(e).__name__}: {e})")
+			time.sleep(backoff.next())
 
-		# If the connection isn't successful or the lockfile doesn't exist, the client isn't open yet
-		except (requests.exceptions.ConnectionError, KeyError) as e:
-			handle_error(e, c.MSG_CLIENT_CONNECTION_ERR)
 
 if __name__ == "__main__":
 	try:
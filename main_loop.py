@@ -1,3 +1,5 @@
+from dataclasses import dataclass, field
+import threading
 import requests
 import time
 
@@ -5,10 +7,22 @@ import connect as c
 import utility as u
 import champselect
 import formatting
+import lcu_events
 import lobby
 import runes
+from poll_scheduler import PollScheduler
 
 MSG_ATTEMPT_RECONNECT: str = "Unable to connect to the League of Legends client. Retrying..."
+EVENT_RETRY_INTERVAL: float = 30  # seconds to wait before trying to re-open the event stream after it closes
+
+
+@dataclass
+class LoopState:
+	""" A Class to store state that persists between iterations of the main loop. """
+	last_gamestate: str = ""  # Store last gamestate - used to skip redundant API calls and print statements
+	champselect_loop_iteration: int = 0  # Keep track of how many loops run during champselect
+	scheduler: PollScheduler = field(default_factory=PollScheduler)  # Decides how long to wait between polls
+
 
 def update_interval():
 	""" Read the update interval from the config file. """
@@ -16,80 +30,253 @@ def update_interval():
 	return float(u.get_config_option_str("settings", "update_interval"))
 
 
-def should_start_queue():
-	""" Read the config file to find out if the queue should be started automatically or not. """
+def should_start_queue(connection: c.Connection):
+	""" Read the config to find out if the queue should be started automatically or not. """
 	# This needs to be done lazily now that the config can be changed while the app is running
-	return u.get_config_option_bool("settings", "auto_start_queue")
+	return u.get_config_option_bool("settings", "auto_start_queue", connection.config)
+
+
+def should_use_events():
+	""" Read the config file to find out if we should react to events from the client instead of polling. """
+	return u.get_config_option_bool("settings", "use_event_stream")
+
+
+def publish_status(connection: c.Connection, gamestate: str | None = None) -> None:
+	"""
+	Publish the script's current status for the web UI (see webapp.py).
+	Args:
+		gamestate: (optional) the current gamestate - if not provided, the gamestate and role aren't updated
+	"""
+	fields: dict = {
+		"pick": connection.format_champ(connection.pick_intent or connection.user_pick or ""),
+		"ban": connection.format_champ(connection.ban_intent or connection.user_ban or ""),
+		"invalidPicks": list(connection.invalid_picks.values()),
+		"invalidBans": list(connection.invalid_bans.values()),
+		"setRunes": connection.should_modify_runes,
+		"runesChosen": connection.runes_chosen,
+		"hasPicked": connection.has_picked,
+		"hasBanned": connection.has_banned,
+		"startedQueue": connection.started_queue,
+	}
+	if gamestate is not None:
+		match gamestate:
+			case "Lobby" | "Matchmaking" | "ReadyCheck":
+				role: str = connection.user_role
+			case "ChampSelect":
+				role = connection.assigned_role or connection.user_role
+			case _:
+				role = ""
+		fields["gamestate"] = formatting.gamestate(gamestate)
+		fields["role"] = formatting.role(role)
+	connection.status_feed.publish(**fields)
+
+
+def refresh_status(connection: c.Connection) -> None:
+	""" Get the gamestate (and queued role, if in a lobby) from the client right now, and publish the result. """
+	gamestate: str = connection.get_gamestate()
+	if gamestate in ("Lobby", "Matchmaking", "ReadyCheck"):
+		connection.update_primary_role()
+	publish_status(connection, gamestate)
 
 
 def handle_lobby(connection: c.Connection) -> None:
-	if should_start_queue() and not connection.started_queue:
+	if should_start_queue(connection) and not connection.started_queue:
 		lobby.start_queue(connection)
 		connection.started_queue = True
+	connection.update_primary_role()
+	# Pick up any champions the player bought since the last game
+	connection.revalidate_owned_champs_async()
 
 
 def handle_readycheck(connection: c.Connection) -> None:
 	connection.update_primary_role()
 	lobby.accept_match(connection)
 	lobby.reset_after_dodge(connection)
+	# Open connections now, so that the first API calls in champselect don't have to wait for a handshake
+	connection.warm_up_connections()
 
 
-def handle_champselect(connection: c.Connection, champselect_loop_iteration: int) -> None:
+def handle_champselect(connection: c.Connection, champselect_loop_iteration: int, session: dict | None = None) -> None:
+	"""
+	Handle a single iteration of the champselect loop.
+	Args:
+		champselect_loop_iteration: how many loops have run during this champselect
+		session: (optional) champselect session data that was already received from the client
+	"""
+	with connection.metrics.time_stage("handle_champselect"):
+		_handle_champselect(connection, champselect_loop_iteration, session)
+
+
+def _handle_champselect(connection: c.Connection, champselect_loop_iteration: int, session: dict | None) -> None:
 	# Wrap in try block to catch KeyError when someone dodges - champselect actions don't exist anymore
 	try:
-		champselect.update_champselect(connection)
+		champselect.update_champselect(connection, session)
 		phase = champselect.get_champselect_phase(connection)
 	except KeyError:
 		phase = "skip"
 
-	# u.print_and_write(f"\nChampselect loop #{champselect_loop_iteration}:")
-	# u.print_and_write("\tChampselect phase:", formatting.phase(phase))
+	if u.debug_enabled():
+		u.debug(f"\nChampselect loop #{champselect_loop_iteration}:")
+		u.debug("\tChampselect phase:", formatting.phase(phase))
 
 	# Handle each champ select phase separately
 	match phase:
 		case "PLANNING":
 			champselect.hover_champ(connection)
+			runes.prefetch_recommendations(connection)
 		case "BAN_PICK":
 			champselect.ban_or_pick(connection)
+			runes.prefetch_recommendations(connection)
 		case "FINALIZATION":
-			runes.send_runes_and_summs(connection)
+			runes.send_runes_and_summs(connection, check_gamestate=False)
 		case "skip":
 			pass
 
 
-def main_loop(connection: c.Connection) -> None:
-	last_gamestate: str = ""  # Store last gamestate - used to skip redundant API calls and print statements
-	champselect_loop_iteration: int = 0  # Keep track of how many loops run during champselect
+def handle_gamestate(
+	connection: c.Connection, gamestate: str, loop_state: LoopState, session: dict | None = None
+) -> None:
+	"""
+	React to the current gamestate.
+	Args:
+		gamestate: the current gamestate
+		loop_state: state that persists between iterations of the main loop
+		session: (optional) champselect session data that was already received from the client
+	"""
+	with connection.profiler.tick(loop_state.last_gamestate):
+		_handle_gamestate(connection, gamestate, loop_state, session)
+	connection.profiler.after_tick(gamestate)
 
-	while True:
-		time.sleep(update_interval())
-		# Wrap the loop in a try block to catch errors when the client closes
-		try:
-			gamestate: str = connection.get_gamestate()
-			gamestate_has_changed: bool = gamestate != last_gamestate
 
-			# Print current gamestate if it's different from the last one
+def _handle_gamestate(connection: c.Connection, gamestate: str, loop_state: LoopState, session: dict | None) -> None:
+	gamestate_has_changed: bool = gamestate != loop_state.last_gamestate
+
+	# Print current gamestate if it's different from the last one
+	if gamestate_has_changed:
+		u.debug(f"\nCurrent gamestate: {formatting.gamestate(gamestate)}")
+		# Keep a separate decision journal for each champ select
+		if gamestate == "ChampSelect":
+			connection.journal.open()
+		elif loop_state.last_gamestate == "ChampSelect":
+			connection.journal.close()
+		loop_state.last_gamestate = gamestate
+
+	match gamestate:
+		case "Lobby":
+			if gamestate_has_changed:
+				handle_lobby(connection)
+
+		case "ReadyCheck":
 			if gamestate_has_changed:
-				# u.print_and_write(f"\nCurrent gamestate: {formatting.gamestate(gamestate)}")
-				last_gamestate = gamestate
+				loop_state.champselect_loop_iteration = 1
+				handle_readycheck(connection)
 
-			match gamestate:
-				case "Lobby":
-					if gamestate_has_changed:
-						handle_lobby(connection)
+		case "ChampSelect":
+			loop_state.champselect_loop_iteration += 1
+			handle_champselect(connection, loop_state.champselect_loop_iteration, session)
 
-				case "ReadyCheck":
-					if gamestate_has_changed:
-						champselect_loop_iteration = 1
-						handle_readycheck(connection)
+	publish_status(connection, gamestate)
 
-				case "ChampSelect":
-					champselect_loop_iteration += 1
-					handle_champselect(connection, champselect_loop_iteration)
 
-				# Reduce polling rate if in-game
-				case "InProgress":
-					time.sleep(30)
+def handle_event(connection: c.Connection, event: lcu_events.LcuEvent, loop_state: LoopState) -> None:
+	""" React to a single event pushed by the client. """
+	match event.uri:
+		case lcu_events.GAMEFLOW_URI:
+			handle_gamestate(connection, event.data, loop_state)
+
+		case lcu_events.READY_CHECK_URI:
+			# The ready check can show up before the gameflow phase changes - accept as soon as it does
+			ready_check: dict = event.data or {}
+			if ready_check.get("state") == "InProgress" and loop_state.last_gamestate != "ReadyCheck":
+				handle_gamestate(connection, "ReadyCheck", loop_state)
+
+		case lcu_events.CHAMPSELECT_URI:
+			# Session is deleted when champselect ends - the gameflow event will handle that
+			if event.event_type != "Delete" and loop_state.last_gamestate == "ChampSelect":
+				handle_gamestate(connection, "ChampSelect", loop_state, session=event.data)
+
+
+def wait(connection: c.Connection, seconds: float, stop: threading.Event | None) -> None:
+	"""
+	Wait for the specified number of seconds, running any commands submitted by other threads (e.g. the web API) in
+	the meantime. Wakes up early if ``stop`` is set.
+	"""
+	connection.commands.run_for(seconds, stop)
+
+
+def should_stop(stop: threading.Event | None) -> bool:
+	return stop is not None and stop.is_set()
+
+
+def event_loop(connection: c.Connection, loop_state: LoopState, stop: threading.Event | None = None) -> None:
+	""" React to events pushed by the client until the event stream closes (or ``stop`` is set). """
+	listener = lcu_events.EventListener(connection)
+	if not listener.start():
+		return
+
+	u.print_and_write("Listening for events from the League client...")
+	try:
+		# Events are only sent on changes, so start off with the current gamestate
+		handle_gamestate(connection, connection.get_gamestate(), loop_state)
+
+		while listener.is_alive() and not should_stop(stop):
+			event = listener.get(timeout=update_interval())
+			connection.commands.drain()
+			if event is not None:
+				handle_event(connection, event, loop_state)
+
+			# Keep champselect moving even if the client goes quiet (e.g. while waiting to lock in)
+			elif loop_state.last_gamestate == "ChampSelect" and listener.is_alive():
+				handle_gamestate(connection, "ChampSelect", loop_state)
+
+	except requests.exceptions.ConnectionError:
+		connection.re_parse_lockfile(stop)
+
+	finally:
+		listener.stop()
+
+	if not should_stop(stop):
+		u.print_and_write("Event stream closed - falling back to polling.")
+
+
+def main_loop(
+	connection: c.Connection, stop: threading.Event | None = None, loop_state: LoopState | None = None
+) -> None:
+	"""
+	React to the state of the League client until the program exits.
+	Args:
+		stop: (optional) an event that makes the loop return once it is set
+		loop_state: (optional) state to use for the loop, so that it can be inspected afterwards
+	"""
+	if loop_state is None:
+		loop_state = LoopState()
+	champselect.subscribe_to_changes(connection)
+	last_event_attempt: float = -EVENT_RETRY_INTERVAL
+	interval: float = update_interval()
+
+	while not should_stop(stop):
+		# Prefer reacting to events from the client, and only poll if that isn't possible
+		if should_use_events() and time.monotonic() - last_event_attempt >= EVENT_RETRY_INTERVAL:
+			last_event_attempt = time.monotonic()
+			event_loop(connection, loop_state, stop)
+
+		wait(connection, interval, stop)
+		if should_stop(stop):
+			return
+		# Wrap the loop in a try block to catch errors when the client closes
+		try:
+			# Reconnect straight away if the client was restarted, and wait for it to come back if it was closed
+			if not connection.check_lockfile():
+				connection.re_parse_lockfile(stop)
+				continue
+			gamestate: str = connection.get_gamestate()
+			handle_gamestate(connection, gamestate, loop_state)
+
+			# Poll quickly when our champselect action is close, and back off while idle (e.g. in-game)
+			interval = loop_state.scheduler.next_interval(
+				update_interval(), gamestate, connection.champselect_snapshot
+			)
 
 		except requests.exceptions.ConnectionError:
-			connection.re_parse_lockfile()
+			connection.re_parse_lockfile(stop)
+			interval = update_interval()
@@ -0,0 +1,195 @@
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Iterator
+import threading
+import bisect
+import time
+import re
+
+# Upper bounds (seconds) of the latency histogram buckets. Anything slower only counts towards the +Inf bucket.
+LATENCY_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+ERROR_STATUS: str = "error"  # status label used for calls that never got a response (connection refused, etc.)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")  # numeric path segments (summoner ids, action ids, etc.)
+
+
+class Histogram:
+	""" A Class to count how many observations fell into each latency bucket, Prometheus-style. """
+
+	def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+		self.buckets: tuple[float, ...] = buckets
+		self.counts: list[int] = [0] * (len(buckets) + 1)  # non-cumulative; the last one is the +Inf bucket
+		self.count: int = 0
+		self.sum: float = 0.0
+
+	def observe(self, seconds: float) -> None:
+		self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+		self.count += 1
+		self.sum += seconds
+
+	def cumulative_counts(self) -> list[tuple[str, int]]:
+		""" Get (upper bound, number of observations <= upper bound) for each bucket, including +Inf. """
+		bounds: list[str] = [format_number(bound) for bound in self.buckets] + ["+Inf"]
+		total: int = 0
+		cumulative: list[tuple[str, int]] = []
+		for bound, count in zip(bounds, self.counts):
+			total += count
+			cumulative.append((bound, total))
+		return cumulative
+
+	def to_dict(self) -> dict:
+		return {
+			"count": self.count,
+			"sum": self.sum,
+			"buckets": dict(self.cumulative_counts()),
+		}
+
+
+class Metrics:
+	"""
+	A Class to collect metrics about calls to the League client (latency, status codes and calls in flight for each
+	endpoint alias and HTTP method) and about how long each stage of the main loop takes. Safe to update from several
+	threads at once. When disabled, nothing is recorded, and callers only pay for checking ``enabled``.
+	"""
+
+	def __init__(self, enabled: bool = True):
+		self.enabled: bool = enabled
+		self.started_at: float = time.time()
+		self._lock = threading.Lock()
+		self._call_latency: dict[tuple[str, str], Histogram] = defaultdict(Histogram)  # (alias, method) -> latency
+		self._call_statuses: dict[tuple[str, str, str], int] = defaultdict(int)  # (alias, method, status) -> calls
+		self._in_flight: dict[tuple[str, str], int] = defaultdict(int)  # (alias, method) -> calls awaiting a response
+		self._stage_timings: dict[str, Histogram] = defaultdict(Histogram)  # stage -> time per iteration
+
+	def call_started(self, alias: str, method: str) -> None:
+		with self._lock:
+			self._in_flight[alias, method.upper()] += 1
+
+	def call_finished(self, alias: str, method: str, status: int | None, seconds: float) -> None:
+		"""
+		Record a finished call to the client.
+		Args:
+			alias: the endpoint alias that was called (see endpoint_label())
+			method: the HTTP method used
+			status: the status code of the response, or None if there was no response
+			seconds: how long the call took
+		"""
+		method = method.upper()
+		with self._lock:
+			self._in_flight[alias, method] -= 1
+			self._call_latency[alias, method].observe(seconds)
+			self._call_statuses[alias, method, str(status) if status is not None else ERROR_STATUS] += 1
+
+	def observe_stage(self, stage: str, seconds: float) -> None:
+		""" Record how long a single iteration of a stage of the main loop took. """
+		with self._lock:
+			self._stage_timings[stage].observe(seconds)
+
+	def time_stage(self, stage: str) -> ContextManager:
+		""" Get a context manager that records how long its body takes as an iteration of the specified stage. """
+		if not self.enabled:
+			return nullcontext()
+		return self._timed(stage)
+
+	@contextmanager
+	def _timed(self, stage: str) -> Iterator[None]:
+		start_time: float = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.observe_stage(stage, time.perf_counter() - start_time)
+
+	def to_dict(self) -> dict:
+		""" Get every metric as JSON-friendly data. """
+		with self._lock:
+			calls: dict[str, dict] = {}
+			for alias, method in self._call_latency.keys() | self._in_flight.keys():
+				calls.setdefault(alias, {})[method] = {
+					"latency": self._call_latency.get((alias, method), Histogram()).to_dict(),
+					"statuses": {},
+					"in_flight": self._in_flight.get((alias, method), 0),
+				}
+			for (alias, method, status), count in self._call_statuses.items():
+				calls[alias][method]["statuses"][status] = count
+
+			return {
+				"enabled": self.enabled,
+				"uptime_seconds": time.time() - self.started_at,
+				"calls": calls,
+				"stages": {stage: histogram.to_dict() for stage, histogram in self._stage_timings.items()},
+			}
+
+	def to_prometheus(self) -> str:
+		""" Get every metric in the Prometheus text exposition format. """
+		lines: list[str] = []
+		with self._lock:
+			lines += [
+				"# HELP lcu_request_duration_seconds Time taken by calls to the League client.",
+				"# TYPE lcu_request_duration_seconds histogram",
+			]
+			for (alias, method), histogram in sorted(self._call_latency.items()):
+				lines += _histogram_lines("lcu_request_duration_seconds", {"alias": alias, "method": method}, histogram)
+
+			lines += [
+				"# HELP lcu_requests_total Calls to the League client, by response status.",
+				"# TYPE lcu_requests_total counter",
+			]
+			for (alias, method, status), count in sorted(self._call_statuses.items()):
+				labels: str = _labels({"alias": alias, "method": method, "status": status})
+				lines.append(f"lcu_requests_total{labels} {count}")
+
+			lines += [
+				"# HELP lcu_requests_in_flight Calls to the League client that are waiting for a response.",
+				"# TYPE lcu_requests_in_flight gauge",
+			]
+			for (alias, method), count in sorted(self._in_flight.items()):
+				lines.append(f"lcu_requests_in_flight{_labels({'alias': alias, 'method': method})} {count}")
+
+			lines += [
+				"# HELP loop_stage_duration_seconds Time taken by a single iteration of each stage of the main loop.",
+				"# TYPE loop_stage_duration_seconds histogram",
+			]
+			for stage, histogram in sorted(self._stage_timings.items()):
+				lines += _histogram_lines("loop_stage_duration_seconds", {"stage": stage}, histogram)
+
+		return "\n".join(lines) + "\n"
+
+
+def endpoint_label(endpoints: dict[str, str], endpoint: str) -> str:
+	"""
+	Get the label to record a call under. Aliases are used as-is; for full paths, the alias they start with is used
+	if there is one (e.g. "/lol-perks/v1/pages/123" -> "send_runes"), otherwise numeric ids are stripped out, so that
+	every champion, action, etc. doesn't get its own label.
+	Args:
+		endpoints: the Connection's endpoint aliases
+		endpoint: the alias or path that was called
+	"""
+	if endpoint in endpoints:
+		return endpoint
+	for alias, path in endpoints.items():
+		if path.endswith("/") and endpoint.startswith(path):
+			return alias
+	return _ID_SEGMENT.sub("/{id}", endpoint)
+
+
+def format_number(number: float) -> str:
+	""" Format a number the way Prometheus expects, e.g. 1 -> "1.0", 0.005 -> "0.005". """
+	return repr(float(number))
+
+
+def _labels(labels: dict[str, str]) -> str:
+	""" Format labels for the Prometheus text format, e.g. {"alias": "lobby"} -> '{alias="lobby"}' """
+	return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+	return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name: str, labels: dict[str, str], histogram: Histogram) -> list[str]:
+	lines: list[str] = [
+		f"{name}_bucket{_labels(labels | {'le': bound})} {count}" for bound, count in histogram.cumulative_counts()
+	]
+	lines.append(f"{name}_sum{_labels(labels)} {histogram.sum}")
+	lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+	return lines
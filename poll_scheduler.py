@@ -0,0 +1,83 @@
+from collections import Counter, deque
+
+from champselect_snapshot import ChampselectSnapshot
+
+TIGHT_INTERVAL: float = 0.25  # max seconds between polls when the local player's action is in progress or up next
+PHASE_END_MARGIN: float = 0.05  # seconds to wait after the champselect timer runs out before polling again
+BACKOFF_FACTOR: float = 2  # how much the interval grows after each poll where nothing changed
+
+# Longest interval (seconds) to back off to in each gamestate. Gamestates that aren't listed don't back off at all.
+MAX_IDLE_INTERVALS: dict[str, float] = {
+	"None": 8,
+	"Lobby": 4,
+	"Matchmaking": 2,
+	"InProgress": 30,
+	"Reconnect": 30,
+	"WaitingForStats": 8,
+	"PreEndOfGame": 8,
+	"EndOfGame": 8,
+}
+
+
+class PollScheduler:
+	"""
+	A Class to decide how long the main loop should wait before polling the client again. Polls quickly when the
+	local player's champselect action is in progress or about to start, and backs off exponentially while idle (in the
+	main menu, in queue, or in game). Keeps track of the intervals it chose and how many polls ran in each gamestate.
+	"""
+
+	def __init__(self, history_size: int = 100):
+		self.poll_counts: Counter[str] = Counter()  # gamestate -> number of polls
+		self.intervals: deque[tuple[str, float]] = deque(maxlen=history_size)  # recently chosen (gamestate, interval)
+		self._last_gamestate: str = ""
+		self._idle_interval: float = 0  # current backoff interval, reset when the gamestate changes
+
+	def next_interval(self, base_interval: float, gamestate: str, snapshot: ChampselectSnapshot | None = None) -> float:
+		"""
+		Choose how long to wait before the next poll, and record it.
+		Args:
+			base_interval: the update interval from the config file
+			gamestate: the gamestate seen on the last poll
+			snapshot: (optional) the most recent champselect session, used while in champselect
+		"""
+		self.poll_counts[gamestate] += 1
+		if gamestate != self._last_gamestate:
+			self._last_gamestate = gamestate
+			self._idle_interval = 0
+
+		if gamestate == "ChampSelect" and snapshot is not None:
+			interval: float = self._champselect_interval(base_interval, snapshot)
+
+		elif gamestate in MAX_IDLE_INTERVALS:
+			if self._idle_interval == 0:
+				self._idle_interval = base_interval
+			else:
+				self._idle_interval = min(self._idle_interval * BACKOFF_FACTOR, MAX_IDLE_INTERVALS[gamestate])
+			interval = max(self._idle_interval, base_interval)
+
+		else:
+			interval = base_interval
+
+		self.intervals.append((gamestate, interval))
+		return interval
+
+	@staticmethod
+	def _champselect_interval(base_interval: float, snapshot: ChampselectSnapshot) -> float:
+		""" Choose the poll interval during champselect. """
+		# Our turn (or the next one) - react as soon as possible
+		if snapshot.phase == "BAN_PICK" and snapshot.turns_until_my_action in (0, 1):
+			return min(base_interval, TIGHT_INTERVAL)
+
+		# Otherwise, don't sleep through the end of the current phase
+		seconds_left: float = snapshot.seconds_left() + PHASE_END_MARGIN
+		return max(min(base_interval, seconds_left), min(base_interval, TIGHT_INTERVAL))
+
+	def summary(self) -> dict:
+		""" Get the poll counts and the average chosen interval for each gamestate. """
+		totals: dict[str, list[float]] = {}
+		for gamestate, interval in self.intervals:
+			totals.setdefault(gamestate, []).append(interval)
+		return {
+			"poll_counts": dict(self.poll_counts),
+			"average_intervals": {gamestate: sum(values) / len(values) for gamestate, values in totals.items()},
+		}
@@ -0,0 +1,65 @@
+import formatting
+
+
+class RunepageCache:
+	"""
+	A Class to store the player's rune pages, so that they only need to be requested from the client once per
+	champselect. Kept up to date with the pages this script creates or modifies.
+	"""
+
+	def __init__(self):
+		self.pages: list[dict] | None = None  # None until the pages are requested from the client
+		self._clean_names: dict[str, str] = {}  # page name -> cleaned page name
+
+	def invalidate(self) -> None:
+		""" Forget all cached pages, so that they're requested again next time. """
+		self.pages = None
+
+	def is_loaded(self) -> bool:
+		return self.pages is not None
+
+	def get_clean_name(self, all_champs: dict[str, int], page: dict) -> str:
+		""" Get the name of a rune page, cleaned using formatting.clean_name(). """
+		name: str = page["name"]
+		if name not in self._clean_names:
+			self._clean_names[name] = formatting.clean_name(all_champs, name, False)
+		return self._clean_names[name]
+
+	def get(self, page_id: int) -> dict | None:
+		""" Get the rune page with the specified id, or None if it isn't cached. """
+		for page in self.pages or []:
+			if page["id"] == page_id:
+				return page
+		return None
+
+	def add(self, page: dict) -> None:
+		""" Add a newly created rune page to the cache. """
+		if self.pages is None:
+			return
+		self.pages.append(page)
+		if page.get("current"):
+			self._set_current(page["id"])
+
+	def update(self, page: dict) -> None:
+		""" Update a cached rune page with data that was sent to the client. """
+		cached: dict | None = self.get(page["id"])
+		if cached is None:
+			return
+		cached.update(page)
+		if page.get("current"):
+			self._set_current(page["id"])
+
+	def has_same_runes(self, page: dict) -> bool:
+		""" Check whether or not the client's copy of a rune page is already active and contains the same runes. """
+		cached: dict | None = self.get(page["id"])
+		return (
+			cached is not None
+			and cached.get("current", False)
+			and cached.get("primaryStyleId") == page.get("primaryStyleId")
+			and cached.get("subStyleId") == page.get("subStyleId")
+			and cached.get("selectedPerkIds") == page.get("selectedPerkIds")
+		)
+
+	def _set_current(self, page_id: int) -> None:
+		for page in self.pages:
+			page["current"] = page["id"] == page_id
@@ -1,5 +1,10 @@
+import requests
+import warnings
+import time
+
 import champselect
 import connect as c
+import decision_journal
 import utility as u
 import formatting
 
@@ -8,48 +13,125 @@ GHOST: int = 1
 CLEANSE: int = 6
 D: int = 0  # index of left summoner spell (bound to D by default)
 F: int = 1  # index of right summoner spell (bound to F by default)
+PREFETCH_BACKUP_COUNT: int = 3  # number of backup picks to prefetch recommended runes for
+
+
+def prefetch_recommendations(connection: c.Connection) -> None:
+	"""
+	Fetch the recommended runes and summoner spells for the current pick intent and the top few backup picks, so that
+	they're ready by the time runes need to be sent.
+	"""
+	if not (connection.should_modify_runes or connection.is_bryan) or connection.runes_chosen:
+		return
 
+	# Don't slow down picking/banning - this can wait until the next loop
+	if champselect.is_currently_picking(connection) or champselect.is_currently_banning(connection):
+		return
+
+	role_name: str = connection.get_assigned_role()
+	if not role_name or not connection.pick_intent:
+		return
 
-def send_runes_and_summs(connection: c.Connection) -> None:
-	""" Get the recommended rune page and summoner spells and send them to the client. """
+	champids: list[int] = [connection.get_champid(connection.pick_intent)]
+	for champid in connection.get_backup_champids(role_name):
+		if len(champids) > PREFETCH_BACKUP_COUNT:
+			break
+		if champid not in champids and champselect.could_be_picked(connection, champid):
+			champids.append(champid)
+
+	for champid in champids:
+		# Don't ask again every loop if the client couldn't recommend anything for this champion
+		key: tuple[str, int, str] = get_recommendation_key(connection, champid, role_name)
+		if key in connection.failed_rune_recommendations:
+			continue
+		try:
+			get_recommended_runepage(connection, champid, role_name)
+		except (RuntimeError, requests.exceptions.RequestException) as e:
+			connection.failed_rune_recommendations.add(key)
+			champ_name: str = connection.format_champ(connection.get_champ_name_by_id(champid))
+			warnings.warn(f"Unable to prefetch runes for {champ_name}: {e}", RuntimeWarning)
+
+
+def send_runes_and_summs(connection: c.Connection, check_gamestate: bool = True) -> None:
+	"""
+	Get the recommended rune page and summoner spells and send them to the client.
+	Args:
+		check_gamestate: (optional) if False, assume we're in champselect instead of asking the client
+	"""
 	# Prevent redundant API calls - early return if we've already sent runes, or the user doesn't want us to.
 	if connection.runes_chosen or not connection.should_modify_runes:
 		if not connection.is_bryan:  # only return if not Bryan
 			return
 
-	# Get runes and summoner spells to send
-	request_body, summoner_spells = build_runepage_request(connection)
+	with connection.metrics.time_stage("send_runes_and_summs"):
+		_send_runes_and_summs(connection, check_gamestate)
+
 
-	# Send the chosen runes
-	endpoint = connection.endpoints["send_runes"] + str(request_body["id"])
-	response = connection.api_put(endpoint, request_body)
-	if response.status_code == 400:
-		u.print_and_write(f"Unable to send runes to the client; received response {response.json()}")
+def _send_runes_and_summs(connection: c.Connection, check_gamestate: bool) -> None:
+	# Get runes and summoner spells to send
+	request_body, summoner_spells = build_runepage_request(connection, check_gamestate)
+
+	# Send the chosen runes, unless the client already has them
+	page_info: dict = {"pageid": request_body["id"], "perks": request_body["selectedPerkIds"]}
+	if not connection.runepages.has_same_runes(request_body):
+		endpoint = connection.endpoints["send_runes"] + str(request_body["id"])
+		sent_at: float = time.monotonic()
+		response = connection.api_put(endpoint, request_body)
+		connection.journal.record(
+			decision_journal.RUNES,
+			t=sent_at,
+			status=response.status_code,
+			ms=decision_journal.elapsed_ms(sent_at),
+			**page_info,
+		)
+		if response.status_code == 400:
+			u.print_and_write(f"Unable to send runes to the client; received response {response.json()}")
+		elif response.ok:
+			connection.runepages.update(request_body)
+	else:
+		connection.journal.record(decision_journal.RUNES, status=None, skipped=True, **page_info)
 
-	# Send summoner spells
-	if connection.should_modify_runes or connection.is_bryan:
+	# Send summoner spells, unless they're already selected
+	if (
+		(connection.should_modify_runes or connection.is_bryan)
+		and tuple(summoner_spells) != connection.champselect_snapshot.spell_ids
+	):
 		request_body = {
 			"spell1Id": summoner_spells[D],
 			"spell2Id": summoner_spells[F]
 		}
-		connection.api_patch("send_summs", request_body)
+		sent_at = time.monotonic()
+		response = connection.api_patch("send_summs", request_body)
+		connection.journal.record(
+			decision_journal.SPELLS,
+			t=sent_at,
+			spells=summoner_spells,
+			status=response.status_code,
+			ms=decision_journal.elapsed_ms(sent_at),
+		)
+	else:
+		connection.journal.record(decision_journal.SPELLS, spells=summoner_spells, status=None, skipped=True)
 	connection.runes_chosen = True  # TODO: Only modify this flag conditionally
 
 
-def build_runepage_request(connection: c.Connection) -> tuple[dict, list[int]]:
+def build_runepage_request(connection: c.Connection, check_gamestate: bool = True) -> tuple[dict, list[int]]:
 	"""
 	Build an HTTP request body for setting the user's rune page and summoner spells.
+	Args:
+		check_gamestate: (optional) if False, assume we're in champselect instead of asking the client
 	Returns:
 		a tuple containing the HTTP request (dictionary), and a list of summoner spell IDs.
 	"""
 	# Do nothing if not yet in champselect
-	if connection.get_gamestate() != "ChampSelect":
+	if check_gamestate and connection.get_gamestate() != "ChampSelect":
 		return
 
-	# If we already locked in, check what champ was locked using API
-	# (in case user manually picks something besides pick intent)
+	# If we already locked in, check what champ was locked (in case user manually picks something besides pick intent)
 	if champselect.get_champselect_phase(connection) == "FINALIZATION":
-		champid: int = connection.api_get("current_champ").json()  # this endpoint only works after locking
+		if connection.pick_action.get("completed", False):
+			champid: int = connection.pick_action["championId"]
+		else:
+			champid = connection.api_get("current_champ").json()  # this endpoint only works after locking
 		champ_name = connection.get_champ_name_by_id(champid)
 
 	# Check pick intent if we haven't locked yet
@@ -64,7 +146,9 @@ def build_runepage_request(connection: c.Connection) -> tuple[dict, list[int]]:
 
 	# Get recommended runes and summs
 	recommended_runepage: dict = get_recommended_runepage(connection, champid, role_name)[0]
-	summoner_spells: list[int] = get_recommended_spells(connection.is_bryan, recommended_runepage["summonerSpellIds"])
+	summoner_spells: list[int] = get_recommended_spells(
+		connection.is_bryan, list(recommended_runepage["summonerSpellIds"])  # copy - recommendations are cached
+	)
 
 	# If we're not modifying the rune page, just return it as-is
 	if not should_overwrite:
@@ -73,7 +157,7 @@ def build_runepage_request(connection: c.Connection) -> tuple[dict, list[int]]:
 	# Set the name for the rune page
 	if role_name == "utility":
 		role_name = "support"
-	name = f"{connection.RUNEPAGE_PREFIX} {formatting.champ(champ_name)} {formatting.capitalize(role_name)}"
+	name = f"{connection.RUNEPAGE_PREFIX} {connection.format_champ(champ_name)} {formatting.capitalize(role_name)}"
 	runes = recommended_runepage["perks"]
 	request_body: dict = {
 		"current": True,
@@ -104,7 +188,7 @@ def pick_victim_runepage(connection: c.Connection, champ_name: str) -> tuple[dic
 
 	for page in all_pages:
 		page_name: str = page["name"]
-		clean_page_name: str = formatting.clean_name(connection.all_champs, page_name, False)
+		clean_page_name: str = connection.runepages.get_clean_name(connection.all_champs, page)
 
 		# If rune page with this script's naming scheme is found
 		if page_name.startswith(prefix):
@@ -134,13 +218,26 @@ def pick_victim_runepage(connection: c.Connection, champ_name: str) -> tuple[dic
 
 def get_recommended_runepage(connection, champid: int, position: str) -> dict:
 	"""
-	Get the recommended runepage from the client.
+	Get the recommended runepage from the client. Recommendations are cached, so each one is only requested once.
 	Args:
 		champid: the id number of the champion to get runes for
 		position: the position the user is playing
 	"""
-	endpoint: str = get_rune_recommendation_endpoint(champid, position)
-	return connection.api_get(endpoint).json()
+	key: tuple[str, int, str] = get_recommendation_key(connection, champid, position)
+	if key not in connection.rune_recommendations:
+		endpoint: str = get_rune_recommendation_endpoint(champid, position)
+		response = connection.api_get(endpoint)
+		if response.status_code != 200:
+			raise RuntimeError(f"Unable to get recommended runes: {response.json()}")
+		connection.rune_recommendations[key] = response.json()
+
+	return connection.rune_recommendations[key]
+
+
+def get_recommendation_key(connection, champid: int, position: str) -> tuple[str, int, str]:
+	""" Get the key recommended runes are cached under. """
+	# Recommendations change between patches, and other clients sharing them might be on a different one
+	return connection.game_version, champid, position
 
 
 def get_recommended_spells(is_bryan: bool, summoner_spells: list[int]) -> list[int]:
@@ -164,10 +261,14 @@ def get_recommended_spells(is_bryan: bool, summoner_spells: list[int]) -> list[i
 
 
 def get_existing_runepages(connection) -> list[dict]:
-	""" Get a list of the runepages the player currently has set. """
+	""" Get a list of the runepages the player currently has set. Only requested from the client once per champselect. """
+	if connection.runepages.is_loaded():
+		return connection.runepages.pages
+
 	response = connection.api_get("runes")
 	if response.status_code == 200:
-		return response.json()
+		connection.runepages.pages = response.json()
+		return connection.runepages.pages
 
 	raise RuntimeError(f"Unable to get rune pages: {response}")
 
@@ -187,8 +288,10 @@ def create_new_runepage(connection: c.Connection, all_pages: list[dict]) -> dict
 	response = connection.api_post("runes", request_body)
 	if response.status_code == 200:
 		# Success - the runepage was created successfully. Now return its data
-		u.print_and_write(f"Success! Created a rune page with id {response.json()['id']}")
-		return response.json()
+		page: dict = response.json()
+		u.print_and_write(f"Success! Created a rune page with id {page['id']}")
+		connection.runepages.add(page)
+		return page
 
 	# No empty rune page slots
 	elif response.status_code == 400:
@@ -0,0 +1,38 @@
+import threading
+
+from champion_catalog import ChampionCatalog
+from champion_resolver import ChampionResolver
+
+
+class SharedChampionData:
+	"""
+	A Class to share champion data that's the same for every account between several Connections (see supervisor.py),
+	so that it's only downloaded and indexed once per game version: data about every champion in the game, the
+	champion name resolver, and recommended runes (keyed by game version, since clients can be on different patches
+	during a rollover). Which champions each player owns is still kept per Connection.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._all_champs: dict[str, list[dict]] = {}  # game version -> data for every champion in the game
+		self._resolvers: dict[str, ChampionResolver] = {}  # game version -> champion name resolver
+		# (game version, champid, role) -> recommended runes
+		self.rune_recommendations: dict[tuple[str, int, str], list[dict]] = {}
+
+	def get_all_champs(self, game_version: str) -> list[dict] | None:
+		""" Get data for every champion in the game, or None if no Connection has downloaded it yet. """
+		with self._lock:
+			return self._all_champs.get(game_version)
+
+	def set_all_champs(self, game_version: str, all_champs: list[dict]) -> None:
+		""" Share data for every champion in the game with other Connections. """
+		with self._lock:
+			self._all_champs[game_version] = all_champs
+
+	def get_resolver(self, game_version: str, catalog: ChampionCatalog) -> ChampionResolver:
+		""" Get the champion name resolver for a game version, building it from the catalog the first time. """
+		with self._lock:
+			resolver: ChampionResolver | None = self._resolvers.get(game_version)
+			if resolver is None:
+				resolver = self._resolvers[game_version] = ChampionResolver(catalog)
+			return resolver
@@ -0,0 +1,70 @@
+from dataclasses import dataclass
+import threading
+import time
+
+
+@dataclass(frozen=True)
+class StatusSnapshot:
+	""" A Class to store a copy of the script's status at a single point in time. """
+	version: int
+	status: dict
+	published_at: float | None  # time.monotonic() of the last publish, or None if nothing has been published yet
+
+	def age(self) -> float | None:
+		""" Get the number of seconds since the status was last published. """
+		if self.published_at is None:
+			return None
+		return time.monotonic() - self.published_at
+
+
+class StatusFeed:
+	"""
+	A Class to store the script's current status (gamestate, role, pick/ban intent, etc.), and let other threads wait
+	for it to change. Every change gets a new version number, which is also used as the id of server-sent events.
+	"""
+
+	def __init__(self):
+		self.version: int = 0
+		self._status: dict = {}
+		self._published_at: float | None = None
+		self._condition = threading.Condition()
+
+	def publish(self, **fields) -> bool:
+		"""
+		Update some or all of the status fields, waking up anyone waiting for a change. The version number only changes
+		if a field did, but the status counts as fresh either way.
+		Returns:
+			True if anything changed, False otherwise
+		"""
+		with self._condition:
+			self._published_at = time.monotonic()
+			changed: dict = {key: value for key, value in fields.items() if self._status.get(key) != value}
+			if not changed:
+				return False
+			self._status.update(changed)
+			self.version += 1
+			self._condition.notify_all()
+			return True
+
+	def get(self) -> StatusSnapshot:
+		""" Get a copy of the current status. """
+		with self._condition:
+			return self._snapshot()
+
+	def wait_for_change(self, last_version: int, timeout: float) -> StatusSnapshot | None:
+		"""
+		Wait until the status is different from the specified version.
+		Args:
+			last_version: the last version the caller has seen
+			timeout: the max number of seconds to wait
+		Returns:
+			a copy of the new status, or None if nothing changed before the timeout
+		"""
+		with self._condition:
+			self._condition.wait_for(lambda: self.version != last_version, timeout)
+			if self.version == last_version:
+				return None
+			return self._snapshot()
+
+	def _snapshot(self) -> StatusSnapshot:
+		return StatusSnapshot(self.version, dict(self._status), self._published_at)
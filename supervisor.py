@@ -0,0 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+import threading
+import requests
+import asyncio
+import os
+
+from shared_champion_data import SharedChampionData
+from async_connection import AsyncConnection
+from status_feed import StatusSnapshot
+import champselect_exceptions
+import async_main_loop
+import connect as c
+import utility as u
+import main_loop
+
+CLIENTS_SECTION: str = "clients"  # config section listing the clients to drive (name = game directory)
+WORKERS_PER_CLIENT: int = 4  # worker threads added to the shared pool for each client
+CONNECT_RETRY_INTERVAL: float = 5  # seconds to wait before trying to connect to a client again
+
+
+@dataclass(frozen=True)
+class ClientSpec:
+	""" A Class to store how to connect to one of the clients driven by a Supervisor. """
+	name: str
+	lockfile_path: str | None = None  # defaults to the lockfile in the game directory from the client's config
+	profile: str = ""  # config profile to use (see utility.load_config_profile())
+
+	@classmethod
+	def from_config(cls, config=u.cfg_reader) -> list["ClientSpec"]:
+		"""
+		Read the clients to drive from the [clients] section of the config. Each option is a client: its name is used
+		as the config profile (config-<name>.ini, if it exists), and its value is the game directory (leave blank to
+		use the directory from the profile).
+		"""
+		if not config.has_section(CLIENTS_SECTION):
+			return []
+
+		specs: list[ClientSpec] = []
+		for name, directory in config.items(CLIENTS_SECTION):
+			lockfile_path: str | None = os.path.join(directory, "lockfile") if directory else None
+			specs.append(cls(name, lockfile_path, name))
+		return specs
+
+
+@dataclass
+class SupervisedClient:
+	""" A Class to store the state of one of the clients driven by a Supervisor. """
+	spec: ClientSpec
+	connection: c.Connection | None = None  # None until connected
+	loop_state: main_loop.LoopState = field(default_factory=main_loop.LoopState)
+	error: str = ""  # why the client isn't connected (or why its loop stopped), if it isn't running
+
+	def get_status(self) -> dict:
+		""" Get the client's status for the web API. """
+		status: dict = {
+			"name": self.spec.name,
+			"profile": self.spec.profile,
+			"connected": self.connection is not None,
+			"error": self.error,
+		}
+		if self.connection is not None:
+			snapshot: StatusSnapshot = self.connection.status_feed.get()
+			status.update(lockfile=self.connection.get_lockfile_path(), version=snapshot.version, **snapshot.status)
+		return status
+
+
+class Supervisor:
+	"""
+	A Class to drive several League clients (e.g. different accounts) from one process. Each client gets its own
+	Connection, with its own lockfile and config profile, but champion data is shared between them, and all their
+	main loops run on a single asyncio event loop whose blocking work goes to one shared pool of worker threads (see
+	async_main_loop.py).
+	"""
+
+	def __init__(self, specs: list[ClientSpec], max_workers: int | None = None):
+		"""
+		Args:
+			specs: the clients to drive
+			max_workers: (optional) the size of the shared worker pool - defaults to WORKERS_PER_CLIENT per client
+		"""
+		names: list[str] = [spec.name for spec in specs]
+		if len(set(names)) != len(names):
+			raise ValueError(f"Client names must be unique: {', '.join(names)}")
+
+		self.clients: dict[str, SupervisedClient] = {spec.name: SupervisedClient(spec) for spec in specs}
+		self.shared_data: SharedChampionData = SharedChampionData()
+		self.max_workers: int = max_workers or WORKERS_PER_CLIENT * max(len(specs), 1)
+		self.stop_event = threading.Event()
+		self._thread: threading.Thread | None = None
+
+	def is_running(self) -> bool:
+		return self._thread is not None and self._thread.is_alive()
+
+	def start(self) -> None:
+		""" Start driving every client in the background. """
+		if self.is_running():
+			return
+		self.stop_event.clear()
+		self._thread = threading.Thread(target=self.run, name="supervisor", daemon=True)
+		self._thread.start()
+
+	def stop(self, timeout: float | None = None) -> None:
+		""" Stop every client's main loop, and wait for them to finish. """
+		self.stop_event.set()
+		if self._thread is not None:
+			self._thread.join(timeout)
+
+	def run(self) -> None:
+		""" Drive every client until stop() is called. Blocks until then. """
+		asyncio.run(self._run())
+
+	def get_client(self, name: str) -> SupervisedClient:
+		""" Get one of the clients by name. Raises KeyError if there isn't one with that name. """
+		return self.clients[name]
+
+	def get_statuses(self) -> list[dict]:
+		""" Get the status of every client. """
+		return [client.get_status() for client in self.clients.values()]
+
+	async def _run(self) -> None:
+		# asyncio.to_thread() uses the default executor, so this is the pool every client's blocking work runs on. It's
+		# shut down when the event loop closes.
+		executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="client")
+		asyncio.get_running_loop().set_default_executor(executor)
+		await asyncio.gather(*(self._run_client(client) for client in self.clients.values()))
+
+	async def _run_client(self, client: SupervisedClient) -> None:
+		""" Connect to a client (retrying until it's open), then run its main loop until the supervisor stops. """
+		while not self.stop_event.is_set():
+			try:
+				if client.connection is None:
+					client.connection = await asyncio.to_thread(self._connect, client.spec)
+					client.error = ""
+					u.print_and_write(f"[{client.spec.name}] Connected to the League client.")
+				await async_main_loop.async_main_loop(
+					AsyncConnection(client.connection), self.stop_event, client.loop_state
+				)
+
+			except (champselect_exceptions.ClientConnectionError, requests.exceptions.ConnectionError) as e:
+				client.error = str(e)
+			except Exception as e:
+				# Don't let one client take the others down with it
+				client.error = f"{type(e).__name__}: {e}"
+				u.print_and_write(f"[{client.spec.name}] Main loop stopped: {client.error}")
+
+			await asyncio.to_thread(self.stop_event.wait, CONNECT_RETRY_INTERVAL)
+
+	def _connect(self, spec: ClientSpec) -> c.Connection:
+		return c.Connection(lockfile_path=spec.lockfile_path, profile=spec.profile, shared_data=self.shared_data)
+
+
+if __name__ == "__main__":
+	client_specs: list[ClientSpec] = ClientSpec.from_config()
+	if not client_specs:
+		u.clean_exit(f"No clients to drive - list them in the [{CLIENTS_SECTION}] section of {u.CFG_PATH}")
+
+	supervisor = Supervisor(client_specs)
+	try:
+		supervisor.run()
+	except KeyboardInterrupt:
+		supervisor.stop()
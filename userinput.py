@@ -1,14 +1,26 @@
 import connect as c
-import formatting
+
+MAX_SUGGESTIONS: int = 5  # number of champions to suggest when the user's input doesn't match one
 
 
 def get_champ_name_input(connection: c.Connection, prompt: str) -> str:
-	""" Get user input for the name of a champion. """
-	name: str = formatting.clean_name(connection.all_champs, input(prompt))
-	while name == "invalid":
-		name = formatting.clean_name(connection.all_champs, input("Invalid champion name! Please try again:  "))
+	"""
+	Get user input for the name of a champion. Partial names, nicknames and small typos are accepted as long as they
+	clearly refer to a single champion. Returns an empty string if the user doesn't enter anything.
+	"""
+	text: str = input(prompt)
+	while text:
+		name: str | None = connection.champ_resolver.resolve(text)
+		if name is not None:
+			return name
+
+		suggestions: list[str] = [
+			candidate.display_name for candidate in connection.champ_resolver.suggest(text, MAX_SUGGESTIONS)
+		]
+		hint: str = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ""
+		text = input(f"Invalid champion name!{hint} Please try again:  ")
 
-	return name
+	return ""
 
 
 def get_first_choices(connection: c.Connection) -> None:
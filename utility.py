@@ -1,16 +1,25 @@
 from dataclasses import dataclass
 import configparser
 import warnings
+import atexit
 import sys
+import io
 import os
 
+from log_writer import LogWriter
+import formatting
+
 BASE_DIR = os.path.dirname(__file__)
 CFG_PATH = os.path.join(BASE_DIR, "config.ini")
 CFG_TEMPLATE_PATH = os.path.join(BASE_DIR, "config-template.ini")
 LOGFILE_PATH = os.path.join(BASE_DIR, "output.log")
+LOGFILE_MAX_BYTES = 5 * 1024 * 1024
+LOGFILE_BACKUP_COUNT = 3
 
 TAB_CHARACTER = "\t"
 
+_config_version: int = 0  # incremented every time the config is modified
+
 # Read config
 cfg_reader = configparser.ConfigParser()
 if not cfg_reader.read(CFG_PATH):
@@ -20,6 +29,10 @@ if not cfg_reader.read(CFG_PATH):
 	# Copy config template to real config location
 	cfg_reader.write(open(CFG_PATH, "w"))
 
+# Read config template - used as a fallback for options missing from the user's config (e.g. after an update)
+config_template = configparser.ConfigParser()
+config_template.read(CFG_TEMPLATE_PATH)
+
 
 @dataclass
 class Lockfile:
@@ -30,24 +43,47 @@ class Lockfile:
 	protocol: str = "https"
 
 
-def get_config_option_str(section: str, option: str) -> str:
+def get_config_option_str(section: str, option: str, config=cfg_reader) -> str:
 	"""
 	Get an option from the user's config.
 	Args:
 		section: the config section to read from
 		option: the config option to read from
+		config (cfg_reader): the config to read from, e.g. a config profile (see load_config_profile())
 	"""
-	return _get_config_option(section, option, False)
+	return _get_config_option(section, option, False, config)
 
 
-def get_config_option_bool(section: str, option: str) -> bool:
+def get_config_option_bool(section: str, option: str, config=cfg_reader) -> bool:
 	"""
 	Get an option from the user's config.
 	Args:
 		section: the config section to read from
 		option: the config option to read from
+		config (cfg_reader): the config to read from, e.g. a config profile (see load_config_profile())
+	"""
+	return _get_config_option(section, option, True, config)
+
+
+def get_config_profile_path(profile: str) -> str:
+	""" Get the path to the file for a config profile. """
+	return os.path.join(BASE_DIR, f"config-{profile}.ini")
+
+
+def load_config_profile(profile: str) -> configparser.ConfigParser:
 	"""
-	return _get_config_option(section, option, True)
+	Load a config profile: the user's config, with any options set in the profile's file (config-<profile>.ini)
+	replacing the user's. The profile's file is optional, and only needs to contain the options that are different.
+	Args:
+		profile: the name of the profile
+	"""
+	config = configparser.ConfigParser()
+	config.read_dict(cfg_reader)
+	try:
+		config.read(get_config_profile_path(profile))
+	except configparser.Error as e:
+		warnings.warn(f"Unable to parse config profile '{profile}', using the default config: {e}", RuntimeWarning)
+	return config
 
 
 def _get_config_option(section: str, option: str, is_bool: bool = False, config=cfg_reader) -> str | bool:
@@ -82,9 +118,13 @@ def _get_config_option(section: str, option: str, is_bool: bool = False, config=
 		raise type(e)(f"An error occurred while reading {CFG_PATH}: {e}")
 
 
-def get_lockfile_path() -> str:
-	""" Get the path to the user's lockfile. """
-	config_dir: str = get_config_option_str("settings", "directory")
+def get_lockfile_path(config=cfg_reader) -> str:
+	"""
+	Get the path to the user's lockfile.
+	Args:
+		config (cfg_reader): the config to read the game directory from
+	"""
+	config_dir: str = get_config_option_str("settings", "directory", config)
 
 	# Use directory specified in config if it exists
 	if config_dir:
@@ -105,35 +145,46 @@ def get_lockfile_path() -> str:
 			raise RuntimeError("Unsupported OS")
 
 
-def get_backup_config_champs(position: str, picking: bool = True) -> list[str]:
+def get_config_version() -> int:
+	""" Get a number that changes every time the config is modified while the program is running. """
+	return _config_version
+
+
+def compile_priority_tables(all_champs: dict[str, int], config=cfg_reader) -> dict[str, tuple[int, ...]]:
 	"""
-	Parse the user's config for backup champs and return it as a list.
+	Parse the backup champions from each pick_ and ban_ section of the user's config into tuples of champion ids.
+	Names that don't match a champion are left out, and a warning listing them is shown.
 	Args:
-		position: the position the user is playing
-		picking (True): a flag indicating whether the user is picking (True) or banning (False)
+		all_champs: all champions in the game, keyed by cleaned name
+		config (cfg_reader): the config to read from
 	Returns:
-		a list of champion names in order of preference
+		a dictionary mapping section names (e.g. pick_middle) to champion ids in order of preference
 	"""
-	champs: list[str] = []
-	if len(position) == 0:
+	tables: dict[str, tuple[int, ...]] = {}
+	unknown: list[str] = []
+	for section_name in config.sections():
+		if not section_name.startswith(("pick_", "ban_")):
+			continue
+
+		champids: list[int] = []
+		option_index: int = 1
+		champ_name: str = config[section_name].get(str(option_index), "none")
+		while champ_name != "none":
+			clean_name: str = formatting.clean_name(all_champs, champ_name)
+			if clean_name == "invalid":
+				unknown.append(f"[{section_name}] {option_index} = {champ_name}")
+			elif all_champs[clean_name] not in champids:
+				champids.append(all_champs[clean_name])
+			option_index += 1
+			champ_name = config[section_name].get(str(option_index), "none")
+		tables[section_name] = tuple(champids)
+
+	if unknown:
 		warnings.warn(
-			f"Unable to find backup champions - the user wasn't assigned a role",
+			f"Ignoring unknown champions in {CFG_PATH}: {', '.join(unknown)}",
 			RuntimeWarning, stacklevel=2
 		)
-		return champs
-
-	section_name: str = "pick_" if picking else "ban_"
-	section_name += position
-
-	option_index: int = 1
-	config_section = cfg_reader[section_name]
-	champ_name: str = config_section.get(str(option_index), "none")
-
-	while champ_name != "none":
-		champs.append(champ_name)
-		option_index += 1
-		champ_name = config_section.get(str(option_index), "none")
-	return champs
+	return tables
 
 
 def print_and_write(*args, **kwargs) -> None:
@@ -145,11 +196,29 @@ def print_and_write(*args, **kwargs) -> None:
 
 
 def log(*args, **kwargs):
-	""" Write the input to the log file. """
-	with open(LOGFILE_PATH, "a") as file:
-		indentation: str = TAB_CHARACTER * kwargs.pop("indentation", 0)
-		print(indentation, end="", file=file)
-		print(*args, **kwargs, file=file)
+	""" Write the input to the log file (in the background). """
+	text = io.StringIO()
+	indentation: str = TAB_CHARACTER * kwargs.pop("indentation", 0)
+	print(indentation, end="", file=text)
+	print(*args, **kwargs, file=text)
+	_log_writer.write(text.getvalue())
+
+
+def debug(*args, **kwargs) -> None:
+	""" Print the input and save it to the log file, but only if print_debug_info is enabled in the config. """
+	if _debug_enabled:
+		print_and_write(*args, **kwargs)
+
+
+def debug_enabled() -> bool:
+	""" Check whether or not debug info should be printed. """
+	return _debug_enabled
+
+
+def refresh_debug_setting() -> None:
+	""" Re-read the print_debug_info setting from the config. """
+	global _debug_enabled
+	_debug_enabled = get_config_option_bool("settings", "print_debug_info")
 
 
 
@@ -217,6 +286,17 @@ def write_cfg_from_json(new_config: dict):
 			cfg_reader.set(section, option, str(value))
 	cfg_reader.write(open(CFG_PATH, "w"))
 
+	global _config_version
+	_config_version += 1
+	refresh_debug_setting()
+
 
 def get_cfg_path():
-	return CFG_PATH
\ No newline at end of file
+	return CFG_PATH
+
+
+_log_writer = LogWriter(LOGFILE_PATH, LOGFILE_MAX_BYTES, LOGFILE_BACKUP_COUNT)
+atexit.register(_log_writer.close)
+
+_debug_enabled: bool = False
+refresh_debug_setting()
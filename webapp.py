@@ -3,7 +3,10 @@ from functools import wraps
 import threading
 import logging
 import flask
+import json
 
+from supervisor import Supervisor, ClientSpec
+from status_feed import StatusFeed, StatusSnapshot
 import connect as c
 import champselect
 import formatting
@@ -14,6 +17,12 @@ import runes
 
 # TODO: Re-evaluate all HTTP status codes
 
+PROMETHEUS_CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+MAX_SUGGESTIONS: int = 5  # number of champions to suggest when a name doesn't match one
+SSE_HEARTBEAT_INTERVAL: float = 15  # seconds between heartbeats on the /events stream
+SSE_RETRY_MS: int = 3000  # how long browsers should wait before reconnecting to the /events stream
+COMMAND_TIMEOUT: float = 10  # seconds to wait for the main loop to run a command before giving up
+
 # stolen from here https://stackoverflow.com/questions/14888799/disable-console-messages-in-flask-server
 log = logging.getLogger("werkzeug")
 log.disabled = True
@@ -27,6 +36,7 @@ class BotState:
 	def __init__(self):
 		self.connection = None
 		self.script_thread = None
+		self.supervisor: Supervisor | None = None  # drives several clients at once, if started (see /clients/start)
 
 
 state: BotState = BotState()
@@ -64,6 +74,68 @@ def build_response(**kwargs):
 	return flask.jsonify(kwargs), status
 
 
+def run_on_main_loop(func, *args, **kwargs):
+	"""
+	Run a function on the main loop's thread, and return its result. Anything that modifies the Connection or sends
+	commands to the client goes through here, so that the main loop is the only thread doing either.
+	Raises:
+		TimeoutError: if the main loop doesn't run the function within COMMAND_TIMEOUT seconds
+	"""
+	future = state.connection.commands.submit(func, *args, **kwargs)
+	try:
+		return future.result(timeout=COMMAND_TIMEOUT)
+	except TimeoutError:
+		future.cancel()
+		raise
+
+
+@api.errorhandler(TimeoutError)
+def command_timed_out(_):
+	return build_response(
+		success=False,
+		statusText="The script is busy - try again in a moment.",
+		status=503,
+	)
+
+
+def get_status_snapshot() -> StatusSnapshot:
+	"""
+	Get the status most recently published by the script. If the request has a 'refresh' query parameter set to true,
+	the status is refreshed from the League client first - otherwise, no calls to the client are made.
+	"""
+	if flask.request.args.get("refresh", "").lower() in ("1", "true"):
+		run_on_main_loop(main_loop.refresh_status, state.connection)
+	return state.connection.status_feed.get()
+
+
+def build_status_response(snapshot: StatusSnapshot, data):
+	""" Build a success response containing data from a status snapshot, along with the snapshot's version and age. """
+	return build_response(
+		success=True,
+		data=data,
+		version=snapshot.version,
+		age=snapshot.age(),
+		status=200,
+	)
+
+
+def resolve_champ(name: str) -> tuple[str | None, str]:
+	"""
+	Figure out which champion the user meant (see ChampionResolver).
+	Returns:
+		a tuple containing the champion's cleaned name (or None if it's unclear), and an error message to show if so
+	"""
+	resolver = state.connection.champ_resolver
+	champ_name: str | None = resolver.resolve(name)
+	if champ_name is not None:
+		return champ_name, ""
+
+	suggestions: list[str] = [candidate.display_name for candidate in resolver.suggest(name, MAX_SUGGESTIONS)]
+	if suggestions:
+		return None, f"Couldn't tell which champion '{name}' is. Did you mean: {', '.join(suggestions)}?"
+	return None, f"Champion '{name}' does not exist."
+
+
 def script_is_running():
 	""" Check whether or not the script is running. """
 	if state.script_thread is None:
@@ -118,14 +190,119 @@ def start():
 	return empty_success_response()
 
 
+@api.route("/clients/start", methods=["POST"])
+def start_clients():
+	"""
+	Start driving several clients at once (see supervisor.py). The clients can be listed in the request, as a
+	'clients' key containing objects with 'name', and optionally 'lockfile' and 'profile' keys. Otherwise, they're
+	read from the [clients] section of the config.
+	"""
+	if state.supervisor is not None and state.supervisor.is_running():
+		return build_response(
+			success=False,
+			statusText="Already driving multiple clients.",
+			status=409,
+		)
+
+	try:
+		body: dict = flask.request.get_json(silent=True) or {}
+		if "clients" in body:
+			specs: list[ClientSpec] = [
+				ClientSpec(client["name"], client.get("lockfile"), client.get("profile", "")) for client in body["clients"]
+			]
+		else:
+			specs = ClientSpec.from_config()
+		if not specs:
+			raise ValueError("No clients to drive - list them in the request or in the [clients] config section.")
+
+		state.supervisor = Supervisor(specs)
+		state.supervisor.start()
+
+	except (KeyError, TypeError, ValueError) as e:
+		return build_response(
+			success=False,
+			statusText=f"Invalid client list: {e}",
+			status=400,
+		)
+
+	return empty_success_response()
+
+
+@api.route("/clients/stop", methods=["POST"])
+def stop_clients():
+	""" Stop driving the clients started with /clients/start. """
+	if state.supervisor is None or not state.supervisor.is_running():
+		return build_response(
+			success=False,
+			statusText="Not driving multiple clients.",
+			status=409,
+		)
+
+	state.supervisor.stop()
+	return empty_success_response()
+
+
+@api.route("/clients", methods=["GET"])
+def get_clients():
+	""" Get the status of every client started with /clients/start. """
+	if state.supervisor is None:
+		return build_response(success=True, data=[], status=200)
+	return build_response(success=True, data=state.supervisor.get_statuses(), status=200)
+
+
+@api.route("/clients/<name>/status", methods=["GET"])
+def get_client_status(name: str):
+	""" Get the status of a single client started with /clients/start. """
+	try:
+		client = state.supervisor.get_client(name)
+	except (AttributeError, KeyError):
+		return build_response(
+			success=False,
+			statusText=f"No client named '{name}'.",
+			status=404,
+		)
+	return build_response(success=True, data=client.get_status(), status=200)
+
+
+@api.route("/events", methods=["GET"])
+@ensure_connection
+def stream_events():
+	"""
+	Stream the script's status as server-sent events. An event containing the full status is sent whenever it
+	changes, with the status version as its id. Reconnecting clients that send a Last-Event-ID header only receive
+	the status once it's different from the version they last saw.
+	"""
+	feed: StatusFeed = state.connection.status_feed
+	last_event_id: str = flask.request.headers.get("Last-Event-ID", "")
+	# Version 0 is the empty status from before anything was published
+	last_version: int = int(last_event_id) if last_event_id.isdigit() else 0
+
+	def generate():
+		version: int = last_version
+		yield f"retry: {SSE_RETRY_MS}\n\n"
+		while script_is_running() and feed is state.connection.status_feed:
+			snapshot: StatusSnapshot | None = feed.wait_for_change(version, SSE_HEARTBEAT_INTERVAL)
+			if snapshot is None:
+				yield ": heartbeat\n\n"  # comments keep the connection alive without triggering any events
+				continue
+			version = snapshot.version
+			yield f"id: {version}\nevent: status\ndata: {json.dumps(snapshot.status)}\n\n"
+
+	return flask.Response(
+		generate(),
+		mimetype="text/event-stream",
+		headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+	)
+
+
 @api.route("/actions/queue", methods=["POST"])
 @ensure_connection
 def start_queue():
 	""" Start queuing for a match. """
-	gamestate: str = formatting.gamestate(state.connection.get_gamestate())
+	gamestate: str = get_status_snapshot().status.get("gamestate", "")
 	match gamestate:
 		case "Lobby":
-			lobby.start_queue(state.connection)
+			run_on_main_loop(lobby.start_queue, state.connection)
 			return empty_success_response()
 		case "In Queue" | "Ready Check":
 			return build_response(
@@ -143,15 +320,71 @@ def start_queue():
 @api.route("/status/gamestate", methods=["GET"])
 @ensure_connection
 def get_gamestate():
-	gamestate: str = formatting.gamestate(state.connection.get_gamestate())
+	snapshot: StatusSnapshot = get_status_snapshot()
+	return build_status_response(snapshot, snapshot.status.get("gamestate", ""))
 
+
+@api.route("/status/snapshot", methods=["GET"])
+@ensure_connection
+def get_snapshot():
+	""" Get everything in the script's current status at once. """
+	snapshot: StatusSnapshot = get_status_snapshot()
+	return build_status_response(snapshot, snapshot.status)
+
+
+@api.route("/metrics", methods=["GET"])
+@ensure_connection
+def get_metrics():
+	"""
+	Get metrics about calls to the client and the main loop, in the Prometheus text format by default, or as JSON
+	with /metrics?format=json
+	"""
+	metrics = state.connection.metrics
+	if flask.request.args.get("format") == "json":
+		return build_response(success=True, data=metrics.to_dict(), status=200)
+	return flask.Response(metrics.to_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@api.route("/profile", methods=["GET"])
+@ensure_connection
+def get_profile():
+	""" Get the profiling mode, and a summary of the last finished profile (if any). """
+	profiler = state.connection.profiler
 	return build_response(
 		success=True,
-		data=gamestate,
-		status=200,
+		data={
+			"mode": profiler.mode,
+			"lastReport": profiler.last_report.to_dict() if profiler.last_report is not None else None,
+		},
+		status=200
 	)
 
 
+@api.route("/profile", methods=["POST"])
+@ensure_connection
+def start_profile():
+	"""
+	Profile main loop ticks (and the web API commands run between them) without restarting the script. The request
+	should contain a 'mode' key: a number of ticks, 'champselect' to profile the next champ select, or 'off' to stop
+	profiling. Only one client can be profiled at a time.
+	"""
+	try:
+		run_on_main_loop(state.connection.profiler.arm, flask.request.json["mode"])
+		return empty_success_response()
+
+	except KeyError:
+		return build_response(
+			success=False,
+			statusText="Invalid data parameter: POST request should contain a 'mode' key.",
+			status=400
+		)
+	except ValueError as e:
+		return build_response(success=False, statusText=str(e), status=400)
+	except RuntimeError as e:
+		# Another client (see supervisor.py) is already being profiled
+		return build_response(success=False, statusText=str(e), status=409)
+
+
 @api.route("/status", methods=["GET"])
 def get_status():
 	if script_is_running():
@@ -174,32 +407,40 @@ def get_status():
 @ensure_connection
 def get_role():
 	""" Get the user's role. """
-	gamestate: str = formatting.gamestate(state.connection.get_gamestate())
-	match gamestate:
-		case "Lobby" | "In Queue" | "Ready Check":
-			role = formatting.role(state.connection.update_primary_role())
+	snapshot: StatusSnapshot = get_status_snapshot()
+	return build_status_response(snapshot, snapshot.status.get("role", ""))
 
-		case "Champselect":
-			role = formatting.role(state.connection.get_assigned_role())
 
-		case _:
-			role = ""
+@api.route("/status/pick", methods=["GET"])
+@ensure_connection
+def get_champ():
+	snapshot: StatusSnapshot = get_status_snapshot()
+	return build_status_response(snapshot, snapshot.status.get("pick", ""))
 
 
-	return build_response(
-		success=True,
-		data=role,
-		status=200
-	)
+def apply_pick(connection: c.Connection, champ_name: str) -> bool:
+	""" Set the user's pick, and return whether or not it's currently valid. Runs on the main loop's thread. """
+	connection.user_pick = champ_name
+	is_valid: bool = champselect.is_valid_pick(connection, champ_name)
+	if is_valid:
+		connection.pick_intent = champ_name
+	main_loop.publish_status(connection)
+	return is_valid
 
 
-@api.route("/status/pick", methods=["GET"])
+@api.route("/data/autocomplete", methods=["GET"])
 @ensure_connection
-def get_champ():
-	champ: str = state.connection.pick_intent or state.connection.user_pick or ""
+def autocomplete():
+	""" Suggest champions that match a partial or misspelled name, e.g. /data/autocomplete?q=kai&limit=5 """
+	query: str = flask.request.args.get("q", "")
+	limit: int = flask.request.args.get("limit", 10, type=int)
+	candidates = state.connection.champ_resolver.suggest(query, limit)
 	return build_response(
 		success=True,
-		data=champ,
+		data=[
+			{"name": candidate.name, "displayName": candidate.display_name, "match": candidate.match}
+			for candidate in candidates
+		],
 		status=200
 	)
 
@@ -208,26 +449,23 @@ def get_champ():
 @ensure_connection
 def set_pick():
 	desired_champ: str = flask.request.json["champ"]
-	champ_exists = state.connection.champ_exists(desired_champ)
-	if not champ_exists:
+	champ_name, error_msg = resolve_champ(desired_champ)
+	if champ_name is None:
 		return build_response(
 			success=False,
-			statusText=f"Champion '{desired_champ}' does not exist.",
+			statusText=error_msg,
 			status=400,
 		)
 
-	champ_name: str = formatting.clean_name(state.connection.all_champs, desired_champ)
-	state.connection.user_pick = champ_name
 	# If the pick is currently valid
-	if champselect.is_valid_pick(state.connection, champ_name):
-		state.connection.pick_intent = champ_name
+	if run_on_main_loop(apply_pick, state.connection, champ_name):
 		return build_response(
 			success=True,
-			data=formatting.champ(champ_name),
+			data=state.connection.format_champ(champ_name),
 			status=200
 		)
 
-	# Invalid pick
+	# Invalid pick - the reason is shown through the status feed
 	return build_response(
 		success=False,
 		statusText="Invalid pick",
@@ -238,38 +476,41 @@ def set_pick():
 @api.route("/status/ban", methods=["GET"])
 @ensure_connection
 def get_ban():
-	ban: str = state.connection.ban_intent or state.connection.user_ban or ""
-	return build_response(
-		success=True,
-		data=ban,
-		status=200
-	)
+	snapshot: StatusSnapshot = get_status_snapshot()
+	return build_status_response(snapshot, snapshot.status.get("ban", ""))
+
+
+def apply_ban(connection: c.Connection, champ_name: str) -> bool:
+	""" Set the user's ban, and return whether or not it's currently valid. Runs on the main loop's thread. """
+	connection.user_ban = champ_name
+	is_valid: bool = champselect.is_valid_ban(connection, champ_name)
+	if is_valid:
+		connection.ban_intent = champ_name
+	main_loop.publish_status(connection)
+	return is_valid
 
 
 @api.route("/data/ban", methods=["POST"])
 @ensure_connection
 def set_ban():
 	desired_champ: str = flask.request.json["champ"]
-	champ_exists = state.connection.champ_exists(desired_champ)
-	if not champ_exists:
+	champ_name, error_msg = resolve_champ(desired_champ)
+	if champ_name is None:
 		return build_response(
 			success=False,
-			statusText=f"Champion '{desired_champ}' does not exist.",
+			statusText=error_msg,
 			status=400,
 		)
 
-	champ_name: str = formatting.clean_name(state.connection.all_champs, desired_champ)
-	state.connection.user_ban = champ_name
 	# If ban is currently valid
-	if champselect.is_valid_ban(state.connection, champ_name):
-		state.connection.ban_intent = champ_name
+	if run_on_main_loop(apply_ban, state.connection, champ_name):
 		return build_response(
 			success=True,
-			data=formatting.champ(champ_name),
+			data=state.connection.format_champ(champ_name),
 			status=200
 		)
 
-	# Invalid ban
+	# Invalid ban - the reason is shown through the status feed
 	return build_response(
 		success=False,
 		statusText="Invalid ban",
@@ -280,18 +521,21 @@ def set_ban():
 @api.route("/status/runespreference", methods=["GET"])
 @ensure_connection
 def get_runes_preference():
-	return build_response(
-		success=True,
-		data=state.connection.should_modify_runes,
-		status=200
-	)
+	snapshot: StatusSnapshot = get_status_snapshot()
+	return build_status_response(snapshot, snapshot.status.get("setRunes", False))
+
+
+def apply_runes_preference(connection: c.Connection, should_modify_runes: bool) -> None:
+	""" Set whether or not the script should change the user's runes. Runs on the main loop's thread. """
+	connection.should_modify_runes = should_modify_runes
+	main_loop.publish_status(connection)
 
 
 @api.route("/data/runespreference", methods=["POST"])
 @ensure_connection
 def set_runes_preference():
 	try:
-		state.connection.should_modify_runes = bool(flask.request.json["setrunes"])
+		run_on_main_loop(apply_runes_preference, state.connection, bool(flask.request.json["setrunes"]))
 		return empty_success_response()
 
 	except KeyError:
@@ -307,8 +551,10 @@ def set_runes_preference():
 @ensure_connection
 def set_runes():
 	try:
-		runes.send_runes_and_summs(state.connection)
+		run_on_main_loop(runes.send_runes_and_summs, state.connection)
 		return empty_success_response()
+	except TimeoutError:
+		raise
 	except Exception as e:
 		return build_response(
 			success=False,
@@ -322,9 +568,11 @@ def set_runes():
 def create_lobby():
 	lobbytype = flask.request.json["lobbytype"]
 	try:
-		lobby.create_lobby(state.connection, lobbytype)
+		run_on_main_loop(lobby.create_lobby, state.connection, lobbytype)
 		return empty_success_response()
 
+	except TimeoutError:
+		raise
 	except Exception as e:
 		return build_response(
 			success=False,
@@ -337,7 +585,10 @@ def create_lobby():
 def format_name():
 	return build_response(
 		success=True,
-		data=formatting.champ(flask.request.json["champ"]),
+		data=(
+			state.connection.format_champ(flask.request.json["champ"]) if state.connection is not None
+			else formatting.champ(flask.request.json["champ"])
+		),
 		status=200
 	)
 
@@ -359,15 +610,25 @@ def get_cfg_as_json():
 			status=400
 		)
 
+def apply_config(connection: c.Connection, new_cfg_data: dict) -> None:
+	""" Write the updated config, and reload it. Runs on the main loop's thread. """
+	utility.write_cfg_from_json(new_cfg_data)
+	connection.refresh_config()
+
+
 @api.route("/settings/sections", methods=["POST"])
 def write_config():
 	""" Write the updated config back to the config file. """
 	new_cfg_data: dict = flask.request.json
 	try:
-		utility.write_cfg_from_json(new_cfg_data)
-		state.connection.refresh_config()
+		if script_is_running():
+			run_on_main_loop(apply_config, state.connection, new_cfg_data)
+		else:
+			utility.write_cfg_from_json(new_cfg_data)
 		return empty_success_response()
 
+	except TimeoutError:
+		raise
 	except Exception as e:
 		return build_response(
 			success=False,